@@ -1,6 +1,6 @@
-from fastapi import APIRouter, HTTPException
-from app.schemas.auth import TokenRequest, TokenResponse
-from app.core.auth import create_access_token
+from fastapi import APIRouter, HTTPException, Header
+from app.schemas.auth import TokenRequest, TokenResponse, RevokeTokenResponse
+from app.core.auth import create_access_token, validate_token, revoke_token
 from app.utils.exceptions import AuthenticationError
 from app.utils.logger import logger
 
@@ -17,4 +17,19 @@ async def get_access_token(request: TokenRequest) -> TokenResponse:
         raise HTTPException(status_code=e.status_code, detail=e.message)
     except Exception as e:
         logger.error(f"Unexpected error in token generation: {e}")
-        raise HTTPException(status_code=500, detail="Internal server error")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.post("/revoke", response_model=RevokeTokenResponse)
+async def revoke_access_token(authorization: str = Header(...)) -> RevokeTokenResponse:
+    """Revoke the bearer token used for this request"""
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(status_code=401, detail="Invalid authorization header")
+    
+    token = authorization.replace("Bearer ", "").strip()
+    if not validate_token(token):
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+    
+    if not revoke_token(token):
+        raise HTTPException(status_code=500, detail="Failed to revoke token")
+    
+    return RevokeTokenResponse(message="Token revoked successfully")
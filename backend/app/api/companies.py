@@ -1,142 +1,234 @@
-from typing import Union, Optional
-from fastapi import APIRouter, HTTPException, Depends, Header, Query
+import asyncio
+from typing import Union, Optional, Dict, Any, AsyncIterator, List, Tuple
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Request, Response, UploadFile, File
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import func, tuple_
 from sqlalchemy.orm import Session
-from app.schemas.company import CompanySearchRequest, CompanySearchResponse, CompanyNotFoundResponse, CompanyListResponse
-from app.schemas.async_job import AsyncJobCreate, AsyncJobResponse, AsyncJobStatus
+from app.schemas.company import (
+    CompanySearchRequest, CompanySearchResponse, CompanyNotFoundResponse, CompanyListResponse,
+    CompanySuggestion, CompanySuggestResponse, CompanySummary
+)
+from app.schemas.async_job import AsyncJobCreate, AsyncJobResponse, AsyncJobStatus, BatchCreate, BatchStatus
 from app.database.connection import get_db
 from app.database.models import CompanyAnalysis
 from app.core.auth import validate_token
-from app.core.search_engine import search_company, save_company_analysis
-from app.core.gemini_client import generate_company_analysis
+from app.core.search_engine import search_company, company_search_filter, suggest_companies
+from app.core.analysis_service import get_or_create_analysis
 from app.core.async_processor import create_async_job, get_job_status
+from app.core.job_queue import cancel_job
+from app.core.batch_processor import create_batch, get_batch_status, parse_company_csv
+from app.core.job_events import job_events, TERMINAL_JOB_STATUSES
 from app.utils.logger import logger
-from app.utils.exceptions import GeminiAPIError, CompanyNotFoundError
+from app.utils.helpers import encode_cursor, decode_cursor
+from app.utils.exceptions import GeminiAPIError, CompanyNotFoundError, QueueFullError, BatchTooLargeError
 from datetime import datetime, timezone, timedelta
 
 router = APIRouter(prefix="/companies", tags=["companies"])
 
+# Analyses don't change once saved; clients revalidate with If-None-Match after this
+COMPANY_DETAIL_MAX_AGE_SECONDS = 3600
+
+# Comment line sent on idle SSE streams so proxies don't close them
+SSE_KEEPALIVE_SECONDS = 15
+
+# Fields a listing can be narrowed to (view=summary returns all of them).
+# Analysis fields come from the summary columns filled in when an analysis
+# is saved, so summary listings never read analysis_result.
+LIST_FIELDS = {
+    "company_name": CompanyAnalysis.company_name,
+    "canonical_name": CompanyAnalysis.canonical_name,
+    "status": CompanyAnalysis.status,
+    "created_at": CompanyAnalysis.created_at,
+    "industry": CompanyAnalysis.industry,
+    "headquarters_country": CompanyAnalysis.headquarters_country,
+    "revenue_estimate": CompanyAnalysis.revenue_estimate,
+    "employee_count_estimate": CompanyAnalysis.employee_count_estimate,
+    "acquisition_score": CompanyAnalysis.acquisition_score,
+    "overall_opportunity_score": CompanyAnalysis.overall_opportunity_score,
+}
+# Orderings besides newest first / relevance, highest first (companies without a score are left out)
+SCORE_SORTS = {
+    "acquisition_score": CompanyAnalysis.acquisition_score,
+    "overall_opportunity_score": CompanyAnalysis.overall_opportunity_score,
+}
+
 def get_current_token(authorization: str = Header(...)) -> str:
     """Extract and validate bearer token"""
-    logger.info(f"🔐 AUTH HEADER RECEIVED: '{authorization}' (length: {len(authorization) if authorization else 0})")
-    
     if not authorization or not authorization.startswith("Bearer "):
-        logger.error(f"❌ INVALID AUTH HEADER: missing or doesn't start with 'Bearer '")
+        logger.warning("Invalid auth header: missing or doesn't start with 'Bearer '")
         raise HTTPException(status_code=401, detail="Invalid authorization header")
     
-    token = authorization.replace("Bearer ", "")
-    logger.info(f"🎫 EXTRACTED TOKEN: '{token}' (length: {len(token)})")
-    
-    # Check for whitespace or hidden characters
-    if token != token.strip():
-        logger.warning(f"⚠️  TOKEN HAS WHITESPACE: before='{token}', after='{token.strip()}'")
-        token = token.strip()
+    token = authorization.replace("Bearer ", "").strip()
     
     if not validate_token(token):
-        logger.error(f"❌ TOKEN VALIDATION FAILED for: '{token}'")
         raise HTTPException(status_code=401, detail="Invalid or expired token")
     
-    logger.info(f"✅ TOKEN AUTHENTICATION SUCCESSFUL: '{token[:10]}...'")
     return token
 
+def _list_projection(view: str, fields: Optional[str]) -> Optional[List[str]]:
+    """LIST_FIELDS names to select, or None for full rows; ValueError if invalid"""
+    if fields is not None:
+        names = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+        unknown = [name for name in names if name != "id" and name not in LIST_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields {', '.join(unknown)}; available: id, {', '.join(LIST_FIELDS)}")
+        if not names:
+            raise ValueError("No fields requested")
+        return [name for name in names if name != "id"]
+    if view == "summary":
+        return list(LIST_FIELDS)
+    if view != "full":
+        raise ValueError("view must be 'full' or 'summary'")
+    return None
+
+def _list_cursor(listing: Dict[str, Any], sort_value: Any, company_id: int) -> str:
+    """Cursor after a listed company: its full sort key, plus the listing (search, filters, order) it belongs to"""
+    return encode_cursor({"listing": listing, "sort": sort_value, "id": company_id})
+
+def _parse_list_cursor(cursor: str, listing: Dict[str, Any]) -> Tuple[Any, int]:
+    """(sort value, id) from a list cursor; ValueError if it's invalid for this listing"""
+    payload = decode_cursor(cursor)
+    if payload.get("listing") != listing:
+        raise ValueError("Cursor belongs to a different search, filter or sort")
+    sort_value, company_id = payload.get("sort"), payload.get("id")
+    if not isinstance(company_id, int):
+        raise ValueError("Cursor has no company id")
+    if listing["order"] != "created_at":
+        if isinstance(sort_value, bool) or not isinstance(sort_value, (int, float)):
+            raise ValueError("Cursor has no score")
+        return float(sort_value), company_id
+    if not isinstance(sort_value, str):
+        raise ValueError("Cursor has no timestamp")
+    return datetime.fromisoformat(sort_value), company_id
+
 @router.get("", response_model=CompanyListResponse)
 async def list_companies(
     search: Optional[str] = Query(None, description="Search term for company name"),
     limit: int = Query(50, ge=1, le=100, description="Number of companies to return"),
-    offset: int = Query(0, ge=0, description="Number of companies to skip"),
-    cursor: Optional[str] = Query(None, description="Cursor for pagination"),
+    offset: int = Query(0, ge=0, description="Deprecated: number of companies to skip (ignored with cursor)"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from next_cursor of the previous page"),
+    view: str = Query("full", description="full (with analysis_result) or summary (names and key analysis fields)"),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated summary fields to return instead of a view; id is always included"
+    ),
+    industry: Optional[str] = Query(None, description="Only companies in this industry (case-insensitive)"),
+    country: Optional[str] = Query(None, description="Only companies headquartered in this country (case-insensitive)"),
+    sort: Optional[str] = Query(
+        None, description="acquisition_score or overall_opportunity_score, highest first (scored companies only)"
+    ),
     token: str = Depends(get_current_token),
     db: Session = Depends(get_db)
-) -> CompanyListResponse:
-    """List all companies with optimized search and pagination"""
+) -> Union[CompanyListResponse, JSONResponse]:
+    """List companies, newest first, by search relevance or by score, with keyset pagination
+    
+    Pages are ordered by (created_at, id), (similarity, id) when searching,
+    or (score, id) for a score sort, all descending. next_cursor encodes the
+    last row's full sort key, so the next page seeks past it instead of
+    skipping rows with OFFSET.
+    
+    view=summary and fields= select only the listed columns and analysis
+    fields (see LIST_FIELDS) instead of the whole analysis_result. The
+    industry and country filters and the score sorts use the indexed
+    summary columns.
+    """
     
     try:
-        logger.info(f"Listing companies: search='{search}', limit={limit}, offset={offset}, cursor={cursor}")
-        
-        # Use cursor-based pagination for better performance
-        query = db.query(CompanyAnalysis)
-        
-        # Apply cursor filter for pagination (more efficient than offset)
-        if cursor:
-            try:
-                cursor_id = int(cursor)
-                query = query.filter(CompanyAnalysis.id < cursor_id)
-            except ValueError:
-                logger.warning(f"Invalid cursor format: {cursor}")
-        
-        # Apply search filter with optimized query
-        if search:
-            search_term = search.strip().lower()
-            
-            # Use trigram similarity for fuzzy search (requires pg_trgm extension)
-            from sqlalchemy import func, or_, and_
-            
-            # Combine exact matches (high priority) with fuzzy matches
-            exact_condition = or_(
-                func.lower(CompanyAnalysis.company_name).like(f"%{search_term}%"),
-                func.lower(CompanyAnalysis.canonical_name).like(f"%{search_term}%")
-            )
-            
-            # Fuzzy search using trigram similarity
-            fuzzy_condition = or_(
-                func.similarity(func.lower(CompanyAnalysis.company_name), search_term) > 0.3,
-                func.similarity(func.lower(CompanyAnalysis.canonical_name), search_term) > 0.3
-            )
-            
-            query = query.filter(or_(exact_condition, fuzzy_condition))
-            
-            # Order by relevance (exact matches first, then by similarity)
-            query = query.order_by(
-                func.similarity(func.lower(CompanyAnalysis.company_name), search_term).desc(),
-                CompanyAnalysis.created_at.desc()
-            )
+        logger.info(
+            f"Listing companies: search='{search}', limit={limit}, offset={offset}, cursor={cursor}, "
+            f"view={view}, fields={fields}, industry={industry}, country={country}, sort={sort}"
+        )
+        
+        if sort is not None and sort not in SCORE_SORTS:
+            raise HTTPException(status_code=400, detail=f"sort must be one of: {', '.join(SCORE_SORTS)}")
+        search_term = search.strip().lower() if search and search.strip() else None
+        listing = {
+            "search": search_term,
+            "industry": industry.strip().lower() if industry and industry.strip() else None,
+            "country": country.strip().lower() if country and country.strip() else None,
+            "order": sort or ("relevance" if search_term else "created_at")
+        }
+        try:
+            after = _parse_list_cursor(cursor, listing) if cursor else None
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid cursor: {e}")
+        try:
+            projection = _list_projection(view, fields)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        if projection is None:
+            entities = [CompanyAnalysis]
         else:
-            # Default ordering for non-search queries
-            query = query.order_by(CompanyAnalysis.created_at.desc())
+            entities = [CompanyAnalysis.id, *(LIST_FIELDS[name].label(name) for name in projection)]
+        
+        # Search (served by the trigram indexes) and summary column filters
+        filters = []
+        if search_term:
+            filters.append(company_search_filter(search_term))
+        if listing["industry"]:
+            filters.append(func.lower(CompanyAnalysis.industry) == listing["industry"])
+        if listing["country"]:
+            filters.append(func.lower(CompanyAnalysis.headquarters_country) == listing["country"])
+        
+        if sort:
+            sort_column = SCORE_SORTS[sort]
+            filters.append(sort_column.isnot(None))
+        elif search_term:
+            sort_column = func.similarity(func.lower(CompanyAnalysis.company_name), search_term)
+        else:
+            sort_column = CompanyAnalysis.created_at
+        query = db.query(*entities, sort_column.label("sort_value")).filter(*filters)
+        sort_key = tuple_(sort_column, CompanyAnalysis.id)
+        
+        if after:
+            # Row-value comparison: a seek on the (created_at, id) or (score, id) index, no OFFSET
+            query = query.filter(sort_key < tuple_(*after))
+        elif offset:
+            query = query.offset(offset)
+        query = query.order_by(*(column.desc() for column in sort_key.clauses))
         
         # Optimize total count query - only run when needed (first page)
         total = None
         if offset == 0 and not cursor:
             # Only count on first page request for performance
-            count_query = db.query(CompanyAnalysis)
-            if search:
-                search_term = search.strip().lower()
-                from sqlalchemy import func, or_
-                exact_condition = or_(
-                    func.lower(CompanyAnalysis.company_name).like(f"%{search_term}%"),
-                    func.lower(CompanyAnalysis.canonical_name).like(f"%{search_term}%")
-                )
-                fuzzy_condition = or_(
-                    func.similarity(func.lower(CompanyAnalysis.company_name), search_term) > 0.3,
-                    func.similarity(func.lower(CompanyAnalysis.canonical_name), search_term) > 0.3
-                )
-                count_query = count_query.filter(or_(exact_condition, fuzzy_condition))
-            total = count_query.count()
+            total = db.query(CompanyAnalysis).filter(*filters).count()
         
-        # Apply pagination - use limit + 1 to check if there are more results
-        companies = query.offset(offset).limit(limit + 1).all()
+        # Use limit + 1 to check if there are more results
+        rows = query.limit(limit + 1).all()
         
         # Check if there are more results
-        has_more = len(companies) > limit
+        has_more = len(rows) > limit
         if has_more:
-            companies = companies[:limit]  # Remove the extra record
+            rows = rows[:limit]  # Remove the extra record
         
         # Convert to response format with optimized list comprehension
-        company_responses = [
-            CompanySearchResponse(
-                id=company.id,
-                company_name=company.company_name,
-                canonical_name=company.canonical_name,
-                analysis_result=company.analysis_result,
-                status=company.status,
-                created_at=company.created_at
-            )
-            for company in companies
-        ]
+        if projection is None:
+            company_responses = [
+                CompanySearchResponse(
+                    id=company.id,
+                    company_name=company.company_name,
+                    canonical_name=company.canonical_name,
+                    analysis_result=company.analysis_result,
+                    status=company.status,
+                    created_at=company.created_at
+                )
+                for company, _ in rows
+            ]
+        else:
+            company_responses = [
+                CompanySummary(id=row.id, **{name: row._mapping[name] for name in projection})
+                for row in rows
+            ]
         
         # Generate next cursor for pagination
         next_cursor = None
-        if has_more and companies:
-            next_cursor = str(companies[-1].id)
+        if has_more and rows:
+            last_sort_value = rows[-1].sort_value
+            next_cursor = _list_cursor(
+                listing,
+                last_sort_value.isoformat() if listing["order"] == "created_at" else last_sort_value,
+                company_responses[-1].id
+            )
         
         logger.info(f"Found {len(company_responses)} companies (has_more: {has_more})")
         
@@ -152,12 +244,36 @@ async def list_companies(
         if total is not None:
             response_data["total"] = total
         
+        if projection is not None:
+            # Serialized directly so fields that weren't requested stay out of the response
+            return JSONResponse(CompanyListResponse(**response_data).model_dump(mode="json", exclude_unset=True))
         return CompanyListResponse(**response_data)
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error listing companies: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@router.get("/suggest", response_model=CompanySuggestResponse)
+async def suggest_companies_endpoint(
+    q: str = Query(..., min_length=1, max_length=255, description="Company name prefix typed so far"),
+    limit: int = Query(10, ge=1, le=25, description="Number of suggestions to return"),
+    token: str = Depends(get_current_token),
+    db: Session = Depends(get_db)
+) -> CompanySuggestResponse:
+    """Typeahead suggestions by name prefix (ids and names only, from the in-memory name index)"""
+    
+    try:
+        suggestions = suggest_companies(db, q, limit)
+        return CompanySuggestResponse(suggestions=[
+            CompanySuggestion(id=company_id, company_name=company_name, canonical_name=canonical_name)
+            for company_id, company_name, canonical_name in suggestions
+        ])
+    except Exception as e:
+        logger.error(f"Error suggesting companies for '{q}': {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
 @router.post("/search", response_model=Union[CompanySearchResponse, CompanyNotFoundResponse])
 async def search_company_endpoint(
     request: CompanySearchRequest,
@@ -193,19 +309,10 @@ async def search_company_endpoint(
         logger.info(f"No existing record found for '{company_name}', generating new analysis...")
         
         try:
-            analysis_result = generate_company_analysis(company_name)
-            
-            # Save to database
-            company_record = save_company_analysis(db, company_name, company_name, analysis_result)
+            # Coalesced with concurrent searches/jobs for the same company, then saved
+            company_record = await get_or_create_analysis(company_name)
             
-            return CompanySearchResponse(
-                id=company_record.id,
-                company_name=company_record.company_name,
-                canonical_name=company_record.canonical_name,
-                analysis_result=company_record.analysis_result,
-                status=company_record.status,
-                created_at=company_record.created_at
-            )
+            return CompanySearchResponse(**company_record)
             
         except GeminiAPIError as e:
             logger.error(f"Gemini API error for '{company_name}': {e.message}")
@@ -220,20 +327,44 @@ async def search_company_endpoint(
         logger.error(f"Unexpected error in company search: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+def company_etag(company_id: int, created_at: datetime) -> str:
+    """Validator for a company analysis (rows are immutable once saved)"""
+    return f'"company-{company_id}-{int(created_at.timestamp() * 1000000)}"'
+
 @router.get("/{company_id}", response_model=CompanySearchResponse)
 async def get_company_analysis(
     company_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     token: str = Depends(get_current_token),
     db: Session = Depends(get_db)
 ) -> CompanySearchResponse:
-    """Get specific company analysis by ID"""
+    """Get specific company analysis by ID
+    
+    Conditional requests are answered with 304 before the analysis JSON is loaded.
+    """
     
     try:
-        company = db.query(CompanyAnalysis).filter(CompanyAnalysis.id == company_id).first()
+        created_at = db.query(CompanyAnalysis.created_at).filter(CompanyAnalysis.id == company_id).first()
         
+        if not created_at:
+            raise HTTPException(status_code=404, detail="Company analysis not found")
+        
+        cache_headers = {
+            "ETag": company_etag(company_id, created_at[0]),
+            "Cache-Control": f"private, max-age={COMPANY_DETAIL_MAX_AGE_SECONDS}"
+        }
+        if if_none_match and (
+            if_none_match.strip() == "*"
+            or cache_headers["ETag"] in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        ):
+            return Response(status_code=304, headers=cache_headers)
+        
+        company = db.query(CompanyAnalysis).filter(CompanyAnalysis.id == company_id).first()
         if not company:
             raise HTTPException(status_code=404, detail="Company analysis not found")
         
+        response.headers.update(cache_headers)
         return CompanySearchResponse(
             id=company.id,
             company_name=company.company_name,
@@ -268,21 +399,28 @@ async def search_company_async(
         
         logger.info(f"🚀 Starting async search for NEW company: '{company_name}' (not in database)")
         
-        # Create async job and start background processing
+        # Create durable job; any analysis worker (API or standalone) claims it
         # Frontend has already confirmed company doesn't exist in database
-        job_id = create_async_job(company_name)
+        job_id, queue_position = create_async_job(company_name)
         
         # Estimate completion time (5 minutes)
         estimated_completion = datetime.now(timezone.utc) + timedelta(minutes=5)
         
         return AsyncJobResponse(
             job_id=job_id,
-            status="processing",
-            progress_message="Starting company analysis...",
+            status="queued",
+            progress_message="Queued for analysis...",
             created_at=datetime.now(timezone.utc),
-            estimated_completion=estimated_completion
+            estimated_completion=estimated_completion,
+            queue_position=queue_position
         )
         
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=e.message,
+            headers={"Retry-After": str(e.retry_after)}
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -290,6 +428,64 @@ async def search_company_async(
         raise HTTPException(status_code=500, detail="Failed to start analysis")
 
 
+async def _start_batch(company_names: list) -> BatchStatus:
+    try:
+        batch_status = await asyncio.to_thread(create_batch, company_names)
+        return BatchStatus(**batch_status)
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=e.message,
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    except BatchTooLargeError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+    except Exception as e:
+        logger.error(f"Error starting batch: {e}")
+        raise HTTPException(status_code=500, detail="Failed to start batch")
+
+@router.post("/batch", response_model=BatchStatus)
+async def create_batch_endpoint(
+    request: BatchCreate,
+    token: str = Depends(get_current_token)
+) -> BatchStatus:
+    """Analyze a list of companies; names already in the database are not re-analyzed"""
+    if not any(name.strip() for name in request.company_names):
+        raise HTTPException(status_code=400, detail="No company names provided")
+    return await _start_batch(request.company_names)
+
+@router.post("/batch/csv", response_model=BatchStatus)
+async def create_batch_csv_endpoint(
+    file: UploadFile = File(..., description="CSV with a company_name column, or names in the first column"),
+    token: str = Depends(get_current_token)
+) -> BatchStatus:
+    """Analyze the companies listed in an uploaded CSV file"""
+    try:
+        company_names = parse_company_csv((await file.read()).decode("utf-8-sig"))
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="CSV must be UTF-8 encoded")
+    
+    if not any(name.strip() for name in company_names):
+        raise HTTPException(status_code=400, detail="No company names found in CSV")
+    return await _start_batch(company_names)
+
+@router.get("/batch/{batch_id}", response_model=BatchStatus)
+async def get_batch_status_endpoint(
+    batch_id: str,
+    token: str = Depends(get_current_token)
+) -> BatchStatus:
+    """Get per-company state and aggregate progress of a batch"""
+    try:
+        batch_status = await asyncio.to_thread(get_batch_status, batch_id)
+    except Exception as e:
+        logger.error(f"Error getting batch status: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+    
+    if not batch_status:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return BatchStatus(**batch_status)
+
+
 @router.get("/jobs/{job_id}/status", response_model=AsyncJobStatus)
 async def get_job_status_endpoint(
     job_id: str,
@@ -298,7 +494,7 @@ async def get_job_status_endpoint(
     """Get status of async job"""
     
     try:
-        job_status = get_job_status(job_id)
+        job_status = await asyncio.to_thread(get_job_status, job_id)
         
         if not job_status:
             raise HTTPException(status_code=404, detail="Job not found")
@@ -309,4 +505,96 @@ async def get_job_status_endpoint(
         raise
     except Exception as e:
         logger.error(f"Error getting job status: {e}")
-        raise HTTPException(status_code=500, detail="Internal server error")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.delete("/jobs/{job_id}", response_model=AsyncJobStatus)
+async def cancel_job_endpoint(
+    job_id: str,
+    token: str = Depends(get_current_token)
+) -> AsyncJobStatus:
+    """Cancel a queued or running job; its analysis stops and frees the worker slot"""
+    
+    try:
+        status = await asyncio.to_thread(cancel_job, job_id)
+        if status is None:
+            raise HTTPException(status_code=404, detail="Job not found")
+        if status != "cancelled":
+            raise HTTPException(status_code=409, detail=f"Job already {status}")
+        
+        job_status = await asyncio.to_thread(get_job_status, job_id)
+        if not job_status:
+            # Cancelled, but the job could not be read back (deleted or a DB error)
+            raise HTTPException(status_code=404, detail="Job not found")
+        
+        return AsyncJobStatus(**job_status)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error cancelling job {job_id}: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+def _sse_event(event: str, job_status: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {AsyncJobStatus(**job_status).model_dump_json()}\n\n"
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job_events_endpoint(
+    job_id: str,
+    request: Request,
+    token: str = Depends(get_current_token)
+) -> StreamingResponse:
+    """Stream job status changes as Server-Sent Events
+    
+    Sends the current status first, a 'progress' event per change, and a final
+    'complete' event (with company_id on success) once the job finishes, then closes.
+    """
+    # Subscribe before reading the snapshot so no transition falls in between
+    queue = job_events.subscribe(job_id)
+    try:
+        job_status = await asyncio.to_thread(get_job_status, job_id)
+    except Exception as e:
+        job_events.unsubscribe(job_id, queue)
+        logger.error(f"Error getting job status: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+    
+    if not job_status:
+        job_events.unsubscribe(job_id, queue)
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    async def event_stream() -> AsyncIterator[str]:
+        current = job_status
+        try:
+            if current["status"] in TERMINAL_JOB_STATUSES:
+                yield _sse_event("complete", current)
+                return
+            yield _sse_event("status", current)
+            
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                
+                if event["status"] in TERMINAL_JOB_STATUSES:
+                    # Events don't carry the result; read it once from the job row
+                    final_status = await asyncio.to_thread(get_job_status, job_id)
+                    yield _sse_event("complete", final_status or {**current, **event})
+                    return
+                
+                current = {**current, **event, "queue_position": None, "queue_depth": None}
+                yield _sse_event("progress", current)
+        finally:
+            job_events.unsubscribe(job_id, queue)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+            # Keeps GZipMiddleware from buffering the stream
+            "Content-Encoding": "identity"
+        }
+    )
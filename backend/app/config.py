@@ -16,14 +16,67 @@ class Settings:
     CLIENT_ID: str = os.getenv("CLIENT_ID", "")
     CLIENT_SECRET: str = os.getenv("CLIENT_SECRET", "")
     TOKEN_EXPIRE_HOURS: int = 24
+    TOKEN_CACHE_TTL_SECONDS: int = int(os.getenv("TOKEN_CACHE_TTL_SECONDS", "300"))
+    TOKEN_CACHE_MAX_SIZE: int = int(os.getenv("TOKEN_CACHE_MAX_SIZE", "10000"))
+    # "opaque" stores random tokens in access_tokens; "signed" issues HMAC-signed
+    # JWTs that are verified without a database read
+    TOKEN_MODE: str = os.getenv("TOKEN_MODE", "opaque").lower()
+    TOKEN_SIGNING_KEY: str = os.getenv("TOKEN_SIGNING_KEY", "")
+    TOKEN_SIGNING_ALGORITHM: str = "HS256"
+    TOKEN_REVOCATION_REFRESH_SECONDS: int = int(os.getenv("TOKEN_REVOCATION_REFRESH_SECONDS", "60"))
+    TOKEN_SWEEP_INTERVAL_SECONDS: int = int(os.getenv("TOKEN_SWEEP_INTERVAL_SECONDS", "900"))
+    TOKEN_SWEEP_BATCH_SIZE: int = int(os.getenv("TOKEN_SWEEP_BATCH_SIZE", "1000"))
     
     # Gemini
     GEMINI_API_KEY: str = os.getenv("GEMINI_API_KEY", "")
+    # Register the static prompt prefix as a cached context when supported
+    GEMINI_PROMPT_CACHE_ENABLED: bool = os.getenv("GEMINI_PROMPT_CACHE_ENABLED", "true").lower() == "true"
+    GEMINI_PROMPT_CACHE_TTL_SECONDS: int = int(os.getenv("GEMINI_PROMPT_CACHE_TTL_SECONDS", "3600"))
+    
+    # Analysis job queue (async_jobs table)
+    # Workers inside each API process; set to 0 to leave analysis to scripts/run_worker.py
+    ANALYSIS_MAX_CONCURRENCY: int = int(os.getenv("ANALYSIS_MAX_CONCURRENCY", "10"))
+    ANALYSIS_QUEUE_MAX_SIZE: int = int(os.getenv("ANALYSIS_QUEUE_MAX_SIZE", "100"))
+    ANALYSIS_QUEUE_RETRY_AFTER_SECONDS: int = int(os.getenv("ANALYSIS_QUEUE_RETRY_AFTER_SECONDS", "30"))
+    ANALYSIS_QUEUE_POLL_SECONDS: float = float(os.getenv("ANALYSIS_QUEUE_POLL_SECONDS", "2"))
+    ANALYSIS_JOB_LEASE_SECONDS: int = int(os.getenv("ANALYSIS_JOB_LEASE_SECONDS", "120"))
+    ANALYSIS_JOB_MAX_ATTEMPTS: int = int(os.getenv("ANALYSIS_JOB_MAX_ATTEMPTS", "3"))
+    # Wall-clock budget for one analysis (Gemini attempts, retries and back-off)
+    ANALYSIS_TIMEOUT_SECONDS: int = int(os.getenv("ANALYSIS_TIMEOUT_SECONDS", "540"))
+    # Running jobs are failed this long after they were claimed; queued ones after
+    # waiting ANALYSIS_JOB_QUEUE_TIMEOUT_SECONDS (0 lets them wait indefinitely)
+    ANALYSIS_JOB_DEADLINE_SECONDS: int = int(os.getenv("ANALYSIS_JOB_DEADLINE_SECONDS", "1800"))
+    ANALYSIS_JOB_QUEUE_TIMEOUT_SECONDS: int = int(os.getenv("ANALYSIS_JOB_QUEUE_TIMEOUT_SECONDS", "86400"))
+    JOB_RETENTION_DAYS: int = int(os.getenv("JOB_RETENTION_DAYS", "30"))
+    JOB_PURGE_BATCH_SIZE: int = int(os.getenv("JOB_PURGE_BATCH_SIZE", "1000"))
+    JOB_MAINTENANCE_INTERVAL_SECONDS: int = int(os.getenv("JOB_MAINTENANCE_INTERVAL_SECONDS", "300"))
+    # Companies saved by other processes are picked up by the name index at this interval
+    NAME_INDEX_REFRESH_SECONDS: int = int(os.getenv("NAME_INDEX_REFRESH_SECONDS", "30"))
+    # Deleted companies are dropped from the name index by the first refresh after this interval
+    NAME_INDEX_PRUNE_SECONDS: int = int(os.getenv("NAME_INDEX_PRUNE_SECONDS", "300"))
+    # Progress messages of running jobs are coalesced and written at this interval
+    JOB_PROGRESS_FLUSH_SECONDS: float = float(os.getenv("JOB_PROGRESS_FLUSH_SECONDS", "2"))
+    ANALYSIS_BATCH_MAX_SIZE: int = int(os.getenv("ANALYSIS_BATCH_MAX_SIZE", "1000"))
+    # Batches are admitted while fewer jobs than this are queued (single jobs stop at
+    # ANALYSIS_QUEUE_MAX_SIZE); an admitted batch may take the queue past it
+    ANALYSIS_BATCH_QUEUE_MAX_SIZE: int = int(os.getenv("ANALYSIS_BATCH_QUEUE_MAX_SIZE", "5000"))
+    # Names analysis failed for are not retried until their entry expires:
+    # names Gemini returned no usable analysis for, and API errors / timeouts
+    NEGATIVE_CACHE_TTL_SECONDS: int = int(os.getenv("NEGATIVE_CACHE_TTL_SECONDS", "86400"))
+    NEGATIVE_CACHE_ERROR_TTL_SECONDS: int = int(os.getenv("NEGATIVE_CACHE_ERROR_TTL_SECONDS", "300"))
+    NEGATIVE_CACHE_MAX_SIZE: int = int(os.getenv("NEGATIVE_CACHE_MAX_SIZE", "10000"))
     
     # App
     DEBUG: bool = os.getenv("DEBUG", "false").lower() == "true"
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
     
+    def validate(self) -> None:
+        """Reject configurations the API cannot run safely with"""
+        if self.TOKEN_MODE not in ("opaque", "signed"):
+            raise ValueError(f"TOKEN_MODE must be 'opaque' or 'signed', got '{self.TOKEN_MODE}'")
+        if self.TOKEN_MODE == "signed" and not self.TOKEN_SIGNING_KEY:
+            raise ValueError("TOKEN_SIGNING_KEY is required when TOKEN_MODE=signed")
+    
     @property
     def database_url(self) -> str:
         return f"postgresql+psycopg://{self.DATABASE_USER}:{self.DATABASE_PASSWORD}@{self.DATABASE_HOST}:{self.DATABASE_PORT}/{self.DATABASE_NAME}"
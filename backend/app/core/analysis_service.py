@@ -0,0 +1,102 @@
+import time
+import asyncio
+from typing import Dict, Any, Optional
+from app.database.connection import SessionLocal
+from app.database.models import CompanyAnalysis
+from app.core.gemini_client import generate_company_analysis_async
+from app.core.search_engine import search_company, save_company_analysis
+from app.core.single_flight import SingleFlight, analysis_claim
+from app.core.negative_cache import negative_cache
+from app.utils.helpers import normalize_company_name
+from app.utils.logger import logger
+from app.utils.exceptions import GeminiAPIError
+from app.config import settings
+
+# One in-flight analysis per normalized company name within this worker
+_analysis_flights = SingleFlight()
+
+# How long an analysis claim outlives its holder's deadline before others may take it
+ANALYSIS_CLAIM_GRACE_SECONDS = 30
+
+
+def company_to_result(company: CompanyAnalysis) -> Dict[str, Any]:
+    """Serialize a company analysis row for API responses and job results"""
+    return {
+        "id": company.id,
+        "company_name": company.company_name,
+        "canonical_name": company.canonical_name,
+        "analysis_result": company.analysis_result,
+        "status": company.status,
+        "created_at": company.created_at.isoformat()
+    }
+
+
+def find_existing_result(company_name: str) -> Optional[Dict[str, Any]]:
+    """Look up an existing analysis (exact and fuzzy match)"""
+    db = SessionLocal()
+    try:
+        search_result = search_company(db, company_name)
+        if search_result["found_existing"]:
+            return company_to_result(search_result["company"])
+        return None
+    finally:
+        db.close()
+
+
+def save_analysis_result(company_name: str, analysis_result: Dict[str, Any]) -> Dict[str, Any]:
+    """Persist a freshly generated analysis and return it serialized"""
+    db = SessionLocal()
+    try:
+        company_record = save_company_analysis(db, company_name, company_name, analysis_result)
+        result = company_to_result(company_record)
+    finally:
+        db.close()
+    negative_cache.forget(normalize_company_name(company_name))
+    return result
+
+
+async def raise_if_recently_failed(company_name: str, key: str) -> None:
+    """Fail fast with the cached error while a negative cache entry for key is live"""
+    failure = await asyncio.to_thread(negative_cache.get, key)
+    if failure:
+        logger.info(f"Skipping analysis of '{company_name}': failed recently ({failure['reason']})")
+        raise GeminiAPIError(
+            f"Analysis of '{company_name}' failed recently ({failure['reason']}): {failure['error_message']}"
+        )
+
+
+async def _analyze_exclusively(company_name: str, key: str, deadline: float) -> Dict[str, Any]:
+    """Generate and save an analysis while holding the cross-worker claim for key"""
+    claim_ttl = max(deadline - time.monotonic(), 0) + ANALYSIS_CLAIM_GRACE_SECONDS
+    async with analysis_claim(key, claim_ttl):
+        # Another worker may have finished this company while we waited for the claim
+        existing_result = await asyncio.to_thread(find_existing_result, company_name)
+        if existing_result:
+            logger.info(f"Analysis for '{company_name}' was completed by another worker")
+            return existing_result
+        # ... or failed it
+        await raise_if_recently_failed(company_name, key)
+
+        try:
+            analysis_result = await generate_company_analysis_async(company_name, deadline=deadline)
+        except GeminiAPIError as e:
+            await asyncio.to_thread(negative_cache.record, key, company_name, e)
+            raise
+        return await asyncio.to_thread(save_analysis_result, company_name, analysis_result)
+
+
+async def get_or_create_analysis(company_name: str, deadline: Optional[float] = None) -> Dict[str, Any]:
+    """Return an analysis for company_name, generating it at most once at a time
+
+    Concurrent sync searches and async jobs for the same normalized name share a
+    single Gemini call: within a worker through single-flight, across gunicorn
+    workers through a short-lived analysis_claims row followed by a re-check. The caller
+    that starts the analysis sets its time.monotonic() deadline (by default
+    ANALYSIS_TIMEOUT_SECONDS from now). Names whose analysis failed recently
+    raise GeminiAPIError straight away until their negative cache entry expires.
+    """
+    key = normalize_company_name(company_name)
+    await raise_if_recently_failed(company_name, key)
+    if deadline is None:
+        deadline = time.monotonic() + settings.ANALYSIS_TIMEOUT_SECONDS
+    return await _analysis_flights.do(key, lambda: _analyze_exclusively(company_name, key, deadline))
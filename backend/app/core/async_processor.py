@@ -1,14 +1,161 @@
+import time
 import uuid
-import threading
+import asyncio
 from datetime import datetime, timezone, timedelta
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Set, Tuple
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 from app.database.connection import SessionLocal
 from app.database.models import AsyncJob, CompanyAnalysis
-from app.core.gemini_client import generate_company_analysis
-from app.core.search_engine import search_company, save_company_analysis
+from app.core.analysis_service import find_existing_result, get_or_create_analysis
+from app.core.background import run_periodically
+from app.core.job_events import job_events, notify_job_event
+from app.core.job_state import job_states
+from app.core.job_queue import (
+    worker_prefix,
+    claim_next_job,
+    heartbeat_job,
+    release_job,
+    reclaim_expired_leases,
+    get_queue_stats,
+)
 from app.utils.logger import logger
-from app.utils.exceptions import GeminiAPIError
+from app.utils.exceptions import GeminiAPIError, QueueFullError
+from app.config import settings
+
+
+class AnalysisWorkerPool:
+    """Bounded pool of analysis workers consuming the durable async_jobs queue
+    
+    Each of max_concurrency workers claims one queued job at a time with
+    SELECT ... FOR UPDATE SKIP LOCKED, heartbeats its lease while the analysis
+    runs, and hands the job back to the queue if the pool is stopped. A reaper
+    requeues jobs whose worker died without releasing them. The same pool runs
+    inside API processes and in the standalone scripts/run_worker.py.
+    """
+    
+    def __init__(self, max_concurrency: int, poll_interval: float):
+        self.max_concurrency = max_concurrency
+        self.poll_interval = poll_interval
+        self._workers: List["asyncio.Task[None]"] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._active = 0
+        # Jobs this pool is running, so a cancel can stop them immediately
+        self._running: Dict[str, "asyncio.Task[None]"] = {}
+        self._cancelled: Set[str] = set()
+    
+    def start(self) -> None:
+        """Start worker and lease-reaper tasks on the running event loop (idempotent)"""
+        if self._workers or self.max_concurrency <= 0:
+            return
+        self._wakeup = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        job_events.add_handler(self._on_job_event)
+        # Taken here, in the serving process, not at import (which may precede a fork)
+        prefix = worker_prefix()
+        self._workers = [
+            loop.create_task(self._worker(f"{prefix}:{i}"), name=f"analysis-worker-{i}")
+            for i in range(self.max_concurrency)
+        ]
+        self._workers.append(loop.create_task(
+            run_periodically("job-lease-reaper", settings.ANALYSIS_JOB_LEASE_SECONDS / 2, reclaim_expired_leases),
+            name="job-lease-reaper"
+        ))
+        self._workers.append(loop.create_task(
+            run_periodically("job-progress-flush", settings.JOB_PROGRESS_FLUSH_SECONDS, job_states.flush),
+            name="job-progress-flush"
+        ))
+        logger.info(f"Started {self.max_concurrency} analysis workers ({prefix})")
+    
+    async def stop(self) -> None:
+        """Cancel workers; jobs they were running are released back to the queue"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+    
+    @property
+    def active(self) -> int:
+        return self._active
+    
+    def notify(self) -> None:
+        """Wake idle workers in this process after a job is enqueued"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+    
+    def _on_job_event(self, event: Dict[str, Any]) -> None:
+        """Stop the analysis of a job cancelled from any process"""
+        work = self._running.get(event["job_id"])
+        if event["status"] == "cancelled" and work is not None and not work.done():
+            logger.info(f"Stopping cancelled job {event['job_id']}")
+            self._cancelled.add(event["job_id"])
+            work.cancel()
+    
+    async def _worker(self, worker_id: str) -> None:
+        while True:
+            try:
+                claimed = await asyncio.to_thread(claim_next_job, worker_id)
+            except Exception as e:
+                logger.error(f"Worker {worker_id} failed to claim a job: {e}")
+                claimed = None
+            
+            if claimed is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            
+            job_id, company_name, created_at = claimed
+            job_states.track(job_id, "processing", "Starting company analysis...", created_at)
+            self._active += 1
+            try:
+                await self._run_job(job_id, company_name, worker_id)
+            except asyncio.CancelledError:
+                job_states.forget(job_id)
+                await asyncio.to_thread(release_job, job_id, worker_id)
+                raise
+            except Exception as e:
+                logger.error(f"Analysis worker error for job {job_id}: {e}")
+            finally:
+                job_states.forget(job_id)
+                self._active -= 1
+    
+    async def _run_job(self, job_id: str, company_name: str, worker_id: str) -> None:
+        """Process a claimed job while heartbeating its lease"""
+        deadline = time.monotonic() + settings.ANALYSIS_TIMEOUT_SECONDS
+        work = asyncio.create_task(process_company_analysis_async(job_id, company_name, deadline))
+        self._running[job_id] = work
+        lease_lost = False
+        
+        async def heartbeat() -> None:
+            nonlocal lease_lost
+            while True:
+                await asyncio.sleep(settings.ANALYSIS_JOB_LEASE_SECONDS / 3)
+                if not await asyncio.to_thread(heartbeat_job, job_id, worker_id):
+                    if not work.done():
+                        logger.warning(f"Worker {worker_id} lost lease on job {job_id}, abandoning it")
+                        lease_lost = True
+                        work.cancel()
+                    return
+        
+        heartbeat_task = asyncio.create_task(heartbeat())
+        try:
+            await work
+        except asyncio.CancelledError:
+            if not (lease_lost or job_id in self._cancelled):
+                raise
+        finally:
+            heartbeat_task.cancel()
+            self._running.pop(job_id, None)
+            self._cancelled.discard(job_id)
+
+
+analysis_pool = AnalysisWorkerPool(
+    max_concurrency=settings.ANALYSIS_MAX_CONCURRENCY,
+    poll_interval=settings.ANALYSIS_QUEUE_POLL_SECONDS
+)
 
 
 def generate_job_id() -> str:
@@ -16,8 +163,17 @@ def generate_job_id() -> str:
     return f"job_{uuid.uuid4().hex[:12]}"
 
 
-def create_async_job(company_name: str) -> str:
-    """Create new async job and return job_id"""
+def create_async_job(company_name: str) -> Tuple[str, int]:
+    """Create new queued job and return (job_id, queue_position)
+    
+    The job is durable: any worker process picks it up, and it survives API
+    restarts. Raises QueueFullError without creating a job when the queue is full.
+    """
+    queue_depth = get_queue_stats()["queue_depth"]
+    if queue_depth >= settings.ANALYSIS_QUEUE_MAX_SIZE:
+        logger.warning(f"Analysis queue full ({queue_depth}), rejecting '{company_name}'")
+        raise QueueFullError(retry_after=settings.ANALYSIS_QUEUE_RETRY_AFTER_SECONDS)
+    
     job_id = generate_job_id()
     
     db = SessionLocal()
@@ -25,35 +181,31 @@ def create_async_job(company_name: str) -> str:
         job = AsyncJob(
             job_id=job_id,
             company_name=company_name,
-            status="processing",
-            progress_message="Starting company analysis..."
+            status="queued",
+            progress_message="Queued for analysis..."
         )
         db.add(job)
         db.commit()
-        db.refresh(job)
         
         logger.info(f"🚀 Created async job: {job_id} for company: {company_name}")
         
-        # Start background processing
-        thread = threading.Thread(
-            target=process_company_analysis_async,
-            args=(job_id, company_name),
-            daemon=True
-        )
-        thread.start()
-        
-        return job_id
-        
     except Exception as e:
         db.rollback()
         logger.error(f"Failed to create async job: {e}")
         raise
     finally:
         db.close()
+    
+    analysis_pool.notify()
+    return job_id, queue_depth + 1
 
 
 def get_job_status(job_id: str) -> Optional[Dict[str, Any]]:
-    """Get current job status"""
+    """Get current job status (from memory for jobs this process is running)"""
+    local_state = job_states.get(job_id)
+    if local_state:
+        return local_state
+    
     db = SessionLocal()
     try:
         job = db.query(AsyncJob).filter(AsyncJob.job_id == job_id).first()
@@ -68,8 +220,13 @@ def get_job_status(job_id: str) -> Optional[Dict[str, Any]]:
             "completed_at": job.completed_at
         }
         
-        if job.status == "completed" and job.result:
-            result["result"] = job.result
+        if job.status == "queued":
+            result.update(get_queue_stats(job.created_at))
+        elif job.status == "completed":
+            # The analysis itself is served by GET /companies/{company_id}
+            result["company_id"] = job.company_id
+            if job.company_id is None and job.result:
+                result["result"] = job.result
         elif job.status == "failed" and job.error_message:
             result["error_message"] = job.error_message
             
@@ -82,15 +239,32 @@ def get_job_status(job_id: str) -> Optional[Dict[str, Any]]:
         db.close()
 
 
-def update_job_progress(job_id: str, progress_message: str) -> None:
-    """Update job progress message"""
+async def update_job_progress(job_id: str, progress_message: str) -> None:
+    """Update job progress message
+    
+    For jobs this process is running the message is coalesced in memory and
+    written by the periodic flush; otherwise it is written immediately, in the
+    default thread pool.
+    """
+    if job_states.set_progress(job_id, progress_message):
+        logger.info(f"📝 Job {job_id} progress: {progress_message}")
+        return
+    
+    await asyncio.to_thread(_write_job_progress, job_id, progress_message)
+
+
+def _write_job_progress(job_id: str, progress_message: str) -> None:
     db = SessionLocal()
     try:
-        job = db.query(AsyncJob).filter(AsyncJob.job_id == job_id).first()
-        if job:
-            job.progress_message = progress_message
-            db.commit()
-            logger.info(f"📝 Job {job_id} progress: {progress_message}")
+        db.execute(
+            update(AsyncJob)
+            .where(AsyncJob.job_id == job_id)
+            .values(progress_message=progress_message)
+        )
+        event = notify_job_event(db, job_id, "processing", progress_message)
+        db.commit()
+        job_events.publish_local(event)
+        logger.info(f"📝 Job {job_id} progress: {progress_message}")
     except Exception as e:
         logger.error(f"Error updating job progress: {e}")
         db.rollback()
@@ -98,110 +272,94 @@ def update_job_progress(job_id: str, progress_message: str) -> None:
         db.close()
 
 
-def complete_job_success(job_id: str, result: Dict[str, Any]) -> None:
-    """Mark job as completed with result"""
+def _finish_job(job_id: str, status: str, progress_message: str, **values: Any) -> bool:
+    """Write a terminal transition synchronously in one UPDATE
+    
+    Returns False if the job is no longer processing, e.g. it was cancelled or
+    failed by the deadline sweep meanwhile; that outcome is kept.
+    """
+    # Pending progress for the job is superseded by the terminal state
+    job_states.forget(job_id)
+    
     db = SessionLocal()
     try:
-        job = db.query(AsyncJob).filter(AsyncJob.job_id == job_id).first()
-        if job:
-            job.status = "completed"
-            job.result = result
-            job.completed_at = datetime.now(timezone.utc)
-            job.progress_message = "Analysis completed successfully"
+        matched = db.execute(
+            update(AsyncJob)
+            .where(AsyncJob.job_id == job_id, AsyncJob.status == "processing")
+            .values(
+                status=status,
+                progress_message=progress_message,
+                completed_at=datetime.now(timezone.utc),
+                lease_expires_at=None,
+                **values
+            )
+        ).rowcount
+        if not matched:
             db.commit()
-            logger.info(f"✅ Job {job_id} completed successfully")
-    except Exception as e:
-        logger.error(f"Error completing job: {e}")
+            return False
+        event = notify_job_event(db, job_id, status, progress_message, values.get("error_message"))
+        db.commit()
+        job_events.publish_local(event)
+        return True
+    except Exception:
         db.rollback()
+        raise
     finally:
         db.close()
 
 
+def complete_job_success(job_id: str, company_id: int) -> None:
+    """Mark job as completed, referencing the company analysis it produced"""
+    try:
+        if _finish_job(job_id, "completed", "Analysis completed successfully", company_id=company_id):
+            logger.info(f"✅ Job {job_id} completed successfully")
+    except Exception as e:
+        logger.error(f"Error completing job: {e}")
+
+
 def complete_job_failure(job_id: str, error_message: str) -> None:
     """Mark job as failed with error"""
-    db = SessionLocal()
     try:
-        job = db.query(AsyncJob).filter(AsyncJob.job_id == job_id).first()
-        if job:
-            job.status = "failed"
-            job.error_message = error_message
-            job.completed_at = datetime.now(timezone.utc)
-            job.progress_message = "Analysis failed"
-            db.commit()
+        if _finish_job(job_id, "failed", "Analysis failed", error_message=error_message):
             logger.error(f"❌ Job {job_id} failed: {error_message}")
     except Exception as e:
         logger.error(f"Error marking job as failed: {e}")
-        db.rollback()
-    finally:
-        db.close()
 
 
-def process_company_analysis_async(job_id: str, company_name: str) -> None:
-    """Background processing of company analysis"""
+async def process_company_analysis_async(job_id: str, company_name: str, deadline: Optional[float] = None) -> None:
+    """Background processing of company analysis
+    
+    Database work is short and runs in the default thread pool; the long-running
+    Gemini call is awaited directly so many jobs can share one event loop.
+    Concurrent jobs and searches for the same company share one analysis.
+    """
     try:
         logger.info(f"🔄 Starting background processing for job {job_id}: {company_name}")
         
         # Update progress
-        update_job_progress(job_id, "Checking existing records...")
+        await update_job_progress(job_id, "Checking existing records...")
         
-        # Check for existing records (same logic as synchronous version)
-        db = SessionLocal()
-        try:
-            search_result = search_company(db, company_name)
-            
-            if search_result["found_existing"]:
-                logger.info(f"Found existing analysis for '{company_name}' in job {job_id}")
-                company = search_result["company"]
-                
-                result = {
-                    "id": company.id,
-                    "company_name": company.company_name,
-                    "canonical_name": company.canonical_name,
-                    "analysis_result": company.analysis_result,
-                    "status": company.status,
-                    "created_at": company.created_at.isoformat()
-                }
-                
-                complete_job_success(job_id, result)
-                return
-                
-        finally:
-            db.close()
+        # Check for existing records
+        existing_result = await asyncio.to_thread(find_existing_result, company_name)
+        if existing_result:
+            logger.info(f"Found existing analysis for '{company_name}' in job {job_id}")
+            await asyncio.to_thread(complete_job_success, job_id, existing_result["id"])
+            return
         
-        # Generate new analysis
-        update_job_progress(job_id, "Generating AI analysis with Gemini...")
+        # Generate new analysis (shared with any concurrent search for the same company)
+        await update_job_progress(job_id, "Generating AI analysis with Gemini...")
         logger.info(f"Generating new analysis for '{company_name}' in job {job_id}")
         
-        # This is the long-running Gemini call that was causing timeouts
-        analysis_result = generate_company_analysis(company_name)
-        
-        update_job_progress(job_id, "Saving analysis to database...")
-        
-        # Save to database
-        db = SessionLocal()
-        try:
-            company_record = save_company_analysis(db, company_name, company_name, analysis_result)
-            
-            result = {
-                "id": company_record.id,
-                "company_name": company_record.company_name,
-                "canonical_name": company_record.canonical_name,
-                "analysis_result": company_record.analysis_result,
-                "status": company_record.status,
-                "created_at": company_record.created_at.isoformat()
-            }
-            
-            complete_job_success(job_id, result)
-            
-        finally:
-            db.close()
+        # Long-running Gemini call, awaited without blocking the event loop
+        result = await get_or_create_analysis(company_name, deadline)
+        await asyncio.to_thread(complete_job_success, job_id, result["id"])
             
     except GeminiAPIError as e:
         error_msg = f"Gemini API error: {e.message}"
         logger.error(f"Job {job_id} failed: {error_msg}")
-        complete_job_failure(job_id, error_msg)
+        await asyncio.to_thread(complete_job_failure, job_id, error_msg)
         
     except Exception as e:
         error_msg = f"Unexpected error: {str(e)}"
         logger.error(f"Job {job_id} failed: {error_msg}")
-        complete_job_failure(job_id, error_msg)
\ No newline at end of file
+        await asyncio.to_thread(complete_job_failure, job_id, error_msg)
@@ -1,12 +1,26 @@
-from typing import Dict, Optional, Any
+import time
+import uuid
+from typing import Dict, FrozenSet, Optional, Any, Tuple, Type
 from datetime import datetime, timedelta, timezone
+from jose import jwt, JWTError
+from sqlalchemy import delete, func, select
 from sqlalchemy.orm import Session
 from app.config import settings
 from app.utils.helpers import generate_token, is_token_expired
 from app.utils.exceptions import AuthenticationError
 from app.utils.logger import logger
-from app.database.connection import SessionLocal
-from app.database.models import AccessToken
+from app.database.connection import Base, SessionLocal
+from app.database.models import AccessToken, RevokedToken
+from app.utils.cache import TTLCache
+
+# Validated tokens -> client_id, bounded by each token's expires_at
+_token_cache: TTLCache[str] = TTLCache(
+    max_size=settings.TOKEN_CACHE_MAX_SIZE,
+    ttl_seconds=settings.TOKEN_CACHE_TTL_SECONDS
+)
+
+# jti values of revoked signed tokens, refreshed periodically from revoked_tokens
+_revoked_jtis: FrozenSet[str] = frozenset()
 
 def authenticate_credentials(client_id: str, client_secret: str) -> bool:
     """Validate client credentials"""
@@ -21,11 +35,21 @@ def create_access_token(client_id: str, client_secret: str) -> Dict[str, Any]:
         logger.warning(f"Failed authentication attempt for client_id: {client_id}")
         raise AuthenticationError("Invalid credentials")
     
-    token = generate_token()
     # Use timezone-aware UTC to match database timezone handling
     now_utc = datetime.now(timezone.utc)
     expires_at = now_utc + timedelta(hours=settings.TOKEN_EXPIRE_HOURS)
     
+    if settings.TOKEN_MODE == "signed":
+        token = create_signed_token(client_id, now_utc, expires_at)
+        logger.info(f"Signed token created for client_id: {client_id}, expires at: {expires_at} UTC")
+        return {
+            "access_token": token,
+            "token_type": "bearer",
+            "expires_in": settings.TOKEN_EXPIRE_HOURS * 3600
+        }
+    
+    token = generate_token()
+    
     # Store token in database
     db = SessionLocal()
     try:
@@ -51,75 +75,185 @@ def create_access_token(client_id: str, client_secret: str) -> Dict[str, Any]:
     finally:
         db.close()
 
+def create_signed_token(client_id: str, issued_at: datetime, expires_at: datetime) -> str:
+    """Issue an HMAC-signed JWT carrying client_id and expiry"""
+    payload = {
+        "sub": client_id,
+        "jti": uuid.uuid4().hex,
+        "iat": int(issued_at.timestamp()),
+        "exp": int(expires_at.timestamp())
+    }
+    return jwt.encode(payload, settings.TOKEN_SIGNING_KEY, algorithm=settings.TOKEN_SIGNING_ALGORITHM)
+
+def decode_signed_token(token: str, verify_exp: bool = True) -> Optional[Dict[str, Any]]:
+    """Verify signature (and expiry) of a signed token, returning its claims"""
+    try:
+        return jwt.decode(
+            token,
+            settings.TOKEN_SIGNING_KEY,
+            algorithms=[settings.TOKEN_SIGNING_ALGORITHM],
+            options={"verify_exp": verify_exp}
+        )
+    except JWTError as e:
+        logger.warning(f"Signed token rejected: {e}")
+        return None
+
+def is_signed_token(token: str) -> bool:
+    """Signed tokens are JWTs (three dot-separated segments); opaque tokens contain no dots"""
+    return token.count(".") == 2
+
+def refresh_revoked_tokens() -> None:
+    """Reload the revocation set for signed tokens from the database"""
+    global _revoked_jtis
+    db = SessionLocal()
+    try:
+        current_time = datetime.now(timezone.utc)
+        rows = db.query(RevokedToken.jti).filter(RevokedToken.expires_at > current_time).all()
+        _revoked_jtis = frozenset(row.jti for row in rows)
+        logger.debug(f"Loaded {len(_revoked_jtis)} revoked token ids")
+    finally:
+        db.close()
+
 def validate_token(token: str) -> bool:
-    """Validate access token"""
-    logger.info(f"🔍 VALIDATING TOKEN: '{token}' (length: {len(token)})")
+    """Validate access token
+    
+    Validated tokens are cached in-process until the cache TTL or the token's
+    own expiry, whichever comes first, so cache hits never touch the database.
+    In signed mode, JWTs are verified purely in CPU against the revocation set;
+    in opaque mode they are looked up like any other token and not found.
+    """
+    if settings.TOKEN_MODE == "signed" and is_signed_token(token):
+        claims = decode_signed_token(token)
+        if not claims:
+            return False
+        if claims.get("jti") in _revoked_jtis:
+            logger.warning(f"Revoked signed token used by client_id: {claims.get('sub')}")
+            return False
+        return True
+    
+    if _token_cache.get(token) is not None:
+        return True
     
     db = SessionLocal()
     try:
-        # Test database connection first
-        logger.info(f"📊 Database connection established for token validation")
-        
-        # Log all tokens in database for comparison
-        all_tokens = db.query(AccessToken).all()
-        logger.info(f"📋 Found {len(all_tokens)} tokens in database:")
-        for i, t in enumerate(all_tokens):
-            logger.info(f"  {i+1}. Token: '{t.token}' (len: {len(t.token)}, expires: {t.expires_at})")
-            # Character-by-character comparison for debugging
-            if t.token == token:
-                logger.info(f"  ✅ EXACT MATCH found for token {i+1}")
-            else:
-                logger.info(f"  ❌ No match - comparing chars:")
-                min_len = min(len(token), len(t.token))
-                for j in range(min_len):
-                    if token[j] != t.token[j]:
-                        logger.info(f"    Diff at pos {j}: incoming='{token[j]}' vs db='{t.token[j]}'")
-                        break
-        
-        # Perform the actual query
-        db_token = db.query(AccessToken).filter(AccessToken.token == token).first()
+        # Single lookup on the unique token index
+        db_token = db.query(AccessToken.client_id, AccessToken.expires_at).filter(
+            AccessToken.token == token
+        ).first()
         
         if not db_token:
-            logger.error(f"❌ TOKEN NOT FOUND: '{token}' (checked {len(all_tokens)} database tokens)")
+            logger.warning(f"Token not found: {token[:10]}...")
             return False
         
         # Check if token is expired (use timezone-aware UTC to match database)
         current_time = datetime.now(timezone.utc)
-        logger.info(f"⏰ Time check: current={current_time} UTC, expires={db_token.expires_at}")
-        
         if current_time > db_token.expires_at:
-            logger.error(f"⏰ TOKEN EXPIRED: {token[:10]}... (current: {current_time} UTC, expired at: {db_token.expires_at})")
+            logger.warning(f"Token expired: {token[:10]}... (expired at: {db_token.expires_at})")
             # Clean up expired token
-            db.delete(db_token)
+            db.query(AccessToken).filter(AccessToken.token == token).delete(synchronize_session=False)
             db.commit()
             return False
         
-        logger.info(f"✅ TOKEN VALIDATED SUCCESSFULLY: {token[:10]}... (current: {current_time} UTC, expires at: {db_token.expires_at})")
+        _token_cache.set(token, db_token.client_id, expires_at=db_token.expires_at.timestamp())
         return True
     except Exception as e:
-        logger.error(f"💥 Error validating token: {e}")
-        import traceback
-        logger.error(f"💥 Traceback: {traceback.format_exc()}")
+        logger.error(f"Error validating token: {e}")
         return False
     finally:
         db.close()
 
-def cleanup_expired_tokens() -> None:
-    """Clean up expired tokens"""
-    db = SessionLocal()
-    try:
-        # Use timezone-aware UTC to match database timezone
-        current_time = datetime.now(timezone.utc)
-        expired_tokens = db.query(AccessToken).filter(AccessToken.expires_at < current_time).all()
+def invalidate_token(token: str) -> None:
+    """Drop a token from the validation cache
+    
+    Only affects this process; other workers drop it when their cache TTL lapses.
+    """
+    _token_cache.invalidate(token)
+
+def revoke_token(token: str) -> bool:
+    """Revoke an access token
+    
+    Opaque tokens are deleted and dropped from the validation cache. Signed tokens
+    are recorded in revoked_tokens; other workers pick this up on their next
+    revocation refresh.
+    """
+    global _revoked_jtis
+    if settings.TOKEN_MODE == "signed" and is_signed_token(token):
+        claims = decode_signed_token(token, verify_exp=False)
+        if not claims or not claims.get("jti"):
+            return False
         
-        if expired_tokens:
-            count = len(expired_tokens)
-            for token in expired_tokens:
-                db.delete(token)
+        db = SessionLocal()
+        try:
+            db.add(RevokedToken(
+                jti=claims["jti"],
+                client_id=claims.get("sub", ""),
+                expires_at=datetime.fromtimestamp(claims["exp"], tz=timezone.utc)
+            ))
             db.commit()
-            logger.info(f"Cleaned up {count} expired tokens")
+            _revoked_jtis = _revoked_jtis | {claims["jti"]}
+            logger.info(f"Revoked signed token for client_id: {claims.get('sub')}")
+            return True
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error revoking signed token: {e}")
+            return False
+        finally:
+            db.close()
+    
+    invalidate_token(token)
+    db = SessionLocal()
+    try:
+        deleted = db.query(AccessToken).filter(AccessToken.token == token).delete(synchronize_session=False)
+        db.commit()
+        if deleted:
+            logger.info(f"Revoked token: {token[:10]}...")
+        return bool(deleted)
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error revoking token: {e}")
+        return False
+    finally:
+        db.close()
+
+def _delete_expired_batch(db: Session, model: Type[Base], batch_size: int) -> int:
+    """Delete one batch of expired rows, skipping rows another sweeper holds"""
+    expired_ids = (
+        select(model.id)
+        .where(model.expires_at < func.now())
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    result = db.execute(
+        delete(model)
+        .where(model.id.in_(expired_ids.scalar_subquery()))
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount
+
+def cleanup_expired_tokens(batch_size: int = settings.TOKEN_SWEEP_BATCH_SIZE) -> Tuple[int, float]:
+    """Delete expired access tokens and revocations in batches
+    
+    Each batch is a short transaction driven by the expires_at index.
+    Returns the number of rows removed and the elapsed time in seconds.
+    """
+    start_time = time.monotonic()
+    deleted = 0
+    db = SessionLocal()
+    try:
+        for model in (AccessToken, RevokedToken):
+            while True:
+                batch_deleted = _delete_expired_batch(db, model, batch_size)
+                deleted += batch_deleted
+                if batch_deleted < batch_size:
+                    break
     except Exception as e:
         logger.error(f"Error cleaning up expired tokens: {e}")
         db.rollback()
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+    
+    elapsed = time.monotonic() - start_time
+    if deleted:
+        logger.info(f"Cleaned up {deleted} expired tokens in {elapsed * 1000:.1f}ms")
+    return deleted, elapsed
@@ -0,0 +1,34 @@
+import asyncio
+from typing import Any, Callable, List
+from app.utils.logger import logger
+
+# Long-lived tasks started from the FastAPI lifespan
+_background_tasks: List["asyncio.Task[None]"] = []
+
+
+async def run_periodically(name: str, interval_seconds: float, func: Callable[[], Any]) -> None:
+    """Run a blocking function every interval in the default thread pool"""
+    while True:
+        try:
+            await asyncio.to_thread(func)
+        except Exception as e:
+            logger.error(f"Background task '{name}' failed: {e}")
+        await asyncio.sleep(interval_seconds)
+
+
+def start_periodic_task(name: str, interval_seconds: float, func: Callable[[], Any]) -> None:
+    """Schedule a periodic task on the running event loop"""
+    task = asyncio.get_running_loop().create_task(
+        run_periodically(name, interval_seconds, func),
+        name=name
+    )
+    _background_tasks.append(task)
+    logger.info(f"Started background task '{name}' (every {interval_seconds}s)")
+
+
+async def stop_background_tasks() -> None:
+    """Cancel all background tasks and wait for them to exit"""
+    for task in _background_tasks:
+        task.cancel()
+    await asyncio.gather(*_background_tasks, return_exceptions=True)
+    _background_tasks.clear()
@@ -0,0 +1,182 @@
+import csv
+import io
+import uuid
+from typing import Dict, Any, List, Iterable, Optional
+from sqlalchemy import text, insert, select
+from app.database.connection import SessionLocal
+from app.database.models import AsyncJob, AnalysisBatch, CompanyAlias
+from app.core.async_processor import analysis_pool, generate_job_id
+from app.core.job_queue import get_queue_stats
+from app.utils.helpers import normalize_company_name
+from app.utils.logger import logger
+from app.utils.exceptions import BatchTooLargeError, QueueFullError
+from app.config import settings
+
+# Header names recognised as the company column in uploaded CSVs
+CSV_NAME_COLUMNS = ("company_name", "company", "name", "company name")
+
+BATCH_ITEM_STATUSES = ("existing", "queued", "processing", "completed", "failed", "cancelled")
+
+
+def generate_batch_id() -> str:
+    """Generate unique batch ID"""
+    return f"batch_{uuid.uuid4().hex[:12]}"
+
+
+def unique_company_names(company_names: Iterable[str]) -> List[str]:
+    """Strip names and drop blanks and duplicates (by normalized name), keeping order"""
+    seen = set()
+    names = []
+    for name in company_names:
+        name = (name or "").strip()
+        key = normalize_company_name(name)
+        if key and key not in seen:
+            seen.add(key)
+            names.append(name)
+    return names
+
+
+def parse_company_csv(content: str) -> List[str]:
+    """Company names from CSV text: a recognised header column, else the first column"""
+    rows = [row for row in csv.reader(io.StringIO(content)) if row]
+    if not rows:
+        return []
+
+    header = [cell.strip().lower() for cell in rows[0]]
+    for column in CSV_NAME_COLUMNS:
+        if column in header:
+            index = header.index(column)
+            return [row[index] for row in rows[1:] if len(row) > index]
+    return [row[0] for row in rows]
+
+
+def create_batch(company_names: List[str]) -> Dict[str, Any]:
+    """Create a batch: dedupe against existing analyses, queue one job per miss
+
+    Existing analyses (by company alias) and jobs already queued or running for
+    a name (by normalized name, as single-flight keys analyses) are matched with
+    one query each and reused; all new jobs are inserted in a single statement.
+    Batches are admitted by the number of jobs already waiting, against their
+    own ANALYSIS_BATCH_QUEUE_MAX_SIZE, so a batch may be larger than the queue
+    limit for single jobs.
+    """
+    names = unique_company_names(company_names)
+    if len(names) > settings.ANALYSIS_BATCH_MAX_SIZE:
+        raise BatchTooLargeError(
+            f"Batch has {len(names)} companies, the maximum is {settings.ANALYSIS_BATCH_MAX_SIZE}"
+        )
+
+    aliases = [normalize_company_name(name) for name in names]
+    batch_id = generate_batch_id()
+
+    db = SessionLocal()
+    try:
+        # Most recent analysis per alias
+        by_alias: Dict[str, int] = {}
+        for row in db.execute(
+            select(CompanyAlias.alias, CompanyAlias.company_id)
+            .where(CompanyAlias.alias.in_(aliases))
+            .order_by(CompanyAlias.company_id.desc())
+        ):
+            by_alias.setdefault(row.alias, row.company_id)
+
+        # Normalized in Python: in-flight jobs are bounded by the queue size plus the workers
+        in_flight: Dict[str, str] = {}
+        for row in db.execute(
+            text("SELECT company_name, job_id FROM async_jobs WHERE status IN ('queued', 'processing')")
+        ):
+            in_flight.setdefault(normalize_company_name(row.company_name), row.job_id)
+
+        items = []
+        new_jobs = []
+        for name, alias in zip(names, aliases):
+            company_id = by_alias.get(alias)
+            job_id = None if company_id else in_flight.get(alias)
+            if not company_id and not job_id:
+                job_id = generate_job_id()
+                new_jobs.append({
+                    "job_id": job_id,
+                    "company_name": name,
+                    "status": "queued",
+                    "progress_message": "Queued for analysis..."
+                })
+            items.append({"company_name": name, "company_id": company_id, "job_id": job_id})
+
+        if new_jobs:
+            queue_depth = get_queue_stats()["queue_depth"]
+            if queue_depth >= settings.ANALYSIS_BATCH_QUEUE_MAX_SIZE:
+                logger.warning(f"Analysis queue full ({queue_depth}), rejecting batch of {len(new_jobs)} new jobs")
+                raise QueueFullError(retry_after=settings.ANALYSIS_QUEUE_RETRY_AFTER_SECONDS)
+            db.execute(insert(AsyncJob), new_jobs)
+        db.add(AnalysisBatch(batch_id=batch_id, items=items, total=len(items)))
+        db.commit()
+
+        logger.info(
+            f"📦 Created batch {batch_id}: {len(items)} companies, "
+            f"{len(items) - len(new_jobs)} reused, {len(new_jobs)} queued"
+        )
+    except (BatchTooLargeError, QueueFullError):
+        db.rollback()
+        raise
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Failed to create batch: {e}")
+        raise
+    finally:
+        db.close()
+
+    if new_jobs:
+        analysis_pool.notify()
+    return get_batch_status(batch_id)
+
+
+def get_batch_status(batch_id: str) -> Optional[Dict[str, Any]]:
+    """Per-item state and aggregate counts for a batch (two queries)"""
+    db = SessionLocal()
+    try:
+        batch = db.query(AnalysisBatch).filter(AnalysisBatch.batch_id == batch_id).first()
+        if not batch:
+            return None
+
+        job_ids = [item["job_id"] for item in batch.items if item.get("job_id")]
+        jobs = {}
+        if job_ids:
+            jobs = {
+                row.job_id: row
+                for row in db.execute(
+                    select(AsyncJob.job_id, AsyncJob.status, AsyncJob.error_message, AsyncJob.company_id)
+                    .where(AsyncJob.job_id.in_(job_ids))
+                )
+            }
+
+        counts = {status: 0 for status in BATCH_ITEM_STATUSES}
+        items = []
+        for item in batch.items:
+            entry = {
+                "company_name": item["company_name"],
+                "company_id": item.get("company_id"),
+                "job_id": item.get("job_id")
+            }
+            job = jobs.get(item.get("job_id"))
+            if entry["company_id"]:
+                entry["status"] = "existing"
+            elif job is None:
+                entry["status"] = "failed"
+                entry["error_message"] = "Job no longer exists"
+            else:
+                entry["status"] = job.status
+                entry["company_id"] = job.company_id
+                entry["error_message"] = job.error_message
+            counts[entry["status"]] = counts.get(entry["status"], 0) + 1
+            items.append(entry)
+
+        return {
+            "batch_id": batch.batch_id,
+            "total": batch.total,
+            "counts": counts,
+            "done": counts["queued"] == 0 and counts["processing"] == 0,
+            "created_at": batch.created_at,
+            "items": items
+        }
+    finally:
+        db.close()
@@ -1,22 +1,200 @@
 import json
 import time
 import re
-import json
-from typing import Dict, Any, Optional
+import asyncio
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Dict, Any, Iterator, List, Optional, Set, Tuple
 from google import genai
 from google.genai import types
 from app.config import settings
 from app.utils.logger import logger
 from app.utils.helpers import exponential_backoff_delay
-from app.utils.exceptions import GeminiAPIError
+from app.utils.exceptions import GeminiAPIError, AnalysisDeadlineError, CompanyUnresolvedError
+
+GEMINI_MODEL = "gemini-2.5-flash"
+
+# Back-off before retrying context cache creation after a failure
+PROMPT_CACHE_RETRY_SECONDS = 600
 
-# Global variable to store current API key
-current_gemini_api_key = settings.GEMINI_API_KEY
+class GeminiClientPool:
+    """Process-wide, long-lived Gemini clients keyed by API key
+    
+    Each genai.Client owns pooled sync and async HTTP connections, so reusing it
+    across analyses avoids a fresh connection and TLS handshake per call. Calls
+    borrow the current client through use_client()/use_client_async(). Key
+    rotation swaps the current client atomically: calls already in flight finish
+    on the old client, which is closed once the last of them returns it, while
+    new calls get the new one.
+    
+    The pool also holds the cached-context handle for the static prompt prefix,
+    per API key, so each analysis only uploads the company name.
+    """
+    
+    def __init__(self, api_key: str):
+        self._lock = threading.Lock()
+        self._prompt_cache_lock = threading.Lock()
+        self._api_key = api_key
+        self._clients: Dict[str, genai.Client] = {}
+        # Client -> calls currently using it; retired clients stay here until drained
+        self._in_use: Dict[genai.Client, int] = {}
+        # API key -> (cached content name, monotonic refresh deadline)
+        self._prompt_caches: Dict[str, Tuple[str, float]] = {}
+        self._prompt_cache_retry_at = 0.0
+        self._closing: Set["asyncio.Task[None]"] = set()
+    
+    @property
+    def api_key(self) -> str:
+        return self._api_key
+    
+    def _acquire(self) -> genai.Client:
+        with self._lock:
+            client = self._clients.get(self._api_key)
+            if client is None:
+                client = genai.Client(api_key=self._api_key)
+                self._clients[self._api_key] = client
+            self._in_use[client] = self._in_use.get(client, 0) + 1
+            return client
+    
+    def _release(self, client: genai.Client) -> bool:
+        """Return a borrowed client; True if it was retired and is now unused"""
+        with self._lock:
+            remaining = self._in_use[client] - 1
+            if remaining:
+                self._in_use[client] = remaining
+                return False
+            del self._in_use[client]
+            return self._clients.get(self._api_key) is not client
+    
+    @contextmanager
+    def use_client(self) -> Iterator[genai.Client]:
+        """Borrow the client for the current API key for the duration of a call"""
+        client = self._acquire()
+        try:
+            yield client
+        finally:
+            if self._release(client):
+                # Async connections can only be closed on an event loop; this
+                # client's are released when it is garbage collected
+                _close_client(client)
+    
+    @asynccontextmanager
+    async def use_client_async(self) -> AsyncIterator[genai.Client]:
+        """use_client() for calls through client.aio"""
+        client = self._acquire()
+        try:
+            yield client
+        finally:
+            if self._release(client):
+                await _aclose_client(client)
+    
+    def rotate(self, new_api_key: str) -> None:
+        """Switch to a new API key, retiring clients for previous keys
+        
+        Retired clients no call is using are closed now; the others when their
+        last in-flight call returns them.
+        """
+        # Build outside the lock so callers are never blocked on client setup
+        new_client = genai.Client(api_key=new_api_key)
+        with self._lock:
+            idle = [client for client in self._clients.values() if client not in self._in_use]
+            self._api_key = new_api_key
+            self._clients = {new_api_key: new_client}
+            self._prompt_caches = {}
+            self._prompt_cache_retry_at = 0.0
+        
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        for client in idle:
+            if loop is None:
+                _close_client(client)
+                continue
+            task = loop.create_task(_aclose_client(client))
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
+    
+    def _cached_prompt_name(self, api_key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._prompt_caches.get(api_key)
+            if entry and entry[1] > time.monotonic():
+                return entry[0]
+            return None
+    
+    def get_prompt_cache(self, client: genai.Client) -> Optional[str]:
+        """Return a cached-context handle for the prompt prefix, creating it if needed
+        
+        Returns None when caching is disabled or unsupported, in which case the
+        caller sends the full prompt inline. Creation is blocking; async callers
+        should run this in a thread.
+        """
+        if not settings.GEMINI_PROMPT_CACHE_ENABLED:
+            return None
+        
+        with self._lock:
+            api_key = self._api_key
+            retry_pending = time.monotonic() < self._prompt_cache_retry_at
+        name = self._cached_prompt_name(api_key)
+        if name or retry_pending:
+            return name
+        
+        # Serialize creation so concurrent analyses don't each create a cache
+        with self._prompt_cache_lock:
+            name = self._cached_prompt_name(api_key)
+            if name:
+                return name
+            
+            ttl = settings.GEMINI_PROMPT_CACHE_TTL_SECONDS
+            try:
+                cache = client.caches.create(
+                    model=GEMINI_MODEL,
+                    config=types.CreateCachedContentConfig(
+                        display_name="company-analysis-prompt",
+                        contents=ANALYSIS_PROMPT_PREFIX,
+                        tools=build_analysis_tools(),
+                        ttl=f"{ttl}s",
+                    ),
+                )
+            except Exception as e:
+                logger.warning(f"Context caching unavailable, sending full prompt: {e}")
+                with self._lock:
+                    if self._api_key == api_key:
+                        self._prompt_cache_retry_at = time.monotonic() + PROMPT_CACHE_RETRY_SECONDS
+                return None
+            
+            with self._lock:
+                if self._api_key == api_key:
+                    # Refresh before the server-side TTL lapses
+                    self._prompt_caches[api_key] = (cache.name, time.monotonic() + ttl * 0.9)
+            logger.info(f"Created Gemini context cache for analysis prompt: {cache.name}")
+            return cache.name
+    
+    def invalidate_prompt_cache(self) -> None:
+        """Forget the current prompt cache handle (e.g. after a failed call)"""
+        with self._lock:
+            self._prompt_caches.pop(self._api_key, None)
+
+def _close_client(client: genai.Client) -> None:
+    """Close a retired client's sync HTTP connections"""
+    try:
+        client._api_client._httpx_client.close()
+    except Exception as e:
+        logger.warning(f"Failed to close retired Gemini client: {e}")
+
+async def _aclose_client(client: genai.Client) -> None:
+    """Close a retired client's async and sync HTTP connections"""
+    try:
+        await client._api_client._async_httpx_client.aclose()
+    except Exception as e:
+        logger.warning(f"Failed to close retired Gemini async client: {e}")
+    _close_client(client)
+
+client_pool = GeminiClientPool(settings.GEMINI_API_KEY)
 
 def update_gemini_api_key(new_api_key: str) -> None:
     """Update Gemini API key at runtime"""
-    global current_gemini_api_key
-    current_gemini_api_key = new_api_key
+    client_pool.rotate(new_api_key)
     logger.info("Gemini API key updated successfully")
 
 def extract_json_from_response(text: str) -> Optional[Dict[str, Any]]:
@@ -81,30 +259,22 @@ def extract_json_from_response(text: str) -> Optional[Dict[str, Any]]:
     
     return None
 
-def generate_company_analysis(company_name: str, max_retries: int = 3) -> Dict[str, Any]:
-    """Generate company analysis using Gemini API with retry logic"""
-    
-    for attempt in range(max_retries):
-        try:
-            logger.info(f"Generating analysis for '{company_name}' (attempt {attempt + 1}/{max_retries})")
-            
-            client = genai.Client(api_key=current_gemini_api_key)
-            model = "gemini-2.5-flash"
-            
-            # Comprehensive prompt from Jupyter notebook
-            contents = [
-                genai.types.Content(
-                    role="user",
-                    parts=[
-                        genai.types.Part.from_text(text=f"""You are an expert Company Intelligence Analyst specializing in Private Equity and Lead Generation research. Your task is to conduct comprehensive company analysis and provide structured outputs in two distinct formats.
+def build_prompt_prefix() -> List[types.Content]:
+    """Build the static analysis prompt and worked example shared by every call"""
+    # Comprehensive prompt from Jupyter notebook
+    return [
+        genai.types.Content(
+            role="user",
+            parts=[
+                genai.types.Part.from_text(text="""You are an expert Company Intelligence Analyst specializing in Private Equity and Lead Generation research. Your task is to conduct comprehensive company analysis and provide structured outputs in two distinct formats.
 
 OUTPUT REQUIREMENTS:
 PART 1: STRUCTURED DATA (JSON FORMAT)
 Provide all data points from sections 1-13 in well-structured JSON format. Use the following structure:
 
 json
-{{
-  "company_basic_info": {{
+{
+  "company_basic_info": {
     "company_legal_name": "string",
     "company_name": "string",
     "trade_name_dba": "string",
@@ -141,9 +311,9 @@ json
     "total_full_time_employees": 0,
     "total_part_time_employees": 0,
     "total_contractors": 0
-  }},
-  "financial_metrics": {{
-    "revenue_data": {{
+  },
+  "financial_metrics": {
+    "revenue_data": {
       "current_year_revenue": 0,
       "previous_year_revenue": 0,
       "revenue_2_years_ago": 0,
@@ -162,12 +332,12 @@ json
       "arr": 0,
       "mrr": 0,
       "average_contract_value": 0,
-      "revenue_by_product_line_1": {{"amount": 0, "percentage": 0.0}},
-      "revenue_by_geography_domestic": {{"amount": 0, "percentage": 0.0}},
-      "revenue_by_geography_international": {{"amount": 0, "percentage": 0.0}},
+      "revenue_by_product_line_1": {"amount": 0, "percentage": 0.0},
+      "revenue_by_geography_domestic": {"amount": 0, "percentage": 0.0},
+      "revenue_by_geography_international": {"amount": 0, "percentage": 0.0},
       "revenue_concentration_risk": "category"
-    }},
-    "profitability_metrics": {{
+    },
+    "profitability_metrics": {
       "gross_revenue": 0,
       "cogs": 0,
       "gross_profit": 0,
@@ -184,8 +354,8 @@ json
       "net_profit_margin": 0.0,
       "free_cash_flow": 0,
       "free_cash_flow_margin": 0.0
-    }},
-    "balance_sheet": {{
+    },
+    "balance_sheet": {
       "total_assets": 0,
       "current_assets": 0,
       "total_liabilities": 0,
@@ -197,8 +367,8 @@ json
       "current_ratio": 0.0,
       "working_capital": 0,
       "cash_runway_months": 0
-    }},
-    "unit_economics": {{
+    },
+    "unit_economics": {
       "cac": 0,
       "ltv": 0,
       "ltv_cac_ratio": 0.0,
@@ -209,18 +379,18 @@ json
       "grr": 0.0,
       "arpu": 0,
       "arpa": 0
-    }}
-  }},
-  "valuation_investment": {{
-    "valuation_metrics": {{
+    }
+  },
+  "valuation_investment": {
+    "valuation_metrics": {
       "current_valuation": 0,
       "enterprise_value": 0,
       "market_cap": 0,
       "ev_revenue_multiple": 0.0,
       "ev_ebitda_multiple": 0.0,
       "pe_ratio": 0.0
-    }},
-    "funding_history": {{
+    },
+    "funding_history": {
       "investment_history": "category",
       "total_funding_raised": 0,
       "number_of_funding_rounds": 0,
@@ -228,17 +398,17 @@ json
       "last_funding_amount": 0,
       "last_funding_date": "YYYY-MM-DD",
       "last_funding_lead_investor": "string"
-    }},
-    "ownership_structure": {{
+    },
+    "ownership_structure": {
       "founder_ownership_percentage": 0.0,
       "management_ownership": 0.0,
       "employee_stock_pool": 0.0,
       "investor_ownership": 0.0,
       "number_of_shareholders": 0
-    }}
-  }},
-  "leadership_management": {{
-    "executives": {{
+    }
+  },
+  "leadership_management": {
+    "executives": {
       "decision_maker_name": "string",
       "decision_maker_title": "string",
       "ceo_name": "string",
@@ -248,15 +418,15 @@ json
       "ceo_linkedin": "string",
       "cfo_name": "string",
       "cto_name": "string"
-    }},
-    "founders": {{
+    },
+    "founders": {
       "number_of_founders": 0,
       "founder_1_name": "string",
       "founder_1_role": "string",
       "founder_1_equity": 0.0,
       "founder_1_active": true
-    }},
-    "team_metrics": {{
+    },
+    "team_metrics": {
       "management_stability": "category",
       "employee_growth_rate_1_year": 0.0,
       "engineering_team_size": 0,
@@ -265,123 +435,123 @@ json
       "turnover_rate": 0.0,
       "glassdoor_rating": 0.0,
       "glassdoor_reviews": 0
-    }}
-  }},
-  "market_competition": {{
-    "market_data": {{
+    }
+  },
+  "market_competition": {
+    "market_data": {
       "market_position": "category",
       "tam": 0,
       "sam": 0,
       "market_growth_rate": 0.0,
       "current_market_share": 0.0,
       "market_share_rank": 0
-    }},
-    "competitive_analysis": {{
+    },
+    "competitive_analysis": {
       "competitive_advantages": ["array"],
       "potential_challenges": ["array"],
       "direct_competitors": [
-        {{"name": "string", "market_share": 0.0, "revenue": 0}}
+        {"name": "string", "market_share": 0.0, "revenue": 0}
       ],
       "competitive_position": "category",
       "barriers_to_entry": 0,
       "moat_strength": 0
-    }}
-  }},
-  "customer_sales": {{
-    "customer_base": {{
+    }
+  },
+  "customer_sales": {
+    "customer_base": {
       "total_customers": 0,
       "customer_growth_rate": 0.0,
       "customer_retention_rate": 0.0,
       "nps_score": 0,
       "csat_score": 0.0
-    }},
-    "customer_concentration": {{
+    },
+    "customer_concentration": {
       "top_customer_revenue_percent": 0.0,
       "top_10_customers_revenue_percent": 0.0,
       "customer_concentration_risk": "category"
-    }},
-    "sales_metrics": {{
+    },
+    "sales_metrics": {
       "average_sales_cycle_days": 0,
       "conversion_rate": 0.0,
       "average_deal_size": 0,
       "win_rate": 0.0
-    }}
-  }},
-  "technology_operations": {{
-    "technology_stack": {{
+    }
+  },
+  "technology_operations": {
+    "technology_stack": {
       "technology_adoption_level": "category",
       "primary_languages": ["array"],
       "cloud_provider": "category",
       "crm_system": "string",
       "erp_system": "string"
-    }},
-    "infrastructure": {{
+    },
+    "infrastructure": {
       "infrastructure_type": "category",
       "cloud_spend_monthly": 0,
       "system_uptime": 0.0,
       "scalability_score": 0
-    }},
-    "rd_innovation": {{
+    },
+    "rd_innovation": {
       "rd_team_size": 0,
       "rd_spending": 0,
       "rd_percent_revenue": 0.0,
       "patents_held": 0,
       "innovation_score": 0
-    }}
-  }},
-  "legal_compliance": {{
-    "corporate_structure": {{
+    }
+  },
+  "legal_compliance": {
+    "corporate_structure": {
       "legal_entity_type": "category",
       "state_incorporation": "string",
       "regulatory_compliance_status": "category"
-    }},
-    "litigation": {{
+    },
+    "litigation": {
       "active_cases": 0,
       "settlement_amount_5_years": 0
-    }},
-    "intellectual_property": {{
+    },
+    "intellectual_property": {
       "patent_portfolio_size": 0,
       "trademark_registrations": 0,
       "ip_valuation": 0
-    }}
-  }},
-  "esg_risk": {{
-    "environmental": {{
+    }
+  },
+  "esg_risk": {
+    "environmental": {
       "esg_alignment": "category",
       "carbon_footprint": 0,
       "sustainability_score": 0
-    }},
-    "social": {{
+    },
+    "social": {
       "employee_satisfaction": 0,
       "diversity_score": 0,
       "community_investment": 0
-    }},
-    "governance": {{
+    },
+    "governance": {
       "board_independence": 0.0,
       "governance_score": 0
-    }},
-    "risk_assessment": {{
+    },
+    "risk_assessment": {
       "overall_risk_level": "category",
       "financial_risk": "category",
       "market_risk": "category",
       "operational_risk": "category"
-    }}
-  }},
-  "growth_outlook": {{
-    "growth_strategy": {{
+    }
+  },
+  "growth_outlook": {
+    "growth_strategy": {
       "primary_strategy": "category",
       "geographic_expansion_potential": "category",
       "acquisition_strategy": true,
       "partnership_strategy": true
-    }},
-    "exit_strategy": {{
+    },
+    "exit_strategy": {
       "expected_exit_strategy": "category",
       "ipo_readiness_score": 0,
       "exit_timeline_years": 0
-    }}
-  }},
-  "acquisition_scoring": {{
-    "pe_scoring": {{
+    }
+  },
+  "acquisition_scoring": {
+    "pe_scoring": {
       "acquisition_score": 0.0,
       "overall_opportunity_score": 0.0,
       "exit_readiness_level": "category",
@@ -390,46 +560,46 @@ json
       "acquisition_complexity": "category",
       "revenue_range_fit": true,
       "company_age_fit": true
-    }},
-    "acquisition_analysis": {{
+    },
+    "acquisition_analysis": {
       "acquisition_barriers": ["array"],
       "synergy_opportunities": "string",
       "industry_reputation": "category",
       "deal_timeline_estimate": "category",
       "due_diligence_priorities": ["array"]
-    }}
-  }},
-  "business_intelligence": {{
-    "market_intelligence": {{
+    }
+  },
+  "business_intelligence": {
+    "market_intelligence": {
       "industry_consolidation_trend": "category",
       "digital_disruption_risk": "category",
       "recent_news_summary": "string",
       "growth_signals": ["array"],
       "financial_health_indicators": ["array"]
-    }},
-    "lead_gen_intelligence": {{
+    },
+    "lead_gen_intelligence": {
       "social_media_activity": "category",
       "website_quality_score": 0,
       "communication_preference": "category",
       "marketing_sophistication": "category",
       "recommended_approach": "category"
-    }}
-  }},
-  "data_metadata": {{
-    "sources": {{
+    }
+  },
+  "data_metadata": {
+    "sources": {
       "primary_sources": ["array"],
       "secondary_sources": ["array"],
       "interview_sources": ["array"]
-    }},
-    "quality": {{
+    },
+    "quality": {
       "data_collection_date": "YYYY-MM-DD",
       "last_updated": "YYYY-MM-DD",
       "confidence_level": 0,
       "verification_status": "category",
       "data_gaps": ["array"]
-    }}
-  }}
-}}
+    }
+  }
+}
 
 PART 2: COMPREHENSIVE REPORTS (RICH TEXT FORMAT)
 After the JSON data, provide two detailed narrative reports in rich text format:
@@ -540,13 +710,13 @@ OUTPUT QUALITY:
 - Provide clear recommendations with reasoning
 - Structure content for easy scanning and decision-making
 
-Now, please analyze {company_name} following this framework and provide both the structured JSON data and comprehensive reports."""),
-                    ],
-                ),
-                genai.types.Content(
-                    role="model",
-                    parts=[
-                        genai.types.Part.from_text(text="""**Begin Constructing Analysis**
+Now, please analyze Midwest Technology Partners following this framework and provide both the structured JSON data and comprehensive reports."""),
+            ],
+        ),
+        genai.types.Content(
+            role="model",
+            parts=[
+                genai.types.Part.from_text(text="""**Begin Constructing Analysis**
 
 I've initiated the company analysis for "Midwest Technology Partners." My initial focus is gathering the specific data elements required for the JSON structure. I'm prioritizing financial metrics and company details, recognizing this is the bedrock for the more expansive narrative reports.
 
@@ -697,7 +867,7 @@ I've finalized all the company details for "Midwest Technology Partnership, LLC"
 
 
 """),
-                        genai.types.Part.from_text(text="""```json
+                genai.types.Part.from_text(text="""```json
 {
   "company_basic_info": {
     "company_legal_name": "Midwest Technology Partnership, LLC",
@@ -1247,60 +1417,209 @@ Midwest Technology Partnership (MTP) is a niche IT staffing and development firm
 *   **Confidence Level:** 3/5 (Moderate. While foundational company details are available, specific financial, operational, and customer metrics for this private company are largely absent and rely on estimates or industry averages.)
 *   **Verification Status:** Partial (Core company info verified, financial and operational details are estimated or N/A).
 *   **Data Gaps:** Detailed financial statements, precise employee breakdown, specific CEO/CFO/CTO details, customer base size/retention, internal tech systems, ESG data."""),
-                        ],
-                ),
-                genai.types.Content(
-                    role="user",
-                    parts=[
-                        genai.types.Part.from_text(text=f"""{company_name}"""),
-                    ],
-                ),
-            ]
+                ],
+        ),
+    ]
+
+# Built once at import; only the company name varies between calls
+ANALYSIS_PROMPT_PREFIX = build_prompt_prefix()
+
+def build_company_message(company_name: str) -> types.Content:
+    """Build the per-call user turn naming the company to analyze"""
+    return genai.types.Content(
+        role="user",
+        parts=[genai.types.Part.from_text(text=company_name)],
+    )
+
+def build_analysis_contents(company_name: str, include_prefix: bool = True) -> List[types.Content]:
+    """Build request contents; the prefix is omitted when served from a context cache"""
+    if not include_prefix:
+        return [build_company_message(company_name)]
+    return ANALYSIS_PROMPT_PREFIX + [build_company_message(company_name)]
+
+def build_analysis_tools() -> List[types.Tool]:
+    """Google Search grounding for analyses"""
+    return [genai.types.Tool(google_search=genai.types.GoogleSearch())]
+
+def build_generate_config(cached_content: Optional[str] = None) -> types.GenerateContentConfig:
+    """Build generation config with Google Search grounding
+    
+    With a cached context the tools live in the cache and must not be resent.
+    """
+    if cached_content:
+        return genai.types.GenerateContentConfig(
+            cached_content=cached_content,
+            thinking_config=types.ThinkingConfig(thinking_budget=-1)
+        )
+    return genai.types.GenerateContentConfig(
+        tools=build_analysis_tools(),
+        thinking_config=types.ThinkingConfig(thinking_budget=-1)
+    )
+
+def parse_analysis_response(company_name: str, full_response: str) -> Optional[Dict[str, Any]]:
+    """Parse streamed Gemini output into analysis JSON"""
+    try:
+        json_data = json.loads(full_response)
+        logger.info(f"Successfully generated analysis for '{company_name}'")
+        return json_data
+    except json.JSONDecodeError:
+        logger.warning(f"Direct JSON parsing failed for '{company_name}', trying extraction...")
+        json_data = extract_json_from_response(full_response)
+        
+        if json_data:
+            logger.info(f"Successfully extracted JSON for '{company_name}'")
+        return json_data
+
+def _check_deadline(company_name: str, deadline: Optional[float], upcoming_delay: float = 0) -> None:
+    """Raise once the time.monotonic() deadline is (or would be after a delay) reached"""
+    if deadline is not None and time.monotonic() + upcoming_delay >= deadline:
+        raise AnalysisDeadlineError(f"Analysis of '{company_name}' exceeded its time budget")
+
+def generate_company_analysis(
+    company_name: str,
+    max_retries: int = 3,
+    deadline: Optional[float] = None
+) -> Dict[str, Any]:
+    """Generate company analysis using Gemini API with retry logic
+    
+    deadline is a time.monotonic() value checked between attempts and stream chunks.
+    """
+    
+    for attempt in range(max_retries):
+        cached_prompt = None
+        try:
+            _check_deadline(company_name, deadline)
+            logger.info(f"Generating analysis for '{company_name}' (attempt {attempt + 1}/{max_retries})")
             
-            generate_content_config = genai.types.GenerateContentConfig(
-                tools=[genai.types.Tool(google_search=genai.types.GoogleSearch())],
-                thinking_config=types.ThinkingConfig(thinking_budget=-1)
-            )
+            with client_pool.use_client() as client:
+                cached_prompt = client_pool.get_prompt_cache(client)
+                
+                response = client.models.generate_content_stream(
+                    model=GEMINI_MODEL,
+                    contents=build_analysis_contents(company_name, include_prefix=cached_prompt is None),
+                    config=build_generate_config(cached_prompt),
+                )
+                
+                full_response = ""
+                for chunk in response:
+                    full_response += chunk.text or ""
+                    _check_deadline(company_name, deadline)
             
-            response = client.models.generate_content_stream(
-                model=model,
-                contents=contents,
-                config=generate_content_config,
-            )
+            json_data = parse_analysis_response(company_name, full_response)
+            if json_data:
+                return json_data
+            
+            if attempt < max_retries - 1:
+                delay = exponential_backoff_delay(attempt)
+                _check_deadline(company_name, deadline, delay)
+                logger.warning(f"JSON extraction failed, retrying in {delay}s...")
+                time.sleep(delay)
+                continue
+            else:
+                logger.error(f"Failed to extract valid JSON for '{company_name}' after {max_retries} attempts")
+                raise CompanyUnresolvedError(f"Could not extract valid analysis data for '{company_name}'")
+                    
+        except AnalysisDeadlineError:
+            logger.error(f"Analysis of '{company_name}' stopped: time budget exhausted")
+            raise
+        except CompanyUnresolvedError:
+            raise
+        except Exception as e:
+            if cached_prompt:
+                # The cache may have expired or been deleted server-side
+                client_pool.invalidate_prompt_cache()
+            if attempt < max_retries - 1:
+                delay = exponential_backoff_delay(attempt)
+                _check_deadline(company_name, deadline, delay)
+                logger.warning(f"Gemini API error on attempt {attempt + 1}: {e}, retrying in {delay}s...")
+                time.sleep(delay)
+            else:
+                logger.error(f"Gemini API failed after {max_retries} attempts: {e}")
+                raise GeminiAPIError(f"Unable to analyze company '{company_name}': {str(e)}")
+    
+    raise GeminiAPIError(f"Failed to generate analysis for '{company_name}' after {max_retries} attempts")
+
+async def _stream_analysis_async(
+    client: genai.Client,
+    company_name: str,
+    cached_prompt: Optional[str],
+    deadline: Optional[float]
+) -> str:
+    """Run one streamed generation and return the concatenated text"""
+    response = await client.aio.models.generate_content_stream(
+        model=GEMINI_MODEL,
+        contents=build_analysis_contents(company_name, include_prefix=cached_prompt is None),
+        config=build_generate_config(cached_prompt),
+    )
+    
+    full_response = ""
+    async for chunk in response:
+        full_response += chunk.text or ""
+        _check_deadline(company_name, deadline)
+    return full_response
+
+async def generate_company_analysis_async(
+    company_name: str,
+    max_retries: int = 3,
+    deadline: Optional[float] = None
+) -> Dict[str, Any]:
+    """Generate company analysis using the async Gemini client without blocking the event loop
+    
+    deadline is a time.monotonic() value. Besides the checks between attempts and
+    chunks, each attempt is bounded by the remaining time, so a stalled stream
+    is abandoned at the deadline rather than when the next chunk arrives.
+    """
+    
+    for attempt in range(max_retries):
+        cached_prompt = None
+        try:
+            _check_deadline(company_name, deadline)
+            logger.info(f"Generating analysis for '{company_name}' (async attempt {attempt + 1}/{max_retries})")
             
-            full_response = ""
-            for chunk in response:
-                full_response += chunk.text
+            async with client_pool.use_client_async() as client:
+                cached_prompt = await asyncio.to_thread(client_pool.get_prompt_cache, client)
+                
+                remaining = deadline - time.monotonic() if deadline is not None else None
+                try:
+                    full_response = await asyncio.wait_for(
+                        _stream_analysis_async(client, company_name, cached_prompt, deadline),
+                        timeout=remaining
+                    )
+                except asyncio.TimeoutError:
+                    raise AnalysisDeadlineError(f"Analysis of '{company_name}' exceeded its time budget")
             
-            # Try to parse JSON
-            try:
-                json_data = json.loads(full_response)
-                logger.info(f"Successfully generated analysis for '{company_name}'")
+            json_data = parse_analysis_response(company_name, full_response)
+            if json_data:
                 return json_data
-            except json.JSONDecodeError:
-                logger.warning(f"Direct JSON parsing failed for '{company_name}', trying extraction...")
-                json_data = extract_json_from_response(full_response)
-                
-                if json_data:
-                    logger.info(f"Successfully extracted JSON for '{company_name}'")
-                    return json_data
-                
-                if attempt < max_retries - 1:
-                    delay = exponential_backoff_delay(attempt)
-                    logger.warning(f"JSON extraction failed, retrying in {delay}s...")
-                    time.sleep(delay)
-                    continue
-                else:
-                    logger.error(f"Failed to extract valid JSON for '{company_name}' after {max_retries} attempts")
-                    raise GeminiAPIError(f"Could not extract valid analysis data for '{company_name}'")
+            
+            if attempt < max_retries - 1:
+                delay = exponential_backoff_delay(attempt)
+                _check_deadline(company_name, deadline, delay)
+                logger.warning(f"JSON extraction failed, retrying in {delay}s...")
+                await asyncio.sleep(delay)
+                continue
+            else:
+                logger.error(f"Failed to extract valid JSON for '{company_name}' after {max_retries} attempts")
+                raise CompanyUnresolvedError(f"Could not extract valid analysis data for '{company_name}'")
                     
+        except asyncio.CancelledError:
+            raise
+        except AnalysisDeadlineError:
+            logger.error(f"Analysis of '{company_name}' stopped: time budget exhausted")
+            raise
+        except CompanyUnresolvedError:
+            raise
         except Exception as e:
+            if cached_prompt:
+                # The cache may have expired or been deleted server-side
+                client_pool.invalidate_prompt_cache()
             if attempt < max_retries - 1:
                 delay = exponential_backoff_delay(attempt)
+                _check_deadline(company_name, deadline, delay)
                 logger.warning(f"Gemini API error on attempt {attempt + 1}: {e}, retrying in {delay}s...")
-                time.sleep(delay)
+                await asyncio.sleep(delay)
             else:
                 logger.error(f"Gemini API failed after {max_retries} attempts: {e}")
                 raise GeminiAPIError(f"Unable to analyze company '{company_name}': {str(e)}")
     
-    raise GeminiAPIError(f"Failed to generate analysis for '{company_name}' after {max_retries} attempts")
\ No newline at end of file
+    raise GeminiAPIError(f"Failed to generate analysis for '{company_name}' after {max_retries} attempts")
@@ -0,0 +1,178 @@
+import os
+import json
+import uuid
+import asyncio
+import threading
+from typing import Callable, Dict, Any, List, Optional, Set
+import psycopg
+from psycopg.conninfo import make_conninfo
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.utils.logger import logger
+
+JOB_EVENTS_CHANNEL = "job_events"
+TERMINAL_JOB_STATUSES = ("completed", "failed", "cancelled")
+
+
+def _new_process_id() -> str:
+    return f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+
+def _reset_process_id() -> None:
+    global PROCESS_ID
+    PROCESS_ID = _new_process_id()
+
+
+# Distinguishes our own NOTIFYs (already delivered locally) from other processes'.
+# Regenerated in forked children: gunicorn --preload imports this in the master.
+PROCESS_ID = _new_process_id()
+os.register_at_fork(after_in_child=_reset_process_id)
+
+# Postgres NOTIFY payloads must stay under 8000 bytes
+MAX_MESSAGE_LENGTH = 1000
+
+
+def _listener_conninfo() -> str:
+    """libpq connection string matching the SQLAlchemy engine settings"""
+    return make_conninfo(
+        host=settings.DATABASE_HOST,
+        port=settings.DATABASE_PORT,
+        dbname=settings.DATABASE_NAME,
+        user=settings.DATABASE_USER,
+        password=settings.DATABASE_PASSWORD,
+        sslmode="require",
+        connect_timeout=20
+    )
+
+
+class JobEventBroker:
+    """In-process pub/sub of job progress events
+
+    Subscribers (SSE streams) get an asyncio.Queue per job. Events published in
+    this process are delivered directly; events from other API or worker
+    processes arrive through Postgres LISTEN/NOTIFY on JOB_EVENTS_CHANNEL.
+    """
+
+    def __init__(self) -> None:
+        self._subscribers: Dict[str, Set["asyncio.Queue[Dict[str, Any]]"]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._listener: Optional["asyncio.Task[None]"] = None
+        self._handlers: List[Callable[[Dict[str, Any]], None]] = []
+
+    def start(self) -> None:
+        """Bind to the running loop and start the cross-process listener"""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        if self._listener is None:
+            self._listener = self._loop.create_task(self._listen_forever(), name="job-events-listener")
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+
+    def subscribe(self, job_id: str) -> "asyncio.Queue[Dict[str, Any]]":
+        queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+        self._subscribers.setdefault(job_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, job_id: str, queue: "asyncio.Queue[Dict[str, Any]]") -> None:
+        queues = self._subscribers.get(job_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[job_id]
+
+    def add_handler(self, handler: Callable[[Dict[str, Any]], None]) -> None:
+        """Call handler on the event loop for every job event, whatever the job"""
+        self._handlers.append(handler)
+
+    def _deliver(self, event: Dict[str, Any]) -> None:
+        for handler in self._handlers:
+            try:
+                handler(event)
+            except Exception as e:
+                logger.error(f"Job event handler failed: {e}")
+        for queue in self._subscribers.get(event["job_id"], ()):
+            queue.put_nowait(event)
+
+    def publish_local(self, event: Dict[str, Any]) -> None:
+        """Deliver an event to this process's subscribers (thread-safe)"""
+        if self._loop is None or self._loop.is_closed():
+            return
+        if threading.get_ident() == self._loop_thread:
+            self._deliver(event)
+        else:
+            self._loop.call_soon_threadsafe(self._deliver, event)
+
+    async def _listen_forever(self) -> None:
+        """Relay NOTIFYs from other processes, reconnecting on failure"""
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(
+                    _listener_conninfo(), autocommit=True
+                ) as conn:
+                    await conn.execute(f"LISTEN {JOB_EVENTS_CHANNEL}")
+                    logger.info(f"Listening for job events on '{JOB_EVENTS_CHANNEL}'")
+                    async for notify in conn.notifies():
+                        try:
+                            event = json.loads(notify.payload)
+                        except json.JSONDecodeError:
+                            continue
+                        if event.pop("origin", None) != PROCESS_ID:
+                            self._deliver(event)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Job event listener disconnected: {e}, reconnecting in 5s")
+                await asyncio.sleep(5)
+
+
+job_events = JobEventBroker()
+
+
+def notify_job_event(
+    db: Session,
+    job_id: str,
+    status: str,
+    progress_message: Optional[str] = None,
+    error_message: Optional[str] = None
+) -> Dict[str, Any]:
+    """Queue a NOTIFY for a job event in db's transaction and return the event
+
+    The caller publishes the event locally once it has committed, so no
+    subscriber, here or in another process, sees an event before the row change
+    it describes. The final result is not carried in the event; subscribers
+    fetch it once on a terminal status.
+    """
+    event = make_job_event(job_id, status, progress_message, error_message)
+    notify_job_events(db, [event])
+    return event
+
+
+def make_job_event(
+    job_id: str,
+    status: str,
+    progress_message: Optional[str] = None,
+    error_message: Optional[str] = None
+) -> Dict[str, Any]:
+    return {
+        "job_id": job_id,
+        "status": status,
+        "progress_message": progress_message,
+        "error_message": error_message[:MAX_MESSAGE_LENGTH] if error_message else None
+    }
+
+
+def notify_job_events(db: Session, events: List[Dict[str, Any]]) -> None:
+    """Queue NOTIFYs for events in db's transaction (sent to other processes on commit)"""
+    db.execute(
+        text("SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS text[])) AS payload"),
+        {
+            "channel": JOB_EVENTS_CHANNEL,
+            "payloads": [json.dumps({**event, "origin": PROCESS_ID}) for event in events]
+        }
+    )
@@ -0,0 +1,372 @@
+import os
+import time
+import socket
+from typing import Dict, Any, List, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.database.connection import SessionLocal
+from app.core.job_events import job_events, make_job_event, notify_job_event, notify_job_events
+from app.core.job_state import job_states
+from app.config import settings
+from app.utils.logger import logger
+
+def worker_prefix() -> str:
+    """Identifies this process in async_jobs.worker_id
+
+    Computed per call rather than at import: gunicorn --preload imports the
+    app in the master, so an import-time pid would be shared by every worker.
+    """
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def claim_next_job(worker_id: str) -> Optional[Tuple[str, str, Any]]:
+    """Claim the oldest queued job and return (job_id, company_name, created_at)
+
+    SKIP LOCKED lets any number of workers poll concurrently without blocking
+    on, or double-claiming, the same row.
+    """
+    db = SessionLocal()
+    try:
+        row = db.execute(
+            text("""
+                UPDATE async_jobs
+                SET status = 'processing',
+                    worker_id = :worker_id,
+                    attempts = attempts + 1,
+                    started_at = now(),
+                    heartbeat_at = now(),
+                    lease_expires_at = now() + make_interval(secs => :lease_seconds),
+                    progress_message = 'Starting company analysis...'
+                WHERE id = (
+                    SELECT id FROM async_jobs
+                    WHERE status = 'queued'
+                    ORDER BY created_at
+                    LIMIT 1
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING job_id, company_name, created_at
+            """),
+            {"worker_id": worker_id, "lease_seconds": settings.ANALYSIS_JOB_LEASE_SECONDS}
+        ).first()
+        if row is None:
+            db.commit()
+            return None
+        event = notify_job_event(db, row.job_id, "processing", "Starting company analysis...")
+        db.commit()
+        job_events.publish_local(event)
+        return row.job_id, row.company_name, row.created_at
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def heartbeat_job(job_id: str, worker_id: str) -> bool:
+    """Extend the lease on a job; False if this worker no longer owns it"""
+    db = SessionLocal()
+    try:
+        result = db.execute(
+            text("""
+                UPDATE async_jobs
+                SET heartbeat_at = now(),
+                    lease_expires_at = now() + make_interval(secs => :lease_seconds)
+                WHERE job_id = :job_id AND worker_id = :worker_id AND status = 'processing'
+            """),
+            {"job_id": job_id, "worker_id": worker_id, "lease_seconds": settings.ANALYSIS_JOB_LEASE_SECONDS}
+        )
+        db.commit()
+        return result.rowcount == 1
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Heartbeat failed for job {job_id}: {e}")
+        # A transient DB error must not abort the analysis; the lease still runs
+        return True
+    finally:
+        db.close()
+
+
+def release_job(job_id: str, worker_id: str) -> None:
+    """Hand a claimed job back to the queue (e.g. on worker shutdown)"""
+    db = SessionLocal()
+    try:
+        released = db.execute(
+            text("""
+                UPDATE async_jobs
+                SET status = 'queued', worker_id = NULL, lease_expires_at = NULL,
+                    progress_message = 'Queued for analysis...'
+                WHERE job_id = :job_id AND worker_id = :worker_id AND status = 'processing'
+            """),
+            {"job_id": job_id, "worker_id": worker_id}
+        ).rowcount
+        if not released:
+            db.commit()
+            return
+        event = notify_job_event(db, job_id, "queued", "Queued for analysis...")
+        db.commit()
+        job_events.publish_local(event)
+        logger.info(f"Released job {job_id} back to the queue")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Failed to release job {job_id}: {e}")
+    finally:
+        db.close()
+
+
+def reclaim_expired_leases() -> Dict[str, int]:
+    """Requeue jobs whose worker stopped heartbeating; fail those out of attempts"""
+    db = SessionLocal()
+    try:
+        failed = _fail_jobs_returning(
+            db,
+            """
+                UPDATE async_jobs
+                SET status = 'failed', completed_at = now(), worker_id = NULL,
+                    lease_expires_at = NULL, progress_message = 'Analysis failed',
+                    error_message = 'Worker lease expired after ' || attempts || ' attempts'
+                WHERE status = 'processing' AND lease_expires_at < now() AND attempts >= :max_attempts
+                RETURNING job_id, error_message
+            """,
+            {"max_attempts": settings.ANALYSIS_JOB_MAX_ATTEMPTS}
+        )
+        requeued = db.execute(
+            text("""
+                UPDATE async_jobs
+                SET status = 'queued', worker_id = NULL, lease_expires_at = NULL,
+                    progress_message = 'Queued for analysis...'
+                WHERE status = 'processing' AND lease_expires_at < now()
+            """)
+        ).rowcount
+        db.commit()
+        if failed or requeued:
+            logger.warning(f"Reclaimed expired job leases: {requeued} requeued, {len(failed)} failed")
+        return {"requeued": requeued, "failed": len(failed)}
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def _fail_jobs_returning(db: Session, query: str, params: Dict[str, Any]) -> List[str]:
+    """Run an UPDATE ... RETURNING job_id, error_message that fails jobs and publish the events"""
+    rows = db.execute(text(query), params).all()
+    events = [make_job_event(row.job_id, "failed", "Analysis failed", row.error_message) for row in rows]
+    if events:
+        notify_job_events(db, events)
+    db.commit()
+    for event in events:
+        job_events.publish_local(event)
+    return [row.job_id for row in rows]
+
+
+def fail_overdue_jobs() -> int:
+    """Fail jobs running too long or waiting too long in the queue
+
+    A running job's budget, ANALYSIS_JOB_DEADLINE_SECONDS, counts from when
+    its current attempt was claimed, so time spent queued behind a large batch
+    isn't charged to it. Queued jobs fail after ANALYSIS_JOB_QUEUE_TIMEOUT_SECONDS.
+    A worker still running a failed job loses its lease on the next heartbeat
+    and abandons the analysis.
+    """
+    db = SessionLocal()
+    try:
+        failed = _fail_jobs_returning(
+            db,
+            """
+                UPDATE async_jobs
+                SET status = 'failed', completed_at = now(), worker_id = NULL,
+                    lease_expires_at = NULL, progress_message = 'Analysis failed',
+                    error_message = CASE WHEN status = 'processing' THEN :running_reason ELSE :queued_reason END
+                WHERE (
+                    status = 'processing'
+                    AND COALESCE(started_at, created_at) < now() - make_interval(secs => :deadline_seconds)
+                ) OR (
+                    status = 'queued' AND :queue_timeout_seconds > 0
+                    AND created_at < now() - make_interval(secs => :queue_timeout_seconds)
+                )
+                RETURNING job_id, error_message
+            """,
+            {
+                "deadline_seconds": settings.ANALYSIS_JOB_DEADLINE_SECONDS,
+                "queue_timeout_seconds": settings.ANALYSIS_JOB_QUEUE_TIMEOUT_SECONDS,
+                "running_reason": f"Job did not finish within {settings.ANALYSIS_JOB_DEADLINE_SECONDS} seconds",
+                "queued_reason": f"Job was not started within {settings.ANALYSIS_JOB_QUEUE_TIMEOUT_SECONDS} seconds"
+            }
+        )
+        if failed:
+            logger.warning(f"Failed {len(failed)} overdue jobs (running too long or queued too long)")
+        return len(failed)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def purge_finished_jobs(batch_size: int = settings.JOB_PURGE_BATCH_SIZE) -> int:
+    """Delete finished jobs and batches older than JOB_RETENTION_DAYS in batches
+
+    Each batch is a short transaction; SKIP LOCKED keeps concurrent purgers
+    in other processes from waiting on each other.
+    """
+    deleted = 0
+    db = SessionLocal()
+    try:
+        for query in (
+            """
+                DELETE FROM async_jobs
+                WHERE id IN (
+                    SELECT id FROM async_jobs
+                    WHERE status IN ('completed', 'failed', 'cancelled')
+                      AND completed_at < now() - make_interval(days => :retention_days)
+                    LIMIT :batch_size
+                    FOR UPDATE SKIP LOCKED
+                )
+            """,
+            """
+                DELETE FROM analysis_batches
+                WHERE id IN (
+                    SELECT id FROM analysis_batches
+                    WHERE created_at < now() - make_interval(days => :retention_days)
+                    LIMIT :batch_size
+                    FOR UPDATE SKIP LOCKED
+                )
+            """,
+        ):
+            while True:
+                batch_deleted = db.execute(
+                    text(query),
+                    {"retention_days": settings.JOB_RETENTION_DAYS, "batch_size": batch_size}
+                ).rowcount
+                db.commit()
+                deleted += batch_deleted
+                if batch_deleted < batch_size:
+                    break
+        return deleted
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def cancel_job(job_id: str) -> Optional[str]:
+    """Cancel a queued or running job; returns the job's resulting status, None if unknown
+
+    The worker running it, in any process, stops on the 'cancelled' event or
+    at its next heartbeat at the latest.
+    """
+    db = SessionLocal()
+    try:
+        cancelled = db.execute(
+            text("""
+                UPDATE async_jobs
+                SET status = 'cancelled', completed_at = now(), worker_id = NULL,
+                    lease_expires_at = NULL, progress_message = 'Analysis cancelled'
+                WHERE job_id = :job_id AND status IN ('queued', 'processing')
+                RETURNING job_id
+            """),
+            {"job_id": job_id}
+        ).first()
+        if cancelled:
+            event = notify_job_event(db, job_id, "cancelled", "Analysis cancelled")
+            db.commit()
+            job_events.publish_local(event)
+            job_states.forget(job_id)
+            logger.info(f"🛑 Cancelled job {job_id}")
+            return "cancelled"
+
+        db.rollback()
+        return db.execute(
+            text("SELECT status FROM async_jobs WHERE job_id = :job_id"),
+            {"job_id": job_id}
+        ).scalar()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def run_job_maintenance() -> Dict[str, int]:
+    """Periodic upkeep of async_jobs: enforce the deadline, then purge old jobs"""
+    start_time = time.monotonic()
+    overdue = fail_overdue_jobs()
+    purged = purge_finished_jobs()
+    if overdue or purged:
+        logger.info(
+            f"Job maintenance: {overdue} overdue failed, {purged} old rows purged "
+            f"in {(time.monotonic() - start_time) * 1000:.1f}ms"
+        )
+    return {"overdue": overdue, "purged": purged}
+
+
+def reconcile_inflight_jobs() -> Dict[str, int]:
+    """Recover jobs left in flight by a previous run of this process, at startup
+
+    Jobs claimed under this process's worker id (same host and pid, as after a
+    container restart) or with no lease at all cannot have a live worker, so
+    they are requeued, or failed once out of attempts, without waiting for the
+    lease to expire. Expired leases from other workers are reclaimed as usual.
+    """
+    db = SessionLocal()
+    try:
+        orphaned = "status = 'processing' AND (lease_expires_at IS NULL OR worker_id LIKE :worker_prefix)"
+        params = {"worker_prefix": f"{worker_prefix()}:%", "max_attempts": settings.ANALYSIS_JOB_MAX_ATTEMPTS}
+        failed = _fail_jobs_returning(
+            db,
+            f"""
+                UPDATE async_jobs
+                SET status = 'failed', completed_at = now(), worker_id = NULL,
+                    lease_expires_at = NULL, progress_message = 'Analysis failed',
+                    error_message = 'Worker stopped after ' || attempts || ' attempts'
+                WHERE {orphaned} AND attempts >= :max_attempts
+                RETURNING job_id, error_message
+            """,
+            params
+        )
+        requeued = db.execute(
+            text(f"""
+                UPDATE async_jobs
+                SET status = 'queued', worker_id = NULL, lease_expires_at = NULL,
+                    progress_message = 'Queued for analysis...'
+                WHERE {orphaned}
+            """),
+            params
+        ).rowcount
+        db.commit()
+        if failed or requeued:
+            logger.warning(f"Reconciled jobs left in flight: {requeued} requeued, {len(failed)} failed")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    reclaimed = reclaim_expired_leases()
+    return {
+        "requeued": requeued + reclaimed["requeued"],
+        "failed": len(failed) + reclaimed["failed"]
+    }
+
+
+def get_queue_stats(job_created_at: Optional[Any] = None) -> Dict[str, Optional[int]]:
+    """Queue depth, plus the 1-based position of a job created at job_created_at"""
+    db = SessionLocal()
+    try:
+        row = db.execute(
+            text("""
+                SELECT count(*) AS depth,
+                       count(*) FILTER (WHERE created_at <= :created_at) AS position
+                FROM async_jobs
+                WHERE status = 'queued'
+            """),
+            {"created_at": job_created_at}
+        ).first()
+        return {
+            "queue_depth": row.depth,
+            "queue_position": row.position if job_created_at is not None else None
+        }
+    finally:
+        db.close()
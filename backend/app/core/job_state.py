@@ -0,0 +1,92 @@
+import threading
+from typing import Dict, Any, Optional
+from sqlalchemy import text
+from app.database.connection import SessionLocal
+from app.core.job_events import job_events, make_job_event, notify_job_events
+from app.utils.logger import logger
+
+
+class JobStateStore:
+    """State of the jobs this process is running, with write-behind progress
+
+    Status reads for these jobs are served from memory. Progress messages are
+    published to local subscribers immediately but only marked dirty for the
+    database; flush() writes the latest message per job in one transaction, so
+    several ticks between flushes cost a single UPDATE. Terminal transitions
+    bypass the store and are written synchronously by the caller.
+    """
+
+    def __init__(self) -> None:
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._dirty: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def track(self, job_id: str, status: str, progress_message: Optional[str], created_at: Any) -> None:
+        with self._lock:
+            self._jobs[job_id] = {
+                "job_id": job_id,
+                "status": status,
+                "progress_message": progress_message,
+                "created_at": created_at,
+                "completed_at": None
+            }
+
+    def forget(self, job_id: str) -> None:
+        """Stop serving a job (its pending progress is dropped, not flushed)"""
+        with self._lock:
+            self._jobs.pop(job_id, None)
+            self._dirty.pop(job_id, None)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            state = self._jobs.get(job_id)
+            return dict(state) if state else None
+
+    def set_progress(self, job_id: str, progress_message: str) -> bool:
+        """Record a progress message; False if this process isn't running the job"""
+        with self._lock:
+            state = self._jobs.get(job_id)
+            if state is None:
+                return False
+            state["progress_message"] = progress_message
+            self._dirty[job_id] = progress_message
+            status = state["status"]
+        job_events.publish_local(make_job_event(job_id, status, progress_message))
+        return True
+
+    def flush(self) -> int:
+        """Write pending progress messages to the database; returns jobs written"""
+        with self._lock:
+            pending, self._dirty = self._dirty, {}
+        if not pending:
+            return 0
+
+        db = SessionLocal()
+        try:
+            # The status guard keeps a late flush from touching a finished job
+            db.execute(
+                text("""
+                    UPDATE async_jobs SET progress_message = :progress_message
+                    WHERE job_id = :job_id AND status = 'processing'
+                """),
+                [{"job_id": job_id, "progress_message": message} for job_id, message in pending.items()]
+            )
+            notify_job_events(db, [
+                make_job_event(job_id, "processing", message) for job_id, message in pending.items()
+            ])
+            db.commit()
+            return len(pending)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Failed to flush progress for {len(pending)} jobs: {e}")
+            # Retry on the next flush unless newer progress arrived meanwhile
+            with self._lock:
+                for job_id, message in pending.items():
+                    if job_id in self._jobs:
+                        self._dirty.setdefault(job_id, message)
+            return 0
+        finally:
+            db.close()
+
+
+job_states = JobStateStore()
@@ -0,0 +1,357 @@
+import bisect
+import heapq
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from rapidfuzz import fuzz, process
+from sqlalchemy import text
+from app.config import settings
+from app.database.connection import SessionLocal
+from app.utils.helpers import sanitize_company_name, normalize_company_name
+from app.utils.logger import logger
+
+# Ranks, best first; matches search_engine.find_matches, plus typo-tolerant hits
+RANK_EXACT_NAME = 0
+RANK_EXACT_OTHER = 1
+RANK_SUBSTRING_NAME = 2
+RANK_SUBSTRING_OTHER = 3
+RANK_SIMILAR = 4
+
+# Names scored with rapidfuzz after trigram candidate generation
+MAX_FUZZY_CANDIDATES = 200
+# Minimum fuzz.ratio (0-100) for a typo-tolerant match
+FUZZY_MIN_SCORE = 85
+
+NAME_KIND_COMPANY = 0
+NAME_KIND_OTHER = 1  # canonical name or alias
+
+
+# Companies indexed per lock acquisition by refresh()
+REFRESH_CHUNK_SIZE = 1000
+# refresh() re-reads this many ids below its watermark: ids are allocated when
+# rows are inserted, so a concurrent transaction can commit a lower id later
+REFRESH_ID_OVERLAP = 1000
+# Buffered prefix-index inserts merged into the main sorted list beyond this (or 1/8 of it)
+PREFIX_MERGE_THRESHOLD = 1024
+
+
+def trigrams(name: str) -> Set[str]:
+    return {name[i:i + 3] for i in range(len(name) - 2)}
+
+
+class SortedKeys:
+    """Sorted (key, value) pairs for prefix scans
+
+    New pairs go to a small sorted buffer that is merged into the main list
+    in bulk, so loading many keys doesn't shift the main list once per key.
+    """
+
+    def __init__(self) -> None:
+        self._main: List[Tuple[str, int]] = []
+        self._buffer: List[Tuple[str, int]] = []
+
+    def extend(self, pairs: List[Tuple[str, int]]) -> None:
+        if len(pairs) < PREFIX_MERGE_THRESHOLD // 16:
+            for pair in pairs:
+                bisect.insort(self._buffer, pair)
+        else:
+            self._buffer.extend(pairs)
+            self._buffer.sort()
+        if len(self._buffer) > max(PREFIX_MERGE_THRESHOLD, len(self._main) // 8):
+            # Two sorted runs: timsort merges them in linear time
+            self._main.extend(self._buffer)
+            self._main.sort()
+            self._buffer = []
+
+    @staticmethod
+    def _scan(pairs: List[Tuple[str, int]], prefix: str) -> Iterator[Tuple[str, int]]:
+        for position in range(bisect.bisect_left(pairs, (prefix,)), len(pairs)):
+            if not pairs[position][0].startswith(prefix):
+                return
+            yield pairs[position]
+
+    def scan(self, prefix: str) -> Iterator[Tuple[str, int]]:
+        """Pairs whose key starts with prefix, in key order"""
+        return heapq.merge(self._scan(self._main, prefix), self._scan(self._buffer, prefix))
+
+
+class CompanyNameIndex:
+    """In-process index of company names for lookups without a database query
+
+    Every company contributes its company_name, canonical_name and any
+    aliases, keyed by normalize_company_name (so "Microsoft Corp." and
+    "Microsoft Corporation" are the same exact name). Exact lookups are a dict
+    hit; substring lookups intersect trigram posting lists; typo-tolerant
+    lookups score the names sharing the most trigrams with rapidfuzz; prefix
+    suggestions scan sorted lists of names and of their later words.
+
+    The index only has to be right about hits: callers confirm the chosen
+    company with a primary-key read and fall back to the database on a miss,
+    since other processes may have saved companies not indexed here yet.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._names: List[Optional[str]] = []
+        self._name_company: List[int] = []
+        self._name_kind: List[int] = []
+        # Length of the name before normalization; prefers "acme" over "acme corp" for "acme"
+        self._name_length: List[int] = []
+        self._exact: Dict[str, Set[int]] = {}
+        # Append-only posting lists; entries of removed names are skipped at lookup
+        self._postings: Dict[str, List[int]] = {}
+        self._by_company: Dict[int, List[int]] = {}
+        # company_id -> (company_name, canonical_name) as stored
+        self._display_names: Dict[int, Tuple[str, Optional[str]]] = {}
+        self._name_prefixes = SortedKeys()
+        # Names keyed from each later word: "apex analytics" is also found by "anal"
+        self._word_prefixes = SortedKeys()
+        # Prefix entries of names added under the current lock, sorted in once
+        self._pending_name_prefixes: List[Tuple[str, int]] = []
+        self._pending_word_prefixes: List[Tuple[str, int]] = []
+        self._last_id = 0
+        self._last_alias_id = 0
+        self._next_prune_at = 0.0
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return len(self._by_company)
+
+    def _add_name(self, company_id: int, raw_name: Optional[str], kind: int) -> None:
+        name = normalize_company_name(raw_name or "")
+        if not name:
+            return
+        for i in self._by_company.get(company_id, ()):
+            if self._names[i] == name and self._name_kind[i] <= kind:
+                return
+
+        i = len(self._names)
+        self._names.append(name)
+        self._name_company.append(company_id)
+        self._name_kind.append(kind)
+        self._name_length.append(len(sanitize_company_name(raw_name)))
+        self._exact.setdefault(name, set()).add(i)
+        for gram in trigrams(name):
+            self._postings.setdefault(gram, []).append(i)
+        self._by_company.setdefault(company_id, []).append(i)
+        self._pending_name_prefixes.append((name, i))
+        words = name.split(" ")
+        for position in range(1, len(words)):
+            self._pending_word_prefixes.append((" ".join(words[position:]), i))
+
+    def _flush_prefixes(self) -> None:
+        self._name_prefixes.extend(self._pending_name_prefixes)
+        self._word_prefixes.extend(self._pending_word_prefixes)
+        self._pending_name_prefixes = []
+        self._pending_word_prefixes = []
+
+    def add(
+        self,
+        company_id: int,
+        company_name: str,
+        canonical_name: Optional[str] = None,
+        aliases: Iterable[str] = ()
+    ) -> None:
+        """Index a company's names (idempotent; new aliases extend an existing entry)"""
+        self.add_many([(company_id, company_name, canonical_name)], aliases)
+
+    def add_many(
+        self,
+        companies: List[Tuple[int, str, Optional[str]]],
+        aliases: Iterable[str] = ()
+    ) -> None:
+        """Index (company_id, company_name, canonical_name) rows; aliases apply to a single row"""
+        with self._lock:
+            for company_id, company_name, canonical_name in companies:
+                self._display_names.setdefault(company_id, (company_name, canonical_name))
+                self._add_name(company_id, company_name, NAME_KIND_COMPANY)
+                self._add_name(company_id, canonical_name, NAME_KIND_OTHER)
+                for alias in aliases:
+                    self._add_name(company_id, alias, NAME_KIND_OTHER)
+            self._flush_prefixes()
+
+    def add_aliases(self, company_id: int, aliases: Iterable[str]) -> None:
+        """Index extra names for a company (no-op for companies not indexed yet)"""
+        with self._lock:
+            if company_id not in self._display_names:
+                return
+            for alias in aliases:
+                self._add_name(company_id, alias, NAME_KIND_OTHER)
+            self._flush_prefixes()
+
+    def remove(self, company_id: int) -> None:
+        self.remove_many([company_id])
+
+    def remove_many(self, company_ids: Iterable[int]) -> None:
+        with self._lock:
+            for company_id in company_ids:
+                self._display_names.pop(company_id, None)
+                for i in self._by_company.pop(company_id, ()):
+                    name = self._names[i]
+                    self._names[i] = None
+                    self._exact.get(name, set()).discard(i)
+
+    def _substring_candidates(self, query: str) -> Iterable[int]:
+        if len(query) < 3:
+            # Would scan every name; misses fall back to the database's LIMITed query
+            return ()
+        # Every name containing query is in the posting list of each of its trigrams
+        candidates = min((self._postings.get(gram, []) for gram in trigrams(query)), key=len)
+        return (i for i in candidates if self._names[i] is not None and query in self._names[i])
+
+    def _similar_names(self, query: str, limit: int) -> List[Tuple[int, float]]:
+        grams = trigrams(query)
+        if not grams:
+            return []
+        # The rarest trigrams are the most selective; common ones ("inc", "co ") add cost, not signal
+        postings = sorted((self._postings.get(gram, []) for gram in grams), key=len)
+        postings = postings[:max(3, len(postings) // 2)]
+        overlap: Counter = Counter()
+        for posting in postings:
+            overlap.update(posting)
+        min_shared = max(1, len(postings) // 3)
+        choices = {
+            i: self._names[i]
+            for i, shared in overlap.most_common(MAX_FUZZY_CANDIDATES)
+            if shared >= min_shared and self._names[i] is not None
+        }
+        return [
+            (i, score)
+            for _, score, i in process.extract(
+                query, choices, scorer=fuzz.ratio, score_cutoff=FUZZY_MIN_SCORE, limit=limit
+            )
+        ]
+
+    def lookup(self, company_name: str, limit: int = 5) -> List[Tuple[int, int]]:
+        """Best matching company ids with their rank, best first (at most limit)"""
+        query = normalize_company_name(company_name)
+        if not query:
+            return []
+
+        # company_id -> sort key (rank, tie-breaker)
+        best: Dict[int, Tuple[int, float]] = {}
+
+        def consider(i: int, rank: int, tie_breaker: float) -> None:
+            company_id = self._name_company[i]
+            key = (rank, tie_breaker)
+            if company_id not in best or key < best[company_id]:
+                best[company_id] = key
+
+        with self._lock:
+            for i in self._exact.get(query, ()):
+                exact_rank = RANK_EXACT_NAME if self._name_kind[i] == NAME_KIND_COMPANY else RANK_EXACT_OTHER
+                consider(i, exact_rank, self._name_length[i])
+            for i in self._substring_candidates(query):
+                substring_rank = (
+                    RANK_SUBSTRING_NAME if self._name_kind[i] == NAME_KIND_COMPANY else RANK_SUBSTRING_OTHER
+                )
+                consider(i, substring_rank, len(self._names[i]))
+            if len(best) < limit:
+                for i, score in self._similar_names(query, limit):
+                    consider(i, RANK_SIMILAR, -score)
+
+        ranked = sorted(best.items(), key=lambda item: (item[1], item[0]))[:limit]
+        return [(company_id, key[0]) for company_id, key in ranked]
+
+    def names(self, company_id: int) -> List[str]:
+        """Normalized names indexed for a company"""
+        with self._lock:
+            return [self._names[i] for i in self._by_company.get(company_id, ()) if self._names[i] is not None]
+
+    def canonical_name(self, company_id: int) -> Optional[str]:
+        names = self._display_names.get(company_id)
+        return names[1] if names else None
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Tuple[int, str, Optional[str]]]:
+        """(company_id, company_name, canonical_name) for names starting with prefix
+
+        Companies whose name starts with the prefix come first, then those with
+        a later word starting with it; each group in alphabetical order.
+        """
+        query = normalize_company_name(prefix)
+        if not query:
+            return []
+
+        suggestions: List[Tuple[int, str, Optional[str]]] = []
+        seen: Set[int] = set()
+        with self._lock:
+            for keys in (self._name_prefixes, self._word_prefixes):
+                for _, i in keys.scan(query):
+                    company_id = self._name_company[i]
+                    if self._names[i] is None or company_id in seen:
+                        continue
+                    seen.add(company_id)
+                    company_name, canonical_name = self._display_names[company_id]
+                    suggestions.append((company_id, company_name, canonical_name))
+                    if len(suggestions) >= limit:
+                        return suggestions
+        return suggestions
+
+    def refresh(self) -> int:
+        """Index companies and aliases saved (by any process) since the last load; returns companies added
+
+        The id watermarks only move here, from what the database returned:
+        companies added out of band (by save or a lookup fallback) don't skip
+        lower ids other processes commit later. Each refresh re-reads
+        REFRESH_ID_OVERLAP ids below the watermark; re-adding is idempotent.
+
+        Every NAME_INDEX_PRUNE_SECONDS it also reads all company ids and drops
+        indexed companies that have since been deleted, which suggestions (not
+        confirmed against the database) would otherwise keep offering.
+        """
+        prune = self.loaded and time.monotonic() >= self._next_prune_at
+        if prune:
+            # Taken before the query, so companies indexed meanwhile are never pruned
+            with self._lock:
+                indexed = set(self._display_names)
+        db = SessionLocal()
+        try:
+            if prune:
+                live_ids = set(db.execute(text("SELECT id FROM company_analysis")).scalars())
+            rows = db.execute(
+                text("""
+                    SELECT id, company_name, canonical_name FROM company_analysis
+                    WHERE id > :since_id ORDER BY id
+                """),
+                {"since_id": max(0, self._last_id - REFRESH_ID_OVERLAP)}
+            ).all()
+            alias_rows = db.execute(
+                text("""
+                    SELECT id, alias, company_id FROM company_aliases
+                    WHERE id > :since_id ORDER BY id
+                """),
+                {"since_id": max(0, self._last_alias_id - REFRESH_ID_OVERLAP)}
+            ).all()
+        finally:
+            db.close()
+
+        new_rows = [row for row in rows if row.id not in self._display_names]
+        # In chunks, so lookups aren't held up for the whole initial load
+        for start in range(0, len(new_rows), REFRESH_CHUNK_SIZE):
+            self.add_many([
+                (row.id, row.company_name, row.canonical_name) for row in new_rows[start:start + REFRESH_CHUNK_SIZE]
+            ])
+        new_aliases = sum(row.id > self._last_alias_id for row in alias_rows)
+        for row in alias_rows:
+            self.add_aliases(row.company_id, [row.alias])
+        if rows:
+            self._last_id = max(self._last_id, rows[-1].id)
+        if alias_rows:
+            self._last_alias_id = max(self._last_alias_id, alias_rows[-1].id)
+        if new_rows or new_aliases:
+            logger.info(
+                f"Name index: added {len(new_rows)} companies and {new_aliases} aliases ({len(self)} companies total)"
+            )
+        if prune:
+            deleted = indexed - live_ids
+            if deleted:
+                self.remove_many(deleted)
+                logger.info(f"Name index: removed {len(deleted)} deleted companies ({len(self)} companies total)")
+        if prune or not self.loaded:
+            self._next_prune_at = time.monotonic() + settings.NAME_INDEX_PRUNE_SECONDS
+        self.loaded = True
+        return len(new_rows)
+
+
+name_index = CompanyNameIndex()
@@ -0,0 +1,133 @@
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, Optional
+from sqlalchemy import text
+from app.database.connection import SessionLocal
+from app.utils.cache import TTLCache
+from app.utils.exceptions import GeminiAPIError, AnalysisDeadlineError, CompanyUnresolvedError
+from app.utils.logger import logger
+from app.config import settings
+
+
+def failure_reason(error: GeminiAPIError) -> str:
+    """Negative cache reason for a failed analysis"""
+    if isinstance(error, CompanyUnresolvedError):
+        return "unresolved"
+    if isinstance(error, AnalysisDeadlineError):
+        return "timeout"
+    return "api_error"
+
+
+def failure_ttl_seconds(reason: str) -> int:
+    # Errors and timeouts may be transient; an unusable answer is unlikely to change soon
+    if reason == "unresolved":
+        return settings.NEGATIVE_CACHE_TTL_SECONDS
+    return settings.NEGATIVE_CACHE_ERROR_TTL_SECONDS
+
+
+class NegativeCache:
+    """Company names whose analysis recently failed, so repeats fail fast
+
+    Keyed by normalize_company_name. Entries live in memory and in the
+    unresolved_company_names table, which is consulted on a memory miss so
+    every process shares them. Each records why the analysis failed and
+    expires after a TTL that depends on that reason.
+    """
+
+    def __init__(self) -> None:
+        self._memory: TTLCache[Dict[str, Any]] = TTLCache(
+            max_size=settings.NEGATIVE_CACHE_MAX_SIZE,
+            ttl_seconds=max(settings.NEGATIVE_CACHE_TTL_SECONDS, settings.NEGATIVE_CACHE_ERROR_TTL_SECONDS)
+        )
+
+    def get(self, name_key: str) -> Optional[Dict[str, Any]]:
+        """The unexpired failure recorded for name_key, if any"""
+        entry = self._memory.get(name_key)
+        if entry is not None:
+            return entry
+
+        db = SessionLocal()
+        try:
+            row = db.execute(
+                text("""
+                    SELECT reason, error_message, expires_at FROM unresolved_company_names
+                    WHERE name_key = :name_key AND expires_at > now()
+                """),
+                {"name_key": name_key}
+            ).first()
+        except Exception as e:
+            logger.warning(f"Negative cache lookup failed for '{name_key}': {e}")
+            return None
+        finally:
+            db.close()
+
+        if row is None:
+            return None
+        entry = {"reason": row.reason, "error_message": row.error_message, "expires_at": row.expires_at}
+        self._memory.set(name_key, entry, expires_at=row.expires_at.timestamp())
+        return entry
+
+    def record(self, name_key: str, company_name: str, error: GeminiAPIError) -> None:
+        """Remember a failed analysis until its reason's TTL passes"""
+        reason = failure_reason(error)
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=failure_ttl_seconds(reason))
+        entry = {"reason": reason, "error_message": error.message, "expires_at": expires_at}
+        self._memory.set(name_key, entry, expires_at=expires_at.timestamp())
+
+        db = SessionLocal()
+        try:
+            db.execute(
+                text("""
+                    INSERT INTO unresolved_company_names
+                        (name_key, company_name, reason, error_message, failures, expires_at, updated_at)
+                    VALUES (:name_key, :company_name, :reason, :error_message, 1, :expires_at, now())
+                    ON CONFLICT (name_key) DO UPDATE
+                    SET company_name = EXCLUDED.company_name, reason = EXCLUDED.reason,
+                        error_message = EXCLUDED.error_message, expires_at = EXCLUDED.expires_at,
+                        failures = unresolved_company_names.failures + 1, updated_at = now()
+                """),
+                {
+                    "name_key": name_key,
+                    "company_name": company_name[:255],
+                    "reason": reason,
+                    "error_message": error.message,
+                    "expires_at": expires_at
+                }
+            )
+            db.commit()
+            logger.info(f"Negative-cached '{name_key}' ({reason}) until {expires_at.isoformat()}")
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Failed to persist negative cache entry for '{name_key}': {e}")
+        finally:
+            db.close()
+
+    def forget(self, name_key: str) -> None:
+        """Drop the entry for a name that now has an analysis"""
+        self._memory.invalidate(name_key)
+        db = SessionLocal()
+        try:
+            db.execute(text("DELETE FROM unresolved_company_names WHERE name_key = :name_key"), {"name_key": name_key})
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Failed to drop negative cache entry for '{name_key}': {e}")
+        finally:
+            db.close()
+
+    def purge_expired(self) -> int:
+        """Delete expired rows from unresolved_company_names; returns how many"""
+        db = SessionLocal()
+        try:
+            purged = db.execute(text("DELETE FROM unresolved_company_names WHERE expires_at <= now()")).rowcount
+            db.commit()
+            if purged:
+                logger.info(f"Purged {purged} expired negative cache entries")
+            return purged
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+negative_cache = NegativeCache()
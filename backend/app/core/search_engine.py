@@ -1,75 +1,222 @@
-from typing import List, Optional, Dict, Any
+import math
+from typing import List, Optional, Dict, Any, Tuple, Union, Iterable, Sequence, TypeVar
+from rapidfuzz import fuzz, process
 from sqlalchemy.orm import Session
-from sqlalchemy import text, func
-from app.database.models import CompanyAnalysis
+from sqlalchemy import func, case, or_, select, text, ColumnElement, Connection
+from app.database.models import CompanyAnalysis, CompanyAlias
 from app.utils.logger import logger
-from app.utils.helpers import sanitize_company_name
+from app.utils.helpers import sanitize_company_name, normalize_company_name
+from app.core.name_index import (
+    name_index, RANK_EXACT_NAME, RANK_EXACT_OTHER, RANK_SUBSTRING_NAME, RANK_SUBSTRING_OTHER
+)
 
-def find_exact_match(db: Session, company_name: str) -> Optional[CompanyAnalysis]:
-    """Find exact company match (case-insensitive)"""
-    sanitized_name = sanitize_company_name(company_name)
+# Candidates fetched per lookup: the best match plus alternatives
+MATCH_LIMIT = 5
+# Candidates scored per name index lookup (names only; the chosen one is read by primary key)
+INDEX_CANDIDATE_LIMIT = 20
+# Minimum similarity (0-1) for a substring or typo-tolerant match to be served
+MIN_MATCH_SIMILARITY = 0.85
+# Shorter queries resolved by a fuzzy match are not remembered as aliases
+MIN_SEARCH_ALIAS_LENGTH = 4
+# Values the analysis uses for "no trade name"
+PLACEHOLDER_NAMES = {"n a", "na", "none", "null", "unknown", "not available", "same as legal name"}
+# Summary columns copied out of analysis_result: column -> (path, max length or None for scores)
+SUMMARY_FIELD_PATHS = {
+    "industry": (("company_basic_info", "industry_primary"), 255),
+    "headquarters_country": (("company_basic_info", "headquarters_country"), 100),
+    "revenue_estimate": (("company_basic_info", "revenue_estimate"), 100),
+    "employee_count_estimate": (("company_basic_info", "employee_count_estimate"), 100),
+    "acquisition_score": (("acquisition_scoring", "pe_scoring", "acquisition_score"), None),
+    "overall_opportunity_score": (("acquisition_scoring", "pe_scoring", "overall_opportunity_score"), None),
+}
+# Values the analysis uses for "not known", including the prompt template's own
+SUMMARY_PLACEHOLDERS = {"", "n/a", "na", "none", "null", "unknown", "not available", "string", "category"}
+
+def _like_escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def company_search_filter(search_term: str) -> ColumnElement[bool]:
+    """Substring or trigram-similar match on the company or canonical name
     
-    result = db.query(CompanyAnalysis).filter(
-        func.lower(CompanyAnalysis.company_name) == sanitized_name
-    ).first()
+    Both LIKE '%term%' and the pg_trgm % operator (similarity above
+    pg_trgm.similarity_threshold, 0.3 by default) are served by the GIN
+    trigram indexes on lower(company_name) and lower(canonical_name);
+    similarity() in a WHERE clause is not.
+    """
+    pattern = f"%{_like_escape(search_term)}%"
+    name = func.lower(CompanyAnalysis.company_name)
+    canonical_name = func.lower(CompanyAnalysis.canonical_name)
+    return or_(
+        name.like(pattern, escape="\\"),
+        canonical_name.like(pattern, escape="\\"),
+        name.op("%")(search_term),
+        canonical_name.op("%")(search_term)
+    )
+
+def suggest_companies(db: Session, prefix: str, limit: int = 10) -> List[Tuple[int, str, Optional[str]]]:
+    """(id, company_name, canonical_name) of companies whose names start with prefix
     
-    if result:
-        logger.info(f"Found exact match for '{company_name}': {result.canonical_name}")
+    Served from the name index's sorted prefix lists once loaded; until then
+    by a LIMITed LIKE 'prefix%' query (trigram indexes).
+    """
+    if name_index.loaded:
+        return name_index.suggest(prefix, limit)
     
-    return result
+    pattern = f"{_like_escape(sanitize_company_name(prefix))}%"
+    name = func.lower(CompanyAnalysis.company_name)
+    rows = (
+        db.query(CompanyAnalysis.id, CompanyAnalysis.company_name, CompanyAnalysis.canonical_name)
+        .filter(or_(name.like(pattern, escape="\\"), func.lower(CompanyAnalysis.canonical_name).like(pattern, escape="\\")))
+        .order_by(name, CompanyAnalysis.id)
+        .limit(limit)
+        .all()
+    )
+    return [(row.id, row.company_name, row.canonical_name) for row in rows]
 
-def find_fuzzy_matches(db: Session, company_name: str, similarity_threshold: float = 0.75) -> List[CompanyAnalysis]:
-    """Find fuzzy matches using basic pattern matching (Azure PostgreSQL compatible)"""
+def find_matches(db: Session, company_name: str, limit: int = MATCH_LIMIT) -> List[Tuple[CompanyAnalysis, int]]:
+    """Find exact and partial matches in one ranked, limited query
+    
+    Returns (company, rank) pairs, best first, with the name index's ranks:
+    RANK_EXACT_NAME for an exact company name match, RANK_EXACT_OTHER for an
+    exact canonical name or alias match, RANK_SUBSTRING_NAME and
+    RANK_SUBSTRING_OTHER for partial matches on the company and canonical name.
+    """
     sanitized_name = sanitize_company_name(company_name)
+    pattern = f"%{_like_escape(sanitized_name)}%"
     
-    # Use LIKE pattern matching instead of similarity function
-    query = text(""" 
-        SELECT * FROM company_analysis 
-        WHERE 
-            LOWER(company_name) LIKE :partial_pattern 
-            OR LOWER(company_name) LIKE :reverse_pattern 
-            OR LOWER(canonical_name) LIKE :partial_pattern 
-            OR LOWER(canonical_name) LIKE :reverse_pattern 
-        ORDER BY 
-            CASE 
-                WHEN LOWER(company_name) = :search_term THEN 1 
-                WHEN LOWER(canonical_name) = :search_term THEN 2 
-                WHEN LOWER(company_name) LIKE :partial_pattern THEN 3 
-                WHEN LOWER(canonical_name) LIKE :partial_pattern THEN 4 
-                ELSE 5 
-            END, 
-            LENGTH(company_name) 
-    """)
-    
-    results = db.execute(query, { 
-        "partial_pattern": f"%{sanitized_name}%", 
-        "reverse_pattern": f"{sanitized_name}%", 
-        "search_term": sanitized_name 
-    }).fetchall()
-    
-    # Convert to CompanyAnalysis objects
-    matches = []
-    for row in results:
-        match = db.query(CompanyAnalysis).filter(CompanyAnalysis.id == row.id).first()
-        if match:
-            matches.append(match)
-    
-    if matches:
-        logger.info(f"Found {len(matches)} fuzzy matches for '{company_name}'")
-    
-    return matches
-
-def get_best_match(matches: List[CompanyAnalysis], search_term: str, min_similarity: float = 0.85) -> Optional[CompanyAnalysis]:
-    """Get the best match from fuzzy results"""
-    if not matches:
-        return None
+    name = func.lower(CompanyAnalysis.company_name)
+    canonical_name = func.lower(CompanyAnalysis.canonical_name)
+    aliased = CompanyAnalysis.id.in_(
+        select(CompanyAlias.company_id).where(CompanyAlias.alias == normalize_company_name(company_name))
+    )
+    rank = case(
+        (name == sanitized_name, RANK_EXACT_NAME),
+        (or_(canonical_name == sanitized_name, aliased), RANK_EXACT_OTHER),
+        (name.like(pattern, escape="\\"), RANK_SUBSTRING_NAME),
+        else_=RANK_SUBSTRING_OTHER
+    )
+    
+    rows = (
+        db.query(CompanyAnalysis, rank.label("match_rank"))
+        .filter(or_(name.like(pattern, escape="\\"), canonical_name.like(pattern, escape="\\"), aliased))
+        .order_by(rank, func.length(CompanyAnalysis.company_name), CompanyAnalysis.id)
+        .limit(limit)
+        .all()
+    )
+    
+    if rows:
+        logger.info(f"Found {len(rows)} matches for '{company_name}'")
+    
+    return [(company, match_rank) for company, match_rank in rows]
+
+def similarity_scores(search_term: str, candidate_names: Sequence[Iterable[Optional[str]]]) -> List[float]:
+    """Similarity (0-1) of search_term to each candidate's best-matching name
+    
+    The mean of token-set similarity (shared words, in any order) and the
+    Levenshtein ratio of the token-sorted names, compared after
+    normalize_company_name: a short query inside a long unrelated name scores
+    high on the first but low on the second. All names are scored in one
+    rapidfuzz pass per scorer.
+    """
+    query = normalize_company_name(search_term)
+    names: List[str] = []
+    owners: List[int] = []
+    for position, candidate in enumerate(candidate_names):
+        for name in candidate:
+            if name:
+                names.append(normalize_company_name(name))
+                owners.append(position)
+    
+    combined = [0.0] * len(names)
+    for scorer in (fuzz.token_set_ratio, fuzz.token_sort_ratio):
+        for _, score, i in process.extract_iter(query, names, scorer=scorer):
+            combined[i] += score / 200
     
-    # For now, just return the first match (already ordered by similarity)
-    # In future, could implement more sophisticated scoring
-    best_match = matches[0]
+    scores = [0.0] * len(candidate_names)
+    for i, owner in enumerate(owners):
+        scores[owner] = max(scores[owner], combined[i])
+    return scores
+
+Candidate = TypeVar("Candidate")
+
+def accept_candidates(
+    candidates: List[Tuple[Candidate, int]],
+    scores: List[float],
+    min_similarity: float = MIN_MATCH_SIMILARITY
+) -> List[Tuple[Candidate, int, float]]:
+    """(candidate, rank, score) for candidates that may be served, best first
     
-    logger.info(f"Selected best match for '{search_term}': {best_match.canonical_name}")
-    return best_match
+    Exact company name, canonical name and alias matches are always accepted
+    and come first; substring and typo-tolerant matches need min_similarity
+    and are ordered by score.
+    """
+    accepted = [
+        (candidate, rank, score)
+        for (candidate, rank), score in zip(candidates, scores)
+        if rank < RANK_SUBSTRING_NAME or score >= min_similarity
+    ]
+    return sorted(accepted, key=lambda item: (min(item[1], RANK_SUBSTRING_NAME), -item[2]))
+
+def extract_company_aliases(
+    company_name: str,
+    canonical_name: Optional[str],
+    analysis_result: Optional[Dict[str, Any]]
+) -> Dict[str, str]:
+    """Normalized aliases of a company, each with its source (the first source wins)"""
+    basic_info = (analysis_result or {}).get("company_basic_info") or {}
+    names = [
+        ("company_name", company_name),
+        ("canonical_name", canonical_name),
+        ("company_name", basic_info.get("company_name")),
+        ("trade_name_dba", basic_info.get("trade_name_dba")),
+    ]
+    aliases: Dict[str, str] = {}
+    for source, name in names:
+        if not isinstance(name, str):
+            continue
+        alias = normalize_company_name(name)[:255]
+        if alias and alias not in PLACEHOLDER_NAMES:
+            aliases.setdefault(alias, source)
+    return aliases
+
+def _summary_value(value: Any, max_length: Optional[int]) -> Optional[Union[str, float]]:
+    if max_length is None:
+        if isinstance(value, bool):
+            return None
+        try:
+            score = float(value)
+        except (TypeError, ValueError):
+            return None
+        return score if math.isfinite(score) else None
+    if not isinstance(value, str):
+        return None
+    value = " ".join(value.split())
+    return None if value.lower() in SUMMARY_PLACEHOLDERS else value[:max_length]
+
+def extract_company_summary(analysis_result: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Summary column values (see SUMMARY_FIELD_PATHS) from an analysis; None where missing or unusable"""
+    summary: Dict[str, Any] = {}
+    for column, (path, max_length) in SUMMARY_FIELD_PATHS.items():
+        value: Any = analysis_result
+        for key in path:
+            value = value.get(key) if isinstance(value, dict) else None
+        summary[column] = _summary_value(value, max_length)
+    return summary
+
+def record_company_aliases(db: Union[Session, Connection], company_id: int, aliases: Dict[str, str]) -> None:
+    """Insert aliases for a company, skipping ones it already has (caller commits)"""
+    if not aliases:
+        return
+    db.execute(
+        text("""
+            INSERT INTO company_aliases (alias, company_id, source)
+            SELECT :alias, :company_id, :source
+            WHERE NOT EXISTS (
+                SELECT 1 FROM company_aliases WHERE alias = :alias AND company_id = :company_id
+            )
+        """),
+        [{"alias": alias, "company_id": company_id, "source": source} for alias, source in aliases.items()]
+    )
 
 def save_company_analysis(
     db: Session, 
@@ -89,13 +236,19 @@ def save_company_analysis(
         canonical_name=canonical_name,
         search_query=search_query,
         analysis_result=analysis_result,
-        status="success"
+        status="success",
+        **extract_company_summary(analysis_result)
     )
     
+    aliases = extract_company_aliases(company_name, canonical_name, analysis_result)
+    
     try:
         db.add(company_record)
+        db.flush()
+        record_company_aliases(db, company_record.id, aliases)
         db.commit()
         db.refresh(company_record)
+        name_index.add(company_record.id, company_record.company_name, canonical_name, aliases)
         logger.info(f"Saved analysis for '{company_name}' with ID: {company_record.id}")
         return company_record
     except Exception as e:
@@ -103,41 +256,95 @@ def save_company_analysis(
         logger.error(f"Failed to save analysis for '{company_name}': {e}")
         raise
 
+def remember_search_alias(db: Session, company_name: str, company_id: int) -> None:
+    """Record a query resolved by a fuzzy match as an alias, so repeats match exactly"""
+    alias = normalize_company_name(company_name)[:255]
+    if len(alias) < MIN_SEARCH_ALIAS_LENGTH:
+        return
+    
+    # Own session: the caller's may hold loaded rows that a commit would expire
+    alias_db = Session(bind=db.get_bind())
+    try:
+        record_company_aliases(alias_db, company_id, {alias: "search"})
+        alias_db.commit()
+        name_index.add_aliases(company_id, [alias])
+        logger.info(f"Recorded alias '{alias}' for company {company_id}")
+    except Exception as e:
+        alias_db.rollback()
+        logger.warning(f"Failed to record alias '{alias}' for company {company_id}: {e}")
+    finally:
+        alias_db.close()
+
+def _match_result(
+    db: Session,
+    company_name: str,
+    company: CompanyAnalysis,
+    rank: int,
+    ranked: List[Tuple[int, Optional[str], float]]
+) -> Dict[str, Any]:
+    """Search result for the chosen company; ranked is (id, canonical_name, score) from it onwards"""
+    if rank == RANK_EXACT_NAME:
+        logger.info(f"Found exact match for '{company_name}': {company.canonical_name}")
+        match_type = "exact"
+    elif len(ranked) == 1:
+        match_type = "fuzzy_single"
+        if rank >= RANK_SUBSTRING_NAME:
+            remember_search_alias(db, company_name, company.id)
+    else:
+        match_type = "fuzzy_best"
+    
+    result = {"found_existing": True, "company": company, "match_type": match_type}
+    if match_type == "fuzzy_best":
+        result["alternatives"] = [
+            {"company_id": company_id, "canonical_name": canonical_name, "score": round(score, 3)}
+            for company_id, canonical_name, score in ranked[:MATCH_LIMIT]
+        ]
+    return result
+
+def _search_name_index(db: Session, company_name: str) -> Optional[Dict[str, Any]]:
+    """Resolve a search from the in-memory name index, confirming the hit by primary key"""
+    matches = name_index.lookup(company_name, INDEX_CANDIDATE_LIMIT)
+    scores = similarity_scores(company_name, [name_index.names(company_id) for company_id, _ in matches])
+    accepted = accept_candidates(matches, scores)
+    for position, (company_id, rank, _) in enumerate(accepted):
+        company = db.get(CompanyAnalysis, company_id)
+        if company is None:
+            # Deleted since it was indexed
+            name_index.remove(company_id)
+            continue
+        
+        ranked = [(cid, name_index.canonical_name(cid), score) for cid, _, score in accepted[position:]]
+        return _match_result(db, company_name, company, rank, ranked)
+    return None
+
 def search_company(db: Session, company_name: str) -> Dict[str, Any]:
-    """Main company search logic with fuzzy matching"""
-    original_query = company_name
-    
-    # Step 1: Exact match
-    exact_match = find_exact_match(db, company_name)
-    if exact_match:
-        return {
-            "found_existing": True,
-            "company": exact_match,
-            "match_type": "exact"
-        }
-    
-    # Step 2: Fuzzy matching
-    fuzzy_matches = find_fuzzy_matches(db, company_name)
-    
-    if len(fuzzy_matches) == 1:
-        return {
-            "found_existing": True,
-            "company": fuzzy_matches[0],
-            "match_type": "fuzzy_single"
-        }
-    elif len(fuzzy_matches) > 1:
-        best_match = get_best_match(fuzzy_matches, company_name)
-        if best_match:
-            return {
-                "found_existing": True,
-                "company": best_match,
-                "match_type": "fuzzy_best",
-                "alternatives": [m.canonical_name for m in fuzzy_matches[:5]]
-            }
-    
-    # Step 3: No matches found
+    """Main company search logic with fuzzy matching
+    
+    Served from the in-memory name index when it is loaded (one primary-key
+    read to confirm the hit); otherwise, or on an index miss, by one ranked
+    database query. Candidates that aren't exact name, canonical name or
+    alias matches are scored and only served above MIN_MATCH_SIMILARITY.
+    """
+    if name_index.loaded:
+        indexed_result = _search_name_index(db, company_name)
+        if indexed_result:
+            return indexed_result
+    
+    matches = find_matches(db, company_name)
+    for company, _ in matches:
+        # Saved by another process since the index last refreshed
+        name_index.add(company.id, company.company_name, company.canonical_name)
+    
+    scores = similarity_scores(company_name, [(c.company_name, c.canonical_name) for c, _ in matches])
+    accepted = accept_candidates(matches, scores)
+    if accepted:
+        company, rank, _ = accepted[0]
+        ranked = [(c.id, c.canonical_name, score) for c, _, score in accepted]
+        return _match_result(db, company_name, company, rank, ranked)
+    
+    # No matches found
     return {
         "found_existing": False,
         "company": None,
         "match_type": "none"
-    }
\ No newline at end of file
+    }
@@ -0,0 +1,120 @@
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, TypeVar
+from sqlalchemy import text
+from app.database.connection import SessionLocal
+from app.utils.logger import logger
+
+T = TypeVar("T")
+
+# Poll interval while another worker holds the analysis claim for a name
+ANALYSIS_CLAIM_POLL_SECONDS = 1.0
+
+
+class SingleFlight:
+    """Coalesce concurrent async calls that share a key into one execution
+    
+    The first caller for a key starts the work as a task; callers arriving while
+    it runs await the same task and share its result or exception. Cancelling a
+    waiter does not cancel the shared work unless it was the last one waiting,
+    so abandoned work doesn't keep running for nobody.
+    """
+    
+    def __init__(self) -> None:
+        self._inflight: Dict[str, "asyncio.Task[Any]"] = {}
+        self._waiters: Dict["asyncio.Task[Any]", int] = {}
+    
+    def in_flight(self, key: str) -> bool:
+        return key in self._inflight
+    
+    async def do(self, key: str, func: Callable[[], Awaitable[T]]) -> T:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(func())
+            self._inflight[key] = task
+            
+            def _forget(done: "asyncio.Task[Any]") -> None:
+                if self._inflight.get(key) is done:
+                    del self._inflight[key]
+            
+            task.add_done_callback(_forget)
+        else:
+            logger.info(f"Joining in-flight work for '{key}'")
+        
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self._waiters[task] == 1 and not task.done():
+                logger.info(f"Last waiter for '{key}' cancelled, cancelling the shared work")
+                task.cancel()
+            raise
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+
+
+def _try_claim(name_key: str, owner: str, ttl_seconds: float) -> bool:
+    """Insert the claim row for name_key, or take it over once it has lapsed"""
+    now = datetime.now(timezone.utc)
+    db = SessionLocal()
+    try:
+        claimed = db.execute(
+            text("""
+                INSERT INTO analysis_claims (name_key, owner, expires_at)
+                VALUES (:name_key, :owner, :expires_at)
+                ON CONFLICT (name_key) DO UPDATE
+                SET owner = EXCLUDED.owner, expires_at = EXCLUDED.expires_at
+                WHERE analysis_claims.expires_at <= :now
+                RETURNING owner
+            """),
+            {
+                "name_key": name_key,
+                "owner": owner,
+                "expires_at": now + timedelta(seconds=ttl_seconds),
+                "now": now
+            }
+        ).first()
+        db.commit()
+        return claimed is not None
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def _release_claim(name_key: str, owner: str) -> None:
+    db = SessionLocal()
+    try:
+        db.execute(
+            text("DELETE FROM analysis_claims WHERE name_key = :name_key AND owner = :owner"),
+            {"name_key": name_key, "owner": owner}
+        )
+        db.commit()
+    except Exception as e:
+        # The claim lapses at its expires_at instead
+        db.rollback()
+        logger.warning(f"Failed to release analysis claim for '{name_key}': {e}")
+    finally:
+        db.close()
+
+
+@asynccontextmanager
+async def analysis_claim(name_key: str, ttl_seconds: float) -> AsyncIterator[None]:
+    """Hold the analysis_claims row for name_key across workers
+
+    Claiming and releasing are each one short transaction, so no database
+    connection is held while the claim is. Waiters poll until the holder
+    releases the row or it lapses ttl_seconds after being claimed.
+    """
+    owner = uuid.uuid4().hex
+    while not await asyncio.to_thread(_try_claim, name_key, owner, ttl_seconds):
+        await asyncio.sleep(ANALYSIS_CLAIM_POLL_SECONDS)
+    try:
+        yield
+    finally:
+        await asyncio.to_thread(_release_claim, name_key, owner)
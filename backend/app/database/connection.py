@@ -41,7 +41,7 @@ def init_db() -> None:
     """Initialize database tables"""
     try:
         # Import models to ensure they're registered with metadata
-        from app.database.models import CompanyAnalysis, AccessToken, AsyncJob
+        from app.database.models import CompanyAnalysis, AccessToken, RevokedToken, AsyncJob, AnalysisBatch
         
         # Test connection first
         with engine.connect() as conn:
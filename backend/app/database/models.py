@@ -1,11 +1,34 @@
 from typing import Dict, Any, Optional
-from sqlalchemy import Column, Integer, String, DateTime, Text, Index
+from sqlalchemy import Column, Integer, Float, String, DateTime, Text, Index, ForeignKey, UniqueConstraint, text
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
 from app.database.connection import Base
 
 class CompanyAnalysis(Base):
     __tablename__ = "company_analysis"
+    __table_args__ = (
+        # Case-insensitive lookups and substring / trigram search; existing
+        # databases get these CONCURRENTLY through migration 0005
+        Index("idx_company_name", text("lower(company_name)")),
+        Index("idx_canonical_name", text("lower(canonical_name)")),
+        Index(
+            "idx_company_name_trgm", text("lower(company_name) gin_trgm_ops"), postgresql_using="gin"
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "idx_canonical_name_trgm", text("lower(canonical_name) gin_trgm_ops"), postgresql_using="gin"
+        ).ddl_if(dialect="postgresql"),
+        # Keyset pagination of listings, newest first (migration 0008)
+        Index("ix_company_analysis_created_at_id", "created_at", "id"),
+        # Listing filters (newest first within them) and score orderings (migration 0009)
+        Index("ix_company_analysis_industry", text("lower(industry)"), "created_at", "id"),
+        # Substring (ILIKE) industry filter (migration 0012)
+        Index(
+            "ix_company_analysis_industry_trgm", text("industry gin_trgm_ops"), postgresql_using="gin"
+        ).ddl_if(dialect="postgresql"),
+        Index("ix_company_analysis_headquarters_country", text("lower(headquarters_country)"), "created_at", "id"),
+        Index("ix_company_analysis_acquisition_score", "acquisition_score", "id"),
+        Index("ix_company_analysis_overall_opportunity_score", "overall_opportunity_score", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     company_name = Column(String(255), nullable=False, index=True)
@@ -14,11 +37,65 @@ class CompanyAnalysis(Base):
     analysis_result = Column(JSONB, nullable=False)
     status = Column(String(50), nullable=False, default="success")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Copied out of analysis_result when saved (search_engine.extract_company_summary)
+    industry = Column(String(255), nullable=True)
+    headquarters_country = Column(String(100), nullable=True)
+    revenue_estimate = Column(String(100), nullable=True)
+    employee_count_estimate = Column(String(100), nullable=True)
+    acquisition_score = Column(Float, nullable=True)
+    overall_opportunity_score = Column(Float, nullable=True)
     
     def __repr__(self) -> str:
         return f"<CompanyAnalysis(id={self.id}, company_name='{self.company_name}')>"
 
 
+class CompanyAlias(Base):
+    __tablename__ = "company_aliases"
+    __table_args__ = (
+        UniqueConstraint("alias", "company_id", name="uq_company_aliases_alias_company_id"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    # normalize_company_name() of a name that resolves to the company
+    alias = Column(String(255), nullable=False, index=True)
+    company_id = Column(Integer, ForeignKey("company_analysis.id", ondelete="CASCADE"), nullable=False, index=True)
+    source = Column(String(50), nullable=False)  # company_name, canonical_name, trade_name_dba, search
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    def __repr__(self) -> str:
+        return f"<CompanyAlias(id={self.id}, alias='{self.alias}', company_id={self.company_id})>"
+
+
+class UnresolvedCompanyName(Base):
+    __tablename__ = "unresolved_company_names"
+    
+    # normalize_company_name() of the searched name
+    name_key = Column(String(255), primary_key=True)
+    company_name = Column(String(255), nullable=False)
+    reason = Column(String(50), nullable=False)  # unresolved, timeout, api_error
+    error_message = Column(Text, nullable=True)
+    failures = Column(Integer, nullable=False, default=1, server_default="1")
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    def __repr__(self) -> str:
+        return f"<UnresolvedCompanyName(name_key='{self.name_key}', reason='{self.reason}', expires_at='{self.expires_at}')>"
+
+
+class AnalysisClaim(Base):
+    __tablename__ = "analysis_claims"
+    
+    # normalize_company_name() of the company being analyzed
+    name_key = Column(String(255), primary_key=True)
+    # Random id of the get_or_create_analysis call holding the claim
+    owner = Column(String(64), nullable=False)
+    # A claim left behind by a crashed worker lapses here
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    
+    def __repr__(self) -> str:
+        return f"<AnalysisClaim(name_key='{self.name_key}', owner='{self.owner}', expires_at='{self.expires_at}')>"
+
+
 class AccessToken(Base):
     __tablename__ = "access_tokens"
     
@@ -32,18 +109,63 @@ class AccessToken(Base):
         return f"<AccessToken(id={self.id}, client_id='{self.client_id}', expires_at='{self.expires_at}')>"
 
 
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    jti = Column(String(255), nullable=False, unique=True, index=True)
+    client_id = Column(String(255), nullable=False)
+    revoked_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    
+    def __repr__(self) -> str:
+        return f"<RevokedToken(id={self.id}, jti='{self.jti}', expires_at='{self.expires_at}')>"
+
+
 class AsyncJob(Base):
     __tablename__ = "async_jobs"
+    __table_args__ = (
+        # Claim order for queued jobs and lease-expiry scans
+        Index("ix_async_jobs_status_created_at", "status", "created_at"),
+        Index("ix_async_jobs_lease_expires_at", "lease_expires_at"),
+        # Retention purge of finished jobs
+        Index("ix_async_jobs_completed_at", "completed_at"),
+        # In-flight lookups by company name (batch dedupe)
+        Index("ix_async_jobs_lower_company_name", text("lower(company_name)")),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     job_id = Column(String(255), nullable=False, unique=True, index=True)
     company_name = Column(String(255), nullable=False)
-    status = Column(String(50), nullable=False, default="processing")  # processing, completed, failed
+    status = Column(String(50), nullable=False, default="queued")  # queued, processing, completed, failed, cancelled
+    # Completed jobs reference the analysis; result only holds rows from before company_id existed
+    company_id = Column(Integer, ForeignKey("company_analysis.id", ondelete="SET NULL"), nullable=True, index=True)
     result = Column(JSONB, nullable=True)
     error_message = Column(Text, nullable=True)
     progress_message = Column(String(255), nullable=True, default="Starting analysis...")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     completed_at = Column(DateTime(timezone=True), nullable=True)
+    # Queue lease: the claiming worker must heartbeat before lease_expires_at
+    worker_id = Column(String(255), nullable=True)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+    # When the current attempt was claimed; the running-job deadline counts from here
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    
+    def __repr__(self) -> str:
+        return f"<AsyncJob(id={self.id}, job_id='{self.job_id}', status='{self.status}')>"
+
+
+class AnalysisBatch(Base):
+    __tablename__ = "analysis_batches"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    batch_id = Column(String(255), nullable=False, unique=True, index=True)
+    # [{"company_name", "company_id", "job_id"}]: company_id for names already analyzed, job_id for misses
+    items = Column(JSONB, nullable=False)
+    total = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     def __repr__(self) -> str:
-        return f"<AsyncJob(id={self.id}, job_id='{self.job_id}', status='{self.status}')>"
\ No newline at end of file
+        return f"<AnalysisBatch(id={self.id}, batch_id='{self.batch_id}', total={self.total})>"
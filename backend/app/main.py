@@ -7,7 +7,13 @@ from typing import AsyncGenerator
 import time
 
 from app.database.connection import init_db
-from app.core.auth import cleanup_expired_tokens
+from app.core.auth import cleanup_expired_tokens, refresh_revoked_tokens
+from app.core.background import start_periodic_task, stop_background_tasks
+from app.core.async_processor import analysis_pool
+from app.core.job_queue import reconcile_inflight_jobs, run_job_maintenance
+from app.core.job_events import job_events
+from app.core.name_index import name_index
+from app.core.negative_cache import negative_cache
 from app.api import auth, admin, companies
 from app.utils.logger import logger
 from app.utils.exceptions import APIException
@@ -18,6 +24,12 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     """Application lifespan events"""
     # Startup
     logger.info("Starting Company Analysis API...")
+    try:
+        settings.validate()
+    except ValueError as e:
+        logger.error(f"Invalid configuration: {e}")
+        raise
+    
     try:
         init_db()
         logger.info("Database initialized successfully")
@@ -25,11 +37,51 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         logger.error(f"Failed to initialize database: {e}")
         raise
     
+    # Signed tokens are checked against this set without a per-request DB read
+    start_periodic_task(
+        "token-revocations",
+        settings.TOKEN_REVOCATION_REFRESH_SECONDS,
+        refresh_revoked_tokens
+    )
+    start_periodic_task(
+        "token-sweeper",
+        settings.TOKEN_SWEEP_INTERVAL_SECONDS,
+        cleanup_expired_tokens
+    )
+    
+    # Loads every company name on the first run, then only newly saved ones
+    start_periodic_task(
+        "name-index-refresh",
+        settings.NAME_INDEX_REFRESH_SECONDS,
+        name_index.refresh
+    )
+    start_periodic_task(
+        "job-maintenance",
+        settings.JOB_MAINTENANCE_INTERVAL_SECONDS,
+        run_job_maintenance
+    )
+    start_periodic_task(
+        "negative-cache-purge",
+        settings.JOB_MAINTENANCE_INTERVAL_SECONDS,
+        negative_cache.purge_expired
+    )
+    
+    # Jobs a previous run of this process was working on have no live worker
+    try:
+        reconcile_inflight_jobs()
+    except Exception as e:
+        logger.error(f"Failed to reconcile in-flight jobs: {e}")
+    
+    job_events.start()
+    analysis_pool.start()
+    
     yield
     
     # Shutdown
     logger.info("Shutting down Company Analysis API...")
-    cleanup_expired_tokens()
+    await analysis_pool.stop()
+    await job_events.stop()
+    await stop_background_tasks()
 
 app = FastAPI(
     title="Company Analysis API",
@@ -63,9 +115,18 @@ async def add_cache_headers(request: Request, call_next):
     response.headers["X-Process-Time"] = str(process_time)
     
     # Add cache headers based on endpoint
-    if request.url.path.startswith("/companies"):
+    if request.url.path.endswith("/events") or "ETag" in response.headers:
+        # Event streams and endpoints with their own validators set their own headers
+        pass
+    elif request.url.path.startswith(("/companies/jobs/", "/companies/batch")):
+        # Job and batch status change while clients poll; never serve them from a cache
+        response.headers["Cache-Control"] = "no-store"
+    elif request.url.path.startswith("/companies"):
         if request.method == "GET":
-            if "search" in str(request.query_params):
+            if request.url.path.endswith("/suggest"):
+                # Typeahead: short-lived, so newly analyzed companies show up soon
+                response.headers["Cache-Control"] = "private, max-age=60"
+            elif "search" in str(request.query_params):
                 # Search results cache for 5 minutes
                 response.headers["Cache-Control"] = "public, max-age=300"
             else:
@@ -1,4 +1,4 @@
-from typing import Optional, Any, Dict
+from typing import Optional, Any, Dict, List
 from datetime import datetime
 from pydantic import BaseModel
 
@@ -13,6 +13,7 @@ class AsyncJobResponse(BaseModel):
     progress_message: Optional[str] = None
     created_at: datetime
     estimated_completion: Optional[datetime] = None
+    queue_position: Optional[int] = None
     
     class Config:
         from_attributes = True
@@ -22,10 +23,13 @@ class AsyncJobStatus(BaseModel):
     job_id: str
     status: str
     progress_message: Optional[str] = None
-    result: Optional[Dict[str, Any]] = None
+    company_id: Optional[int] = None  # Completed analysis, served by GET /companies/{company_id}
+    result: Optional[Dict[str, Any]] = None  # Only for jobs completed before company_id existed
     error_message: Optional[str] = None
     created_at: datetime
     completed_at: Optional[datetime] = None
+    queue_position: Optional[int] = None  # Position while waiting for a worker
+    queue_depth: Optional[int] = None  # Jobs waiting in the analysis queue
     
     class Config:
         from_attributes = True
@@ -38,4 +42,25 @@ class AsyncJobComplete(BaseModel):
     completed_at: datetime
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class BatchCreate(BaseModel):
+    company_names: List[str]
+
+
+class BatchItemStatus(BaseModel):
+    company_name: str
+    status: str  # existing, queued, processing, completed, failed, cancelled
+    company_id: Optional[int] = None
+    job_id: Optional[str] = None
+    error_message: Optional[str] = None
+
+
+class BatchStatus(BaseModel):
+    batch_id: str
+    total: int
+    counts: Dict[str, int]  # items per status
+    done: bool
+    created_at: datetime
+    items: List[BatchItemStatus]
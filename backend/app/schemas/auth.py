@@ -7,4 +7,7 @@ class TokenRequest(BaseModel):
 class TokenResponse(BaseModel):
     access_token: str
     token_type: str = "bearer"
-    expires_in: int
\ No newline at end of file
+    expires_in: int
+
+class RevokeTokenResponse(BaseModel):
+    message: str
@@ -1,4 +1,4 @@
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Union
 from pydantic import BaseModel
 from datetime import datetime
 
@@ -18,8 +18,31 @@ class CompanyNotFoundResponse(BaseModel):
     message: str
     suggestions: Optional[List[str]] = None
 
+class CompanySuggestion(BaseModel):
+    id: int
+    company_name: str
+    canonical_name: Optional[str]
+
+class CompanySuggestResponse(BaseModel):
+    suggestions: List[CompanySuggestion]
+
+# Listing row for view=summary or fields=: no analysis_result, only the
+# requested fields (unrequested ones are left out of the response)
+class CompanySummary(BaseModel):
+    id: int
+    company_name: Optional[str] = None
+    canonical_name: Optional[str] = None
+    status: Optional[str] = None
+    created_at: Optional[datetime] = None
+    industry: Optional[str] = None
+    headquarters_country: Optional[str] = None
+    revenue_estimate: Optional[str] = None
+    employee_count_estimate: Optional[str] = None
+    acquisition_score: Optional[float] = None
+    overall_opportunity_score: Optional[float] = None
+
 class CompanyListResponse(BaseModel):
-    companies: List[CompanySearchResponse]
+    companies: List[Union[CompanySearchResponse, CompanySummary]]
     total: Optional[int] = None  # Made optional for performance
     limit: int
     offset: int
@@ -18,6 +18,25 @@ class GeminiAPIError(APIException):
     def __init__(self, message: str = "Gemini API error"):
         super().__init__(message, 503)
 
+class AnalysisDeadlineError(GeminiAPIError):
+    def __init__(self, message: str = "Analysis exceeded its time budget"):
+        super().__init__(message)
+        self.status_code = 504
+
+class CompanyUnresolvedError(GeminiAPIError):
+    def __init__(self, message: str = "No usable analysis could be generated for this company"):
+        super().__init__(message)
+        self.status_code = 404
+
 class DatabaseError(APIException):
     def __init__(self, message: str = "Database error"):
-        super().__init__(message, 500)
\ No newline at end of file
+        super().__init__(message, 500)
+
+class QueueFullError(APIException):
+    def __init__(self, message: str = "Analysis queue is full, please retry later", retry_after: int = 30):
+        self.retry_after = retry_after
+        super().__init__(message, 503)
+
+class BatchTooLargeError(APIException):
+    def __init__(self, message: str = "Batch exceeds the maximum number of companies"):
+        super().__init__(message, 413)
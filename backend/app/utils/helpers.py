@@ -1,5 +1,9 @@
+import re
+import json
 import time
+import base64
 import secrets
+import unicodedata
 from typing import Any, Dict
 from datetime import datetime, timedelta
 
@@ -15,6 +19,56 @@ def exponential_backoff_delay(attempt: int) -> float:
     """Calculate exponential backoff delay"""
     return min(2 ** attempt, 16)  # Max 16 seconds
 
+# Dots inside abbreviations join letters ("l.l.c." -> "llc"); other punctuation separates words
+ABBREVIATION_DOT = re.compile(r"(?<=\b\w)\.(?=\w\b)")
+NON_ALPHANUMERIC = re.compile(r"[^a-z0-9]+")
+# Legal-form words dropped from the end of a name
+LEGAL_SUFFIXES = {
+    "incorporated", "inc", "corporation", "corp", "company", "co", "limited", "ltd",
+    "llc", "llp", "lp", "plc", "gmbh", "ag", "sa", "nv", "bv", "pty", "pte", "srl", "spa",
+}
+
 def sanitize_company_name(name: str) -> str:
     """Sanitize company name for search"""
-    return name.strip().lower()
\ No newline at end of file
+    return name.strip().lower()
+
+def normalize_company_name(name: str) -> str:
+    """Canonical lookup key for a company name
+    
+    Folds unicode to ASCII, lowercases, turns "&" into "and", drops
+    punctuation (so "L.L.C." becomes "llc"), a leading "the" and trailing
+    legal-form suffixes: "The Microsoft Corp." and "Microsoft Corporation"
+    both become "microsoft". At least one word is always kept.
+    """
+    folded = name if name.isascii() else unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii")
+    folded = folded.lower().replace("&", " and ").replace("'", "")
+    if "." in folded:
+        folded = ABBREVIATION_DOT.sub("", folded)
+    core = NON_ALPHANUMERIC.sub(" ", folded).split()
+    if not core:
+        # Nothing survives ASCII folding (e.g. non-Latin scripts)
+        return sanitize_company_name(name)
+    
+    if len(core) > 1 and core[0] == "the":
+        core = core[1:]
+    while len(core) > 1 and core[-1] in LEGAL_SUFFIXES:
+        core.pop()
+    if len(core) > 1 and core[-1] == "and":
+        # "Smith & Co." -> "smith"
+        core.pop()
+    return " ".join(core)
+
+def encode_cursor(payload: Dict[str, Any]) -> str:
+    """Opaque pagination cursor (URL-safe) for a JSON-serializable payload"""
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """Payload of a cursor from encode_cursor; ValueError if it isn't one"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Malformed cursor: {e}")
+    if not isinstance(payload, dict):
+        raise ValueError("Malformed cursor")
+    return payload
\ No newline at end of file
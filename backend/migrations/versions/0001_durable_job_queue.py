@@ -0,0 +1,49 @@
+"""durable job queue columns on async_jobs
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE async_jobs ADD COLUMN IF NOT EXISTS worker_id VARCHAR(255)")
+    op.execute("ALTER TABLE async_jobs ADD COLUMN IF NOT EXISTS attempts INTEGER NOT NULL DEFAULT 0")
+    op.execute("ALTER TABLE async_jobs ADD COLUMN IF NOT EXISTS lease_expires_at TIMESTAMP WITH TIME ZONE")
+    op.execute("ALTER TABLE async_jobs ADD COLUMN IF NOT EXISTS heartbeat_at TIMESTAMP WITH TIME ZONE")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_async_jobs_status_created_at ON async_jobs (status, created_at)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_async_jobs_lease_expires_at ON async_jobs (lease_expires_at)")
+
+    # Jobs that were running in API threads before the queue existed died with
+    # their workers: requeue recent ones, fail the long-stranded rest.
+    op.execute(
+        "UPDATE async_jobs SET status = 'queued', progress_message = 'Queued for analysis...' "
+        "WHERE status = 'processing' AND created_at > now() - interval '1 hour'"
+    )
+    op.execute(
+        "UPDATE async_jobs SET status = 'failed', completed_at = now(), "
+        "progress_message = 'Analysis failed', error_message = 'Job was abandoned by a restarted worker' "
+        "WHERE status = 'processing'"
+    )
+
+
+def downgrade() -> None:
+    op.execute("UPDATE async_jobs SET status = 'processing' WHERE status = 'queued'")
+    op.drop_index("ix_async_jobs_lease_expires_at", table_name="async_jobs")
+    op.drop_index("ix_async_jobs_status_created_at", table_name="async_jobs")
+    op.drop_column("async_jobs", "heartbeat_at")
+    op.drop_column("async_jobs", "lease_expires_at")
+    op.drop_column("async_jobs", "attempts")
+    op.drop_column("async_jobs", "worker_id")
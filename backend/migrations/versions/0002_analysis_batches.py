@@ -0,0 +1,35 @@
+"""analysis_batches table for batch enrichment
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "CREATE TABLE IF NOT EXISTS analysis_batches ("
+        "id SERIAL PRIMARY KEY, "
+        "batch_id VARCHAR(255) NOT NULL, "
+        "items JSONB NOT NULL, "
+        "total INTEGER NOT NULL, "
+        "created_at TIMESTAMP WITH TIME ZONE DEFAULT now())"
+    )
+    op.execute("CREATE UNIQUE INDEX IF NOT EXISTS ix_analysis_batches_batch_id ON analysis_batches (batch_id)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_analysis_batches_id ON analysis_batches (id)")
+
+
+def downgrade() -> None:
+    op.drop_table("analysis_batches")
@@ -0,0 +1,45 @@
+"""async_jobs reference company_analysis instead of copying the result
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "ALTER TABLE async_jobs ADD COLUMN IF NOT EXISTS company_id INTEGER "
+        "REFERENCES company_analysis (id) ON DELETE SET NULL"
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS ix_async_jobs_company_id ON async_jobs (company_id)")
+
+    # Completed jobs carried a copy of the serialized analysis, including its id
+    op.execute(
+        "UPDATE async_jobs j SET company_id = c.id, result = NULL "
+        "FROM company_analysis c "
+        "WHERE j.result IS NOT NULL AND j.company_id IS NULL "
+        "AND j.result->>'id' ~ '^[0-9]+$' AND c.id = (j.result->>'id')::int"
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        "UPDATE async_jobs j SET result = jsonb_build_object("
+        "'id', c.id, 'company_name', c.company_name, 'canonical_name', c.canonical_name, "
+        "'analysis_result', c.analysis_result, 'status', c.status, 'created_at', c.created_at) "
+        "FROM company_analysis c WHERE c.id = j.company_id AND j.result IS NULL"
+    )
+    op.drop_index("ix_async_jobs_company_id", table_name="async_jobs")
+    op.drop_column("async_jobs", "company_id")
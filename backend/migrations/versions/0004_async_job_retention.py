@@ -0,0 +1,26 @@
+"""index async_jobs.completed_at for the retention purge
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE INDEX IF NOT EXISTS ix_async_jobs_completed_at ON async_jobs (completed_at)")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_async_jobs_completed_at", table_name="async_jobs")
@@ -0,0 +1,49 @@
+"""lower() and trigram indexes for company search, built concurrently
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Same names as scripts/create_tables.sql, so databases set up from it are left as they are
+INDEXES = (
+    ("idx_company_name", "company_analysis", "(lower(company_name))"),
+    ("idx_canonical_name", "company_analysis", "(lower(canonical_name))"),
+    ("idx_company_name_trgm", "company_analysis", "USING gin (lower(company_name) gin_trgm_ops)"),
+    ("idx_canonical_name_trgm", "company_analysis", "USING gin (lower(canonical_name) gin_trgm_ops)"),
+    ("ix_async_jobs_lower_company_name", "async_jobs", "(lower(company_name))"),
+)
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # CONCURRENTLY can't run inside a transaction; it keeps the tables writable while building
+    with op.get_context().autocommit_block():
+        for name, table, definition in INDEXES:
+            # A failed concurrent build leaves an INVALID index that IF NOT EXISTS would keep
+            op.execute(
+                f"DO $$ BEGIN "
+                f"IF EXISTS (SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                f"WHERE c.relname = '{name}' AND NOT i.indisvalid) THEN "
+                f"EXECUTE 'DROP INDEX {name}'; END IF; END $$"
+            )
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} {definition}")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, _, _ in reversed(INDEXES):
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
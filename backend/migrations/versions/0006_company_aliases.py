@@ -0,0 +1,128 @@
+"""company_aliases table, backfilled from existing analyses
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 00:00:00
+
+"""
+import re
+import unicodedata
+from typing import Any, Dict, Optional, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 1000
+
+# Normalization as of this revision, copied from app.utils.helpers and
+# app.core.search_engine so the backfill doesn't change when app code does
+ABBREVIATION_DOT = re.compile(r"(?<=\b\w)\.(?=\w\b)")
+NON_ALPHANUMERIC = re.compile(r"[^a-z0-9]+")
+LEGAL_SUFFIXES = {
+    "incorporated", "inc", "corporation", "corp", "company", "co", "limited", "ltd",
+    "llc", "llp", "lp", "plc", "gmbh", "ag", "sa", "nv", "bv", "pty", "pte", "srl", "spa",
+}
+PLACEHOLDER_NAMES = {"n a", "na", "none", "null", "unknown", "not available", "same as legal name"}
+
+
+def normalize_company_name(name: str) -> str:
+    """Lookup key: ASCII-folded and lowercased, without punctuation, a leading "the" or legal suffixes"""
+    folded = name if name.isascii() else unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii")
+    folded = folded.lower().replace("&", " and ").replace("'", "")
+    if "." in folded:
+        folded = ABBREVIATION_DOT.sub("", folded)
+    core = NON_ALPHANUMERIC.sub(" ", folded).split()
+    if not core:
+        return name.strip().lower()
+
+    if len(core) > 1 and core[0] == "the":
+        core = core[1:]
+    while len(core) > 1 and core[-1] in LEGAL_SUFFIXES:
+        core.pop()
+    if len(core) > 1 and core[-1] == "and":
+        core.pop()
+    return " ".join(core)
+
+
+def extract_company_aliases(
+    company_name: str,
+    canonical_name: Optional[str],
+    basic_info: Optional[Dict[str, Any]]
+) -> Dict[str, str]:
+    """Normalized aliases of a company, each with its source (the first source wins)"""
+    basic_info = basic_info or {}
+    names = [
+        ("company_name", company_name),
+        ("canonical_name", canonical_name),
+        ("company_name", basic_info.get("company_name")),
+        ("trade_name_dba", basic_info.get("trade_name_dba")),
+    ]
+    aliases: Dict[str, str] = {}
+    for source, name in names:
+        if not isinstance(name, str):
+            continue
+        alias = normalize_company_name(name)[:255]
+        if alias and alias not in PLACEHOLDER_NAMES:
+            aliases.setdefault(alias, source)
+    return aliases
+
+
+def upgrade() -> None:
+    op.execute(
+        "CREATE TABLE IF NOT EXISTS company_aliases ("
+        "id SERIAL PRIMARY KEY, "
+        "alias VARCHAR(255) NOT NULL, "
+        "company_id INTEGER NOT NULL REFERENCES company_analysis (id) ON DELETE CASCADE, "
+        "source VARCHAR(50) NOT NULL, "
+        "created_at TIMESTAMP WITH TIME ZONE DEFAULT now(), "
+        "CONSTRAINT uq_company_aliases_alias_company_id UNIQUE (alias, company_id))"
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS ix_company_aliases_id ON company_aliases (id)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_company_aliases_alias ON company_aliases (alias)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_company_aliases_company_id ON company_aliases (company_id)")
+
+    # Normalization lives in Python, so aliases are computed here rather than in SQL
+    connection = op.get_bind()
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.text(
+                "SELECT id, company_name, canonical_name, "
+                "analysis_result->'company_basic_info' AS basic_info "
+                "FROM company_analysis WHERE id > :last_id ORDER BY id LIMIT :limit"
+            ),
+            {"last_id": last_id, "limit": BACKFILL_BATCH_SIZE}
+        ).all()
+        if not rows:
+            break
+        aliases = [
+            {"alias": alias, "company_id": row.id, "source": source}
+            for row in rows
+            for alias, source in extract_company_aliases(
+                row.company_name,
+                row.canonical_name,
+                row.basic_info if isinstance(row.basic_info, dict) else None
+            ).items()
+        ]
+        if aliases:
+            connection.execute(
+                sa.text(
+                    "INSERT INTO company_aliases (alias, company_id, source) "
+                    "SELECT :alias, :company_id, :source "
+                    "WHERE NOT EXISTS ("
+                    "SELECT 1 FROM company_aliases WHERE alias = :alias AND company_id = :company_id)"
+                ),
+                aliases
+            )
+        last_id = rows[-1].id
+
+
+def downgrade() -> None:
+    op.drop_table("company_aliases")
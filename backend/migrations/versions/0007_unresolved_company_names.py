@@ -0,0 +1,39 @@
+"""unresolved_company_names table for the analysis negative cache
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "CREATE TABLE IF NOT EXISTS unresolved_company_names ("
+        "name_key VARCHAR(255) PRIMARY KEY, "
+        "company_name VARCHAR(255) NOT NULL, "
+        "reason VARCHAR(50) NOT NULL, "
+        "error_message TEXT, "
+        "failures INTEGER NOT NULL DEFAULT 1, "
+        "expires_at TIMESTAMP WITH TIME ZONE NOT NULL, "
+        "updated_at TIMESTAMP WITH TIME ZONE DEFAULT now())"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_unresolved_company_names_expires_at "
+        "ON unresolved_company_names (expires_at)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("unresolved_company_names")
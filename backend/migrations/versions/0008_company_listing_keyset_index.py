@@ -0,0 +1,40 @@
+"""(created_at, id) index for keyset pagination of company listings
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX_NAME = "ix_company_analysis_created_at_id"
+
+
+def upgrade() -> None:
+    # Built CONCURRENTLY (outside a transaction) so company_analysis stays writable
+    with op.get_context().autocommit_block():
+        # A failed concurrent build leaves an INVALID index that IF NOT EXISTS would keep
+        op.execute(
+            f"DO $$ BEGIN "
+            f"IF EXISTS (SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            f"WHERE c.relname = '{INDEX_NAME}' AND NOT i.indisvalid) THEN "
+            f"EXECUTE 'DROP INDEX {INDEX_NAME}'; END IF; END $$"
+        )
+        op.execute(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {INDEX_NAME} ON company_analysis (created_at, id)"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {INDEX_NAME}")
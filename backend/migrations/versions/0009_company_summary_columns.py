@@ -0,0 +1,138 @@
+"""Summary columns copied out of analysis_result, backfilled and indexed
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17 00:00:00
+
+"""
+import math
+from typing import Any, Dict, Optional, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 1000
+
+COLUMNS = {
+    "industry": "VARCHAR(255)",
+    "headquarters_country": "VARCHAR(100)",
+    "revenue_estimate": "VARCHAR(100)",
+    "employee_count_estimate": "VARCHAR(100)",
+    "acquisition_score": "DOUBLE PRECISION",
+    "overall_opportunity_score": "DOUBLE PRECISION",
+}
+
+# Extraction rules as of this revision, copied from app.core.search_engine so the
+# backfill doesn't change when app code does: column -> (path, max length or None for scores)
+SUMMARY_FIELD_PATHS = {
+    "industry": (("company_basic_info", "industry_primary"), 255),
+    "headquarters_country": (("company_basic_info", "headquarters_country"), 100),
+    "revenue_estimate": (("company_basic_info", "revenue_estimate"), 100),
+    "employee_count_estimate": (("company_basic_info", "employee_count_estimate"), 100),
+    "acquisition_score": (("acquisition_scoring", "pe_scoring", "acquisition_score"), None),
+    "overall_opportunity_score": (("acquisition_scoring", "pe_scoring", "overall_opportunity_score"), None),
+}
+SUMMARY_PLACEHOLDERS = {"", "n/a", "na", "none", "null", "unknown", "not available", "string", "category"}
+
+INDEXES = {
+    "ix_company_analysis_industry": "(lower(industry), created_at, id)",
+    "ix_company_analysis_headquarters_country": "(lower(headquarters_country), created_at, id)",
+    "ix_company_analysis_acquisition_score": "(acquisition_score, id)",
+    "ix_company_analysis_overall_opportunity_score": "(overall_opportunity_score, id)",
+}
+
+
+def summary_value(value: Any, max_length: Optional[int]) -> Optional[Union[str, float]]:
+    if max_length is None:
+        if isinstance(value, bool):
+            return None
+        try:
+            score = float(value)
+        except (TypeError, ValueError):
+            return None
+        return score if math.isfinite(score) else None
+    if not isinstance(value, str):
+        return None
+    value = " ".join(value.split())
+    return None if value.lower() in SUMMARY_PLACEHOLDERS else value[:max_length]
+
+
+def extract_company_summary(analysis_result: Dict[str, Any]) -> Dict[str, Any]:
+    """Summary column values from an analysis; None where missing or unusable"""
+    summary: Dict[str, Any] = {}
+    for column, (path, max_length) in SUMMARY_FIELD_PATHS.items():
+        value: Any = analysis_result
+        for key in path:
+            value = value.get(key) if isinstance(value, dict) else None
+        summary[column] = summary_value(value, max_length)
+    return summary
+
+
+def upgrade() -> None:
+    # Nullable columns without defaults: a catalog change, no table rewrite
+    for column, column_type in COLUMNS.items():
+        op.execute(f"ALTER TABLE company_analysis ADD COLUMN IF NOT EXISTS {column} {column_type}")
+
+    # Outside a transaction: each batch commits on its own, and the indexes are
+    # built CONCURRENTLY, so company_analysis stays writable throughout
+    with op.get_context().autocommit_block():
+        # Extraction rules live in Python, so values are computed here; only the
+        # two subtrees they come from are read, not whole documents
+        connection = op.get_bind()
+        last_id = 0
+        while True:
+            rows = connection.execute(
+                sa.text(
+                    "SELECT id, analysis_result->'company_basic_info' AS basic_info, "
+                    "analysis_result->'acquisition_scoring' AS acquisition_scoring "
+                    "FROM company_analysis WHERE id > :last_id ORDER BY id LIMIT :limit"
+                ),
+                {"last_id": last_id, "limit": BACKFILL_BATCH_SIZE}
+            ).all()
+            if not rows:
+                break
+            connection.execute(
+                sa.text(
+                    "UPDATE company_analysis SET "
+                    + ", ".join(f"{column} = :{column}" for column in COLUMNS)
+                    + " WHERE id = :id"
+                ),
+                [
+                    {
+                        "id": row.id,
+                        **extract_company_summary({
+                            "company_basic_info": row.basic_info,
+                            "acquisition_scoring": row.acquisition_scoring
+                        })
+                    }
+                    for row in rows
+                ]
+            )
+            last_id = rows[-1].id
+
+        for index_name, index_columns in INDEXES.items():
+            # A failed concurrent build leaves an INVALID index that IF NOT EXISTS would keep
+            op.execute(
+                f"DO $$ BEGIN "
+                f"IF EXISTS (SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                f"WHERE c.relname = '{index_name}' AND NOT i.indisvalid) THEN "
+                f"EXECUTE 'DROP INDEX {index_name}'; END IF; END $$"
+            )
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name} ON company_analysis {index_columns}"
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for index_name in INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}")
+    for column in COLUMNS:
+        op.execute(f"ALTER TABLE company_analysis DROP COLUMN IF EXISTS {column}")
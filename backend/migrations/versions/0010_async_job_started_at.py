@@ -0,0 +1,26 @@
+"""async_jobs.started_at, so the running-job deadline excludes time spent queued
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0010'
+down_revision: Union[str, None] = '0009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE async_jobs ADD COLUMN IF NOT EXISTS started_at TIMESTAMP WITH TIME ZONE")
+
+
+def downgrade() -> None:
+    op.drop_column("async_jobs", "started_at")
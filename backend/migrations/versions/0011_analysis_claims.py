@@ -0,0 +1,31 @@
+"""analysis_claims table, replacing the advisory lock held for a whole analysis
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0011'
+down_revision: Union[str, None] = '0010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "CREATE TABLE IF NOT EXISTS analysis_claims ("
+        "name_key VARCHAR(255) PRIMARY KEY, "
+        "owner VARCHAR(64) NOT NULL, "
+        "expires_at TIMESTAMP WITH TIME ZONE NOT NULL)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("analysis_claims")
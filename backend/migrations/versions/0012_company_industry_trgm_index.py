@@ -0,0 +1,45 @@
+"""Trigram index on company_analysis.industry for substring filters, built concurrently
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0012'
+down_revision: Union[str, None] = '0011'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Serves industry ILIKE '%...%' (the frontend's industry filter), which the
+# lower(industry) btree index can't
+INDEX_NAME = "ix_company_analysis_industry_trgm"
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # CONCURRENTLY can't run inside a transaction; it keeps the table writable while building
+    with op.get_context().autocommit_block():
+        # A failed concurrent build leaves an INVALID index that IF NOT EXISTS would keep
+        op.execute(
+            f"DO $$ BEGIN "
+            f"IF EXISTS (SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            f"WHERE c.relname = '{INDEX_NAME}' AND NOT i.indisvalid) THEN "
+            f"EXECUTE 'DROP INDEX {INDEX_NAME}'; END IF; END $$"
+        )
+        op.execute(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {INDEX_NAME} "
+            f"ON company_analysis USING gin (industry gin_trgm_ops)"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {INDEX_NAME}")
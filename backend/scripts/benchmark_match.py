@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Benchmark match scoring (search_engine.similarity_scores) on candidate names
+
+Scores synthetic company names, each with a legal-name variant, against
+queries of three kinds: an exact name with a different legal suffix, a typo
+of a name, and a short word that is a substring of many unrelated names.
+Compares the batched rapidfuzz pass with scoring one pair at a time through
+fuzzywuzzy, and reports how many candidates reach MIN_MATCH_SIMILARITY.
+
+No database is needed.
+
+    python scripts/benchmark_match.py --candidates 10000
+"""
+
+import sys
+import os
+import time
+import random
+import logging
+import argparse
+import statistics
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fuzzywuzzy import fuzz as fuzzywuzzy_fuzz
+from app.core.search_engine import similarity_scores, MIN_MATCH_SIMILARITY
+from app.utils.helpers import normalize_company_name
+from app.utils.logger import logger
+
+WORDS = [
+    "acme", "apex", "atlas", "beacon", "cedar", "summit", "harbor", "pioneer", "vertex", "granite",
+    "northern", "pacific", "midwest", "liberty", "keystone", "evergreen", "ironwood", "bluewater",
+    "redstone", "silverline", "crescent", "meridian", "frontier", "heritage", "sterling", "cascade",
+]
+INDUSTRIES = [
+    "industrial", "logistics", "analytics", "manufacturing", "health", "software", "energy",
+    "foods", "materials", "services", "systems", "capital", "partners", "labs", "networks",
+]
+SUFFIXES = ["Inc.", "LLC", "Corp.", "Co.", "Holdings", "Group", "Ltd."]
+
+
+def synthetic_candidates(count: int, rng: random.Random) -> list:
+    candidates = []
+    for i in range(count):
+        name = f"{rng.choice(WORDS)} {rng.choice(WORDS)} {rng.choice(INDUSTRIES)} {i}"
+        candidates.append((name, f"{name.title()} {rng.choice(SUFFIXES)}"))
+    return candidates
+
+
+def typo(name: str, rng: random.Random) -> str:
+    position = rng.randrange(len(name) - 1)
+    return name[:position] + name[position + 1] + name[position] + name[position + 2:]
+
+
+def pairwise_scores(search_term: str, candidates: list) -> list:
+    """Same score as similarity_scores, one fuzzywuzzy call per name pair"""
+    query = normalize_company_name(search_term)
+    scores = []
+    for candidate in candidates:
+        best = 0.0
+        for name in candidate:
+            name = normalize_company_name(name)
+            score = (fuzzywuzzy_fuzz.token_set_ratio(query, name) + fuzzywuzzy_fuzz.token_sort_ratio(query, name)) / 200
+            best = max(best, score)
+        scores.append(best)
+    return scores
+
+
+def median_ms(func_, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func_()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--candidates", type=int, default=10000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    logger.setLevel(logging.WARNING)
+    rng = random.Random(args.seed)
+    candidates = synthetic_candidates(args.candidates, rng)
+    target = rng.choice(candidates)[0]
+    queries = {
+        "suffix": f"{target.title()} Corporation",
+        "typo": typo(target, rng),
+        "substring": "granite",
+    }
+
+    print(f"{args.candidates:,} candidates, threshold {MIN_MATCH_SIMILARITY}")
+    print(f"{'query':>10} {'batched ms':>11} {'pairwise ms':>12} {'accepted':>9} {'best':>6}")
+    for kind, query in queries.items():
+        scores = similarity_scores(query, candidates)
+        batched = median_ms(lambda: similarity_scores(query, candidates), args.repeats)
+        pairwise = median_ms(lambda: pairwise_scores(query, candidates), args.repeats)
+        accepted = sum(score >= MIN_MATCH_SIMILARITY for score in scores)
+        print(f"{kind:>10} {batched:>11.2f} {pairwise:>12.2f} {accepted:>9,} {max(scores):>6.2f}")
+
+
+if __name__ == "__main__":
+    main()
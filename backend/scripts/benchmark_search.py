@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""Benchmark company search latency as company_analysis grows
+
+Runs the application's own search queries against a temporary copy of
+company_analysis (a TEMP table shadows the real one for this session, so no
+real data is read or written) filled with synthetic names, at each table size
+with and without the lower() and trigram indexes from migration 0005:
+
+  exact   - search_company() on a name that exists (exact lower() match)
+  partial - search_company() on a substring of many names (LIKE '%term%')
+  list    - GET /companies?search= filter (LIKE or trigram %), first page
+
+Requires a reachable database with the pg_trgm extension.
+
+    python scripts/benchmark_search.py --sizes 1000 10000 100000
+"""
+
+import sys
+import os
+import time
+import random
+import logging
+import argparse
+import statistics
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text, func
+from sqlalchemy.orm import Session
+from app.database.connection import engine
+from app.database.models import CompanyAnalysis
+from app.core.search_engine import search_company, company_search_filter
+from app.utils.logger import logger
+
+WORDS = [
+    "acme", "apex", "atlas", "beacon", "cedar", "summit", "harbor", "pioneer", "vertex", "granite",
+    "northern", "pacific", "midwest", "liberty", "keystone", "evergreen", "ironwood", "bluewater",
+    "redstone", "silverline", "crescent", "meridian", "frontier", "heritage", "sterling", "cascade",
+]
+INDUSTRIES = [
+    "industrial", "logistics", "analytics", "manufacturing", "health", "software", "energy",
+    "foods", "materials", "services", "systems", "capital", "partners", "labs", "networks",
+]
+SUFFIXES = ["inc", "llc", "corp", "co", "holdings", "group", "ltd"]
+
+# Mirrors CompanyAnalysis, with its own id sequence so the real one isn't advanced
+TEMP_TABLE = """
+    CREATE TEMP TABLE company_analysis (
+        id SERIAL PRIMARY KEY,
+        company_name VARCHAR(255) NOT NULL,
+        canonical_name VARCHAR(255),
+        search_query VARCHAR(255) NOT NULL,
+        analysis_result JSONB NOT NULL,
+        status VARCHAR(50) NOT NULL DEFAULT 'success',
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT now()
+    )
+"""
+
+INDEXES = (
+    "CREATE INDEX bench_company_name ON company_analysis (lower(company_name))",
+    "CREATE INDEX bench_canonical_name ON company_analysis (lower(canonical_name))",
+    "CREATE INDEX bench_company_name_trgm ON company_analysis USING gin (lower(company_name) gin_trgm_ops)",
+    "CREATE INDEX bench_canonical_name_trgm ON company_analysis USING gin (lower(canonical_name) gin_trgm_ops)",
+)
+
+
+def synthetic_names(start: int, stop: int, rng: random.Random) -> list:
+    return [
+        f"{rng.choice(WORDS)} {rng.choice(WORDS)} {rng.choice(INDUSTRIES)} {i}"
+        for i in range(start, stop)
+    ]
+
+
+def grow_table(db: Session, names: list, rng: random.Random) -> None:
+    db.execute(
+        text("""
+            INSERT INTO company_analysis (company_name, canonical_name, search_query, analysis_result, status)
+            SELECT name, initcap(name) || ' ' || suffix, name, '{}'::jsonb, 'success'
+            FROM unnest(CAST(:names AS text[]), CAST(:suffixes AS text[])) AS t(name, suffix)
+        """),
+        {"names": names, "suffixes": [rng.choice(SUFFIXES) for _ in names]}
+    )
+    db.execute(text("ANALYZE company_analysis"))
+
+
+def set_indexes(db: Session, enabled: bool) -> None:
+    for statement in INDEXES:
+        name = statement.split()[2]
+        db.execute(text(f"DROP INDEX IF EXISTS {name}"))
+        if enabled:
+            db.execute(text(statement))
+    db.execute(text("ANALYZE company_analysis"))
+
+
+def list_first_page(db: Session, search_term: str) -> None:
+    db.query(CompanyAnalysis).filter(company_search_filter(search_term)).order_by(
+        func.similarity(func.lower(CompanyAnalysis.company_name), search_term).desc(),
+        CompanyAnalysis.created_at.desc()
+    ).limit(51).all()
+
+
+def median_ms(func_, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func_()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    logger.setLevel(logging.WARNING)
+    rng = random.Random(args.seed)
+    with engine.connect() as conn:
+        db = Session(bind=conn)
+        db.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        db.execute(text(TEMP_TABLE))
+
+        print(f"{'rows':>8} {'indexes':>8} {'exact ms':>10} {'partial ms':>11} {'list ms':>9}")
+        rows = 0
+        for size in sorted(args.sizes):
+            names = synthetic_names(rows, size, rng)
+            grow_table(db, names, rng)
+            rows = size
+            exact_name = rng.choice(names)
+
+            for indexed in (False, True):
+                set_indexes(db, indexed)
+                exact = median_ms(lambda: search_company(db, exact_name), args.repeats)
+                partial = median_ms(lambda: search_company(db, "stone"), args.repeats)
+                listing = median_ms(lambda: list_first_page(db, "granit logistic"), args.repeats)
+                db.expunge_all()
+                print(f"{rows:>8,} {'yes' if indexed else 'no':>8} {exact:>10.2f} {partial:>11.2f} {listing:>9.2f}")
+
+        db.rollback()
+
+
+if __name__ == "__main__":
+    main()
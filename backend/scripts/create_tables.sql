@@ -9,7 +9,14 @@ CREATE TABLE IF NOT EXISTS company_analysis (
     search_query VARCHAR(255) NOT NULL,
     analysis_result JSONB NOT NULL,
     status VARCHAR(50) NOT NULL DEFAULT 'success',
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    -- Summary fields copied out of analysis_result when an analysis is saved
+    industry VARCHAR(255),
+    headquarters_country VARCHAR(100),
+    revenue_estimate VARCHAR(100),
+    employee_count_estimate VARCHAR(100),
+    acquisition_score DOUBLE PRECISION,
+    overall_opportunity_score DOUBLE PRECISION
 );
 
 -- Enhanced indexes for performance optimization
@@ -32,5 +39,24 @@ CREATE INDEX IF NOT EXISTS idx_analysis_result_gin ON company_analysis USING GIN
 CREATE INDEX IF NOT EXISTS idx_analysis_result_industry ON company_analysis USING GIN((analysis_result->'company_basic_info'->>'industry_primary'));
 CREATE INDEX IF NOT EXISTS idx_analysis_diversity_score ON company_analysis((analysis_result->>'diversity_score'));
 
+-- Summary column filters (newest first within them) and score orderings
+CREATE INDEX IF NOT EXISTS ix_company_analysis_industry ON company_analysis(LOWER(industry), created_at, id);
+CREATE INDEX IF NOT EXISTS ix_company_analysis_industry_trgm ON company_analysis USING GIN(industry gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS ix_company_analysis_headquarters_country ON company_analysis(LOWER(headquarters_country), created_at, id);
+CREATE INDEX IF NOT EXISTS ix_company_analysis_acquisition_score ON company_analysis(acquisition_score, id);
+CREATE INDEX IF NOT EXISTS ix_company_analysis_overall_opportunity_score ON company_analysis(overall_opportunity_score, id);
+
 -- Partial indexes for active records
-CREATE INDEX IF NOT EXISTS idx_active_companies ON company_analysis(created_at DESC) WHERE status = 'completed';
\ No newline at end of file
+CREATE INDEX IF NOT EXISTS idx_active_companies ON company_analysis(created_at DESC) WHERE status = 'completed';
+
+-- Normalized names (legal suffixes, punctuation and "the" removed) resolving to a company
+CREATE TABLE IF NOT EXISTS company_aliases (
+    id SERIAL PRIMARY KEY,
+    alias VARCHAR(255) NOT NULL,
+    company_id INTEGER NOT NULL REFERENCES company_analysis(id) ON DELETE CASCADE,
+    source VARCHAR(50) NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    CONSTRAINT uq_company_aliases_alias_company_id UNIQUE (alias, company_id)
+);
+CREATE INDEX IF NOT EXISTS ix_company_aliases_alias ON company_aliases(alias);
+CREATE INDEX IF NOT EXISTS ix_company_aliases_company_id ON company_aliases(company_id);
\ No newline at end of file
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""Standalone analysis worker consuming the async_jobs queue
+
+Runs the same worker pool as the API processes, so analysis capacity can be
+scaled independently of request-serving capacity. Set ANALYSIS_MAX_CONCURRENCY=0
+on the API to leave all analysis to these workers.
+
+    python scripts/run_worker.py --concurrency 20
+"""
+
+import sys
+import os
+import signal
+import asyncio
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.async_processor import AnalysisWorkerPool
+from app.core.job_queue import reconcile_inflight_jobs
+from app.config import settings
+from app.utils.logger import logger
+
+
+async def run(concurrency: int) -> None:
+    """Run workers until SIGINT/SIGTERM, then release in-flight jobs"""
+    pool = AnalysisWorkerPool(
+        max_concurrency=concurrency,
+        poll_interval=settings.ANALYSIS_QUEUE_POLL_SECONDS
+    )
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    await asyncio.to_thread(reconcile_inflight_jobs)
+    pool.start()
+    await stop.wait()
+
+    logger.info("Stopping analysis workers...")
+    await pool.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run analysis queue workers")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=max(settings.ANALYSIS_MAX_CONCURRENCY, 1),
+        help="Number of analyses to run concurrently"
+    )
+    args = parser.parse_args()
+
+    logger.info(f"Starting analysis worker with concurrency {args.concurrency}")
+    asyncio.run(run(args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -25,6 +25,10 @@ pip install -r requirements.txt
 # Run database migrations/setup if needed
 echo "Setting up database..."
 python scripts/init_db.py || echo "Database setup completed or already exists"
+if ! alembic -c migrations/alembic.ini upgrade head; then
+    echo "Database migrations failed, not starting the application" >&2
+    exit 1
+fi
 
 # Start the FastAPI application with Gunicorn
 echo "Starting FastAPI with Gunicorn..."
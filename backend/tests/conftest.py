@@ -0,0 +1,93 @@
+import re
+import pytest
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.pool import StaticPool
+from app.utils import cache
+
+
+@compiles(JSONB, "sqlite")
+def compile_jsonb_sqlite(type_, compiler, **kw):
+    return "JSON"
+
+
+# now() +/- make_interval(secs|days => ...), as written in the job queue's raw SQL
+PG_INTERVAL = re.compile(r"now\(\)\s*([+-])\s*make_interval\((secs|days)\s*=>\s*([^()]+?)\)")
+INTERVAL_SECONDS = {"secs": 1, "days": 86400}
+
+
+def sqlite_statement(statement):
+    """Rewrite the Postgres-only syntax of the app's raw SQL for SQLite"""
+    statement = statement.replace("FOR UPDATE SKIP LOCKED", "")
+    return PG_INTERVAL.sub(
+        lambda match: f"shift_time(now(), {match[1]}({match[3]}) * {INTERVAL_SECONDS[match[2]]})", statement
+    )
+
+
+def shift_time(timestamp, seconds):
+    return (datetime.fromisoformat(timestamp) + timedelta(seconds=seconds)).isoformat(" ")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Seconds to shift the in-memory caches' clock and the test database's now() by"""
+    offset = [0.0]
+    real_time = cache.time.time
+    monkeypatch.setattr(cache.time, "time", lambda: real_time() + offset[0])
+    return offset
+
+
+@pytest.fixture
+def make_sqlite_engine(clock):
+    """SQLite engines usable across threads, with a Postgres-like now() and intervals
+
+    In-memory by default, on one shared connection; pass a file url to give
+    each session its own connection and transaction.
+    """
+    engines = []
+
+    def make(url="sqlite://", **connect_args):
+        engine = create_engine(
+            url,
+            connect_args={"check_same_thread": False, **connect_args},
+            poolclass=StaticPool if url == "sqlite://" else None
+        )
+
+        @event.listens_for(engine, "connect")
+        def register_functions(dbapi_connection, connection_record):
+            dbapi_connection.create_function(
+                "now", 0, lambda: (datetime.now(timezone.utc) + timedelta(seconds=clock[0])).isoformat(" ")
+            )
+            dbapi_connection.create_function("shift_time", 2, shift_time)
+
+        @event.listens_for(engine, "before_cursor_execute", retval=True)
+        def rewrite_postgres_syntax(conn, cursor, statement, parameters, context, executemany):
+            return sqlite_statement(statement), parameters
+
+        engines.append(engine)
+        return engine
+
+    yield make
+    for engine in engines:
+        engine.dispose()
+
+
+@pytest.fixture
+def sqlite_engine(make_sqlite_engine):
+    return make_sqlite_engine()
+
+
+@pytest.fixture
+def count_queries(db):
+    """SQL statements executed on the test database"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
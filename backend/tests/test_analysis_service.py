@@ -0,0 +1,88 @@
+import asyncio
+import pytest
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.orm import sessionmaker
+from app.core import analysis_service, single_flight
+from app.core.analysis_service import get_or_create_analysis
+from app.database.models import AnalysisClaim
+
+
+@pytest.fixture
+def claims(monkeypatch, sqlite_engine):
+    engine = sqlite_engine
+    AnalysisClaim.__table__.create(engine)
+    Session = sessionmaker(bind=engine)
+    monkeypatch.setattr(single_flight, "SessionLocal", Session)
+    monkeypatch.setattr(single_flight, "ANALYSIS_CLAIM_POLL_SECONDS", 0.01)
+    session = Session()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def analyses(monkeypatch):
+    """In-memory stand-ins for the company table and Gemini, counting calls"""
+    saved = {}
+    gemini_calls = []
+
+    async def generate(company_name, deadline=None):
+        gemini_calls.append(company_name)
+        await asyncio.sleep(0.05)
+        return {"company_basic_info": {"company_legal_name": company_name}}
+
+    def save(company_name, analysis_result):
+        saved["acme"] = {"company_name": company_name, "analysis_result": analysis_result}
+        return saved["acme"]
+
+    monkeypatch.setattr(analysis_service, "generate_company_analysis_async", generate)
+    monkeypatch.setattr(analysis_service, "find_existing_result", lambda company_name: saved.get("acme"))
+    monkeypatch.setattr(analysis_service, "save_analysis_result", save)
+    monkeypatch.setattr(analysis_service.negative_cache, "get", lambda key: None)
+    return saved, gemini_calls
+
+
+def test_concurrent_calls_share_one_gemini_call(claims, analyses):
+    saved, gemini_calls = analyses
+
+    async def run():
+        names = ["Acme", "ACME ", "acme", "Acme", "  acme"]
+        return await asyncio.gather(*(get_or_create_analysis(name) for name in names))
+
+    results = asyncio.run(run())
+
+    assert len(gemini_calls) == 1
+    assert all(result is saved["acme"] for result in results)
+    # The claim is released once the analysis is saved
+    assert claims.query(AnalysisClaim).count() == 0
+
+
+def test_claim_held_by_another_worker_is_waited_for(claims, analyses):
+    saved, gemini_calls = analyses
+    claims.add(AnalysisClaim(
+        name_key="acme", owner="other-worker", expires_at=datetime.now(timezone.utc) + timedelta(minutes=5)
+    ))
+    claims.commit()
+
+    async def other_worker_finishes():
+        await asyncio.sleep(0.05)
+        saved["acme"] = {"company_name": "Acme", "analysis_result": {}}
+        claims.query(AnalysisClaim).delete()
+        claims.commit()
+
+    async def run():
+        result, _ = await asyncio.gather(get_or_create_analysis("Acme"), other_worker_finishes())
+        return result
+
+    assert asyncio.run(run()) is saved["acme"]
+    assert not gemini_calls
+
+
+def test_lapsed_claim_is_taken_over(claims, analyses):
+    saved, gemini_calls = analyses
+    claims.add(AnalysisClaim(
+        name_key="acme", owner="crashed-worker", expires_at=datetime.now(timezone.utc) - timedelta(minutes=1)
+    ))
+    claims.commit()
+
+    assert asyncio.run(get_or_create_analysis("Acme")) is saved["acme"]
+    assert gemini_calls == ["Acme"]
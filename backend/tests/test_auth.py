@@ -0,0 +1,205 @@
+import time
+import pytest
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import DateTime
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.types import TypeDecorator
+from app.config import Settings, settings
+from app.core import auth
+from app.database.models import AccessToken, RevokedToken
+from app.utils.cache import TTLCache
+
+
+class UTCDateTime(TypeDecorator):
+    """SQLite drops tzinfo; hand back aware UTC datetimes like Postgres does"""
+    impl = DateTime
+    cache_ok = True
+
+    def process_result_value(self, value, dialect):
+        return value.replace(tzinfo=timezone.utc) if value is not None else None
+
+
+@pytest.fixture
+def db(monkeypatch, sqlite_engine):
+    for table in (AccessToken.__table__, RevokedToken.__table__):
+        monkeypatch.setattr(table.c.expires_at, "type", UTCDateTime())
+    engine = sqlite_engine
+    AccessToken.__table__.create(engine)
+    RevokedToken.__table__.create(engine)
+    Session = sessionmaker(bind=engine)
+    monkeypatch.setattr(auth, "SessionLocal", Session)
+    monkeypatch.setattr(auth, "_revoked_jtis", frozenset())
+    auth._token_cache.clear()
+    session = Session()
+    yield session
+    session.close()
+    auth._token_cache.clear()
+
+
+@pytest.fixture
+def opaque_mode(monkeypatch):
+    monkeypatch.setattr(settings, "CLIENT_ID", "client")
+    monkeypatch.setattr(settings, "CLIENT_SECRET", "secret")
+    monkeypatch.setattr(settings, "TOKEN_MODE", "opaque")
+
+
+@pytest.fixture
+def signed_mode(monkeypatch):
+    monkeypatch.setattr(settings, "CLIENT_ID", "client")
+    monkeypatch.setattr(settings, "CLIENT_SECRET", "secret")
+    monkeypatch.setattr(settings, "TOKEN_MODE", "signed")
+    monkeypatch.setattr(settings, "TOKEN_SIGNING_KEY", "signing-key")
+
+
+def issue_signed(issued_at=None, expires_in=timedelta(hours=1)):
+    issued_at = issued_at or datetime.now(timezone.utc)
+    return auth.create_signed_token("client", issued_at, issued_at + expires_in)
+
+
+def test_signed_token_round_trip(db, signed_mode):
+    token = auth.create_access_token("client", "secret")["access_token"]
+
+    assert auth.is_signed_token(token)
+    assert auth.decode_signed_token(token)["sub"] == "client"
+    assert auth.validate_token(token)
+    # Nothing is stored for signed tokens
+    assert db.query(AccessToken).count() == 0
+
+
+def test_expired_signed_token_is_rejected(db, signed_mode):
+    token = issue_signed(datetime.now(timezone.utc) - timedelta(hours=2))
+
+    assert not auth.validate_token(token)
+
+
+def test_tampered_signed_token_is_rejected(db, signed_mode, monkeypatch):
+    header, payload, signature = issue_signed().split(".")
+    flipped = ("A" if signature[0] != "A" else "B") + signature[1:]
+
+    assert not auth.validate_token(f"{header}.{payload}.{flipped}")
+    # Valid structure, signed with a different key
+    monkeypatch.setattr(settings, "TOKEN_SIGNING_KEY", "other-key")
+    forged = issue_signed()
+    monkeypatch.setattr(settings, "TOKEN_SIGNING_KEY", "signing-key")
+    assert not auth.validate_token(forged)
+
+
+def test_revoked_signed_token_is_rejected(db, signed_mode):
+    token = issue_signed()
+
+    assert auth.revoke_token(token)
+    assert not auth.validate_token(token)
+
+
+def test_signed_token_is_rejected_in_opaque_mode(db, signed_mode, monkeypatch):
+    token = issue_signed()
+    monkeypatch.setattr(settings, "TOKEN_MODE", "opaque")
+
+    assert not auth.validate_token(token)
+    assert not auth.revoke_token(token)
+
+
+def test_signed_mode_requires_signing_key():
+    config = Settings()
+    config.TOKEN_MODE = "signed"
+    config.TOKEN_SIGNING_KEY = ""
+    with pytest.raises(ValueError, match="TOKEN_SIGNING_KEY"):
+        config.validate()
+
+    config.TOKEN_SIGNING_KEY = "signing-key"
+    config.validate()
+    config.TOKEN_MODE = "jwt"
+    with pytest.raises(ValueError, match="TOKEN_MODE"):
+        config.validate()
+
+
+def issue_opaque(db, expires_in=None):
+    token = auth.create_access_token("client", "secret")["access_token"]
+    if expires_in is not None:
+        db.query(AccessToken).filter(AccessToken.token == token).update(
+            {"expires_at": datetime.now(timezone.utc) + expires_in}
+        )
+        db.commit()
+    return token
+
+
+def test_cached_token_skips_the_database(db, opaque_mode, count_queries):
+    token = issue_opaque(db)
+    count_queries.clear()
+
+    assert auth.validate_token(token)
+    assert len(count_queries) == 1
+    assert auth.validate_token(token)
+    assert len(count_queries) == 1
+
+
+def test_cache_entry_expires_with_ttl(db, opaque_mode, clock, count_queries):
+    token = issue_opaque(db)
+    assert auth.validate_token(token)
+    count_queries.clear()
+
+    clock[0] += settings.TOKEN_CACHE_TTL_SECONDS - 1
+    assert auth.validate_token(token)
+    assert not count_queries
+
+    clock[0] += 2
+    assert auth.validate_token(token)
+    assert len(count_queries) == 1
+
+
+def test_cache_entry_never_outlives_the_token(db, opaque_mode, clock):
+    token = issue_opaque(db, expires_in=timedelta(seconds=30))
+    assert auth.validate_token(token)
+    expires_at = db.query(AccessToken.expires_at).filter(AccessToken.token == token).scalar()
+
+    clock[0] += expires_at.timestamp() + 1 - time.time()
+    assert auth._token_cache.get(token) is None
+
+
+def test_cache_is_bounded_and_evicts_least_recently_used(db, opaque_mode, monkeypatch, count_queries):
+    monkeypatch.setattr(auth, "_token_cache", TTLCache(max_size=2, ttl_seconds=300))
+    first, second, third = (issue_opaque(db) for _ in range(3))
+    assert auth.validate_token(first)
+    assert auth.validate_token(second)
+    # Touch the first token so the second is the least recently used
+    assert auth.validate_token(first)
+    assert auth.validate_token(third)
+
+    assert len(auth._token_cache) == 2
+    count_queries.clear()
+    assert auth.validate_token(first)
+    assert auth.validate_token(third)
+    assert not count_queries
+    assert auth.validate_token(second)
+    assert len(count_queries) == 1
+
+
+def test_revoke_evicts_cached_token(db, opaque_mode):
+    token = issue_opaque(db)
+    assert auth.validate_token(token)
+
+    assert auth.revoke_token(token)
+    assert auth._token_cache.get(token) is None
+    assert not auth.validate_token(token)
+
+
+def test_cleanup_deletes_only_expired_rows_in_batches(db, count_queries):
+    now = datetime.now(timezone.utc)
+    db.add_all(
+        AccessToken(token=f"token-{i}", client_id="client", expires_at=now + timedelta(hours=1 if i % 2 else -1))
+        for i in range(10)
+    )
+    db.add_all(
+        RevokedToken(jti=f"jti-{i}", client_id="client", expires_at=now + timedelta(hours=1 if i < 2 else -1))
+        for i in range(5)
+    )
+    db.commit()
+
+    deleted, _ = auth.cleanup_expired_tokens(batch_size=2)
+
+    assert deleted == 5 + 3
+    deletes = [statement for statement in count_queries if statement.startswith("DELETE")]
+    # Full batches keep the sweep going; a short or empty batch ends each table
+    assert len(deletes) == 3 + 2
+    assert sorted(token for token, in db.query(AccessToken.token)) == [f"token-{i}" for i in (1, 3, 5, 7, 9)]
+    assert sorted(jti for jti, in db.query(RevokedToken.jti)) == ["jti-0", "jti-1"]
@@ -0,0 +1,71 @@
+import pytest
+from sqlalchemy.orm import sessionmaker
+from app.config import settings
+from app.core import batch_processor, job_queue
+from app.core.batch_processor import create_batch
+from app.database.models import AnalysisBatch, AsyncJob, CompanyAlias
+from app.utils.exceptions import BatchTooLargeError, QueueFullError
+
+
+@pytest.fixture
+def db(monkeypatch, sqlite_engine):
+    for table in (CompanyAlias.__table__, AsyncJob.__table__, AnalysisBatch.__table__):
+        table.create(sqlite_engine)
+    Session = sessionmaker(bind=sqlite_engine)
+    monkeypatch.setattr(batch_processor, "SessionLocal", Session)
+    monkeypatch.setattr(job_queue, "SessionLocal", Session)
+    session = Session()
+    session.add(CompanyAlias(alias="acme", company_id=7, source="company_name"))
+    session.add(AsyncJob(job_id="job_beta", company_name="Beta Labs, Inc.", status="processing"))
+    session.commit()
+    yield session
+    session.close()
+
+
+def queued(db):
+    db.expire_all()
+    return db.query(AsyncJob).filter(AsyncJob.status == "queued").count()
+
+
+def test_batch_reuses_analyses_and_in_flight_jobs(db):
+    batch = create_batch(["Acme Corp", "BETA LABS", "Gamma", "gamma ltd", " ", "The Acme Company"])
+
+    items = {item["company_name"]: item for item in batch["items"]}
+    assert list(items) == ["Acme Corp", "BETA LABS", "Gamma"]
+    assert items["Acme Corp"]["status"] == "existing"
+    assert items["Acme Corp"]["company_id"] == 7
+    # Matched by normalized name, not by spelling
+    assert items["BETA LABS"]["job_id"] == "job_beta"
+    assert items["BETA LABS"]["status"] == "processing"
+    assert items["Gamma"]["status"] == "queued"
+    assert batch["counts"]["queued"] == 1
+    assert queued(db) == 1
+
+
+def test_batch_may_exceed_the_single_job_queue_limit(db, monkeypatch):
+    monkeypatch.setattr(settings, "ANALYSIS_QUEUE_MAX_SIZE", 5)
+
+    batch = create_batch([f"Company {i}" for i in range(20)])
+
+    assert batch["counts"]["queued"] == 20
+    assert queued(db) == 20
+
+
+def test_batch_is_rejected_by_pending_depth(db, monkeypatch):
+    monkeypatch.setattr(settings, "ANALYSIS_BATCH_QUEUE_MAX_SIZE", 10)
+    create_batch([f"Company {i}" for i in range(10)])
+
+    with pytest.raises(QueueFullError):
+        create_batch(["Delta"])
+    assert queued(db) == 10
+    assert db.query(AnalysisBatch).count() == 1
+    # Nothing to queue, so nothing to hold back
+    assert create_batch(["Acme", "Beta Labs"])["counts"]["queued"] == 0
+
+
+def test_batch_size_is_capped(db, monkeypatch):
+    monkeypatch.setattr(settings, "ANALYSIS_BATCH_MAX_SIZE", 3)
+
+    with pytest.raises(BatchTooLargeError):
+        create_batch(["A", "B", "C", "D"])
+    assert create_batch(["A", "B", "C", "c"])["total"] == 3
@@ -0,0 +1,318 @@
+import asyncio
+import json
+import pytest
+from datetime import datetime, timedelta
+from fastapi import HTTPException
+from sqlalchemy.orm import sessionmaker
+from app.database.models import CompanyAnalysis, CompanyAlias
+from app.core import name_index, search_engine
+from app.core.name_index import CompanyNameIndex
+from app.core.search_engine import search_company, suggest_companies, extract_company_summary, MATCH_LIMIT
+from app.api.companies import list_companies
+from app.utils.helpers import normalize_company_name
+
+
+@pytest.fixture
+def db(sqlite_engine):
+    engine = sqlite_engine
+    CompanyAnalysis.__table__.create(engine)
+    CompanyAlias.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    names = ["Acme Corp", "Acme Industrial Holdings", "Apex Analytics", "Beta Labs", "Acme"]
+    names += [f"Company {i:03d} Manufacturing" for i in range(200)]
+    # Three companies per timestamp, so listings have ties on created_at
+    created = datetime(2026, 1, 1)
+    session.add_all(
+        CompanyAnalysis(
+            company_name=name.lower(),
+            canonical_name=f"{name} Inc",
+            search_query=name,
+            analysis_result={"company_basic_info": {"company_legal_name": f"{name} Inc"}},
+            status="success",
+            created_at=created + timedelta(minutes=position // 3)
+        )
+        for position, name in enumerate(names)
+    )
+    session.commit()
+    yield session
+    session.close()
+
+
+def test_exact_match_is_one_query(db, count_queries):
+    result = search_company(db, "  ACME ")
+
+    assert result["match_type"] == "exact"
+    assert result["company"].company_name == "acme"
+    assert len(count_queries) == 1
+
+
+def test_short_query_is_one_limited_query(db, count_queries):
+    result = search_company(db, "a")
+
+    # Substring candidates exist, but none is similar enough to be served
+    assert not result["found_existing"]
+    assert len(count_queries) == 1
+    assert "LIMIT" in count_queries[0].upper()
+
+
+def test_substring_of_longer_name_is_not_served(db):
+    assert not search_company(db, "apex")["found_existing"]
+    assert search_company(db, "apex analytic")["company"].company_name == "apex analytics"
+
+
+def test_alternatives_are_ranked_with_scores(db, loaded_index):
+    result = search_company(db, "company 01 manufacturing")
+
+    assert result["match_type"] == "fuzzy_best"
+    alternatives = result["alternatives"]
+    assert len(alternatives) == MATCH_LIMIT
+    assert alternatives[0]["company_id"] == result["company"].id
+    scores = [alternative["score"] for alternative in alternatives]
+    assert scores == sorted(scores, reverse=True)
+    assert scores[-1] >= search_engine.MIN_MATCH_SIMILARITY
+
+
+def test_canonical_name_match(db, count_queries):
+    result = search_company(db, "beta labs inc")
+
+    assert result["match_type"] == "fuzzy_single"
+    assert result["company"].company_name == "beta labs"
+    assert len(count_queries) == 1
+
+
+def test_like_wildcards_are_literal(db, count_queries):
+    result = search_company(db, "%")
+
+    assert not result["found_existing"]
+    assert len(count_queries) == 1
+
+
+@pytest.fixture
+def loaded_index(db, monkeypatch):
+    index = CompanyNameIndex()
+    for company in db.query(CompanyAnalysis):
+        index.add(company.id, company.company_name, company.canonical_name)
+    index.loaded = True
+    monkeypatch.setattr(search_engine, "name_index", index)
+    db.expunge_all()
+    return index
+
+
+def test_indexed_exact_match_is_one_primary_key_read(db, loaded_index, count_queries):
+    result = search_company(db, "Apex Analytics")
+
+    assert result["match_type"] == "exact"
+    assert result["company"].company_name == "apex analytics"
+    assert len(count_queries) == 1
+
+
+def test_indexed_lookup_tolerates_typos(db, loaded_index, count_queries):
+    result = search_company(db, "acme industrail holdings")
+
+    assert result["found_existing"]
+    assert result["company"].company_name == "acme industrial holdings"
+    assert "company_analysis" in count_queries[0]
+
+
+def test_indexed_lookup_ignores_legal_suffixes(db, loaded_index, count_queries):
+    result = search_company(db, "The Apex Analytics, Inc.")
+
+    assert result["match_type"] == "exact"
+    assert result["company"].company_name == "apex analytics"
+    assert len(count_queries) == 1
+
+
+def test_fuzzy_hit_is_remembered_as_alias(db, loaded_index):
+    result = search_company(db, "Beta Lab Corp")
+
+    alias = db.query(CompanyAlias).one()
+    assert (alias.alias, alias.company_id, alias.source) == ("beta lab", result["company"].id, "search")
+    assert loaded_index.lookup("beta lab") == [(alias.company_id, 1)]
+
+
+def test_alias_matches_without_index(db, count_queries):
+    company = db.query(CompanyAnalysis).filter(CompanyAnalysis.company_name == "beta labs").one()
+    db.add(CompanyAlias(alias="bl", company_id=company.id, source="trade_name_dba"))
+    db.commit()
+    count_queries.clear()
+
+    result = search_company(db, "B.L.")
+
+    assert result["found_existing"]
+    assert result["company"].company_name == "beta labs"
+    assert len(count_queries) == 1
+
+
+def test_index_miss_falls_back_to_database(db, loaded_index, count_queries):
+    result = search_company(db, "Gamma Robotics")
+
+    assert not result["found_existing"]
+    assert len(count_queries) == 1
+
+
+def test_refresh_picks_up_ids_below_out_of_band_adds(db, monkeypatch):
+    monkeypatch.setattr(name_index, "SessionLocal", sessionmaker(bind=db.get_bind()))
+    index = CompanyNameIndex()
+    # Saved by this process, ahead of companies other processes saved earlier
+    newest = db.query(CompanyAnalysis).order_by(CompanyAnalysis.id.desc()).first()
+    index.add(newest.id, newest.company_name, newest.canonical_name)
+
+    assert index.refresh() == 204
+    assert len(index) == 205
+
+    # Ids can commit out of order: a lower id showing up after a higher one was read
+    db.add(CompanyAnalysis(id=300, company_name="late higher", search_query="x", analysis_result={}))
+    db.commit()
+    assert index.refresh() == 1
+    db.add(CompanyAnalysis(id=250, company_name="early lower", search_query="x", analysis_result={}))
+    db.commit()
+    assert index.refresh() == 1
+    assert index.lookup("early lower") == [(250, 0)]
+
+
+def test_refresh_prunes_deleted_companies(db, monkeypatch):
+    monkeypatch.setattr(name_index, "SessionLocal", sessionmaker(bind=db.get_bind()))
+    index = CompanyNameIndex()
+    index.refresh()
+    beta = db.query(CompanyAnalysis).filter(CompanyAnalysis.company_name == "beta labs").one()
+    db.delete(beta)
+    db.commit()
+
+    index.refresh()
+    # Pruned only once the interval has passed
+    assert index.suggest("beta")
+    monkeypatch.setattr(index, "_next_prune_at", 0.0)
+    index.refresh()
+    assert index.suggest("beta") == []
+    assert index.lookup("Beta Labs") == []
+    assert len(index) == 204
+
+
+def test_suggest_from_index_prefers_name_prefixes(db, loaded_index, count_queries):
+    suggestions = suggest_companies(db, "a", limit=4)
+
+    names = [name for _, name, _ in suggestions]
+    # "acme" and "acme corp" share the normalized name "acme"
+    assert sorted(names[:2]) == ["acme", "acme corp"]
+    assert names[2:] == ["acme industrial holdings", "apex analytics"]
+    assert suggest_companies(db, "Lab")[0][1] == "beta labs"
+    assert count_queries == []
+
+
+def test_suggest_without_index_is_one_limited_query(db, count_queries):
+    suggestions = suggest_companies(db, "Acme", limit=2)
+
+    assert [name for _, name, _ in suggestions] == ["acme", "acme corp"]
+    assert len(count_queries) == 1
+
+
+def list_page(db, **params):
+    params = {
+        "search": None, "limit": 50, "offset": 0, "cursor": None, "view": "full", "fields": None,
+        "industry": None, "country": None, "sort": None, **params
+    }
+    return asyncio.run(list_companies(token="token", db=db, **params))
+
+
+def test_cursor_pages_cover_every_company_once_without_offset(db, count_queries):
+    ids = []
+    page = list_page(db, limit=40)
+    assert page.total == 205
+    while True:
+        ids += [company.id for company in page.companies]
+        if not page.has_more:
+            break
+        page = list_page(db, limit=40, cursor=page.next_cursor)
+
+    # First page: count and select; every later page seeks past the cursor's row
+    assert len(count_queries) == 2 + 5
+    assert all(") < (?, ?)" in statement for statement in count_queries[2:])
+    assert len(ids) == len(set(ids)) == 205
+    expected = [c.id for c in db.query(CompanyAnalysis).order_by(
+        CompanyAnalysis.created_at.desc(), CompanyAnalysis.id.desc()
+    )]
+    assert ids == expected
+
+
+def test_invalid_cursor_is_rejected(db):
+    with pytest.raises(HTTPException) as error:
+        list_page(db, cursor="not-a-cursor")
+    assert error.value.status_code == 400
+
+    next_cursor = list_page(db, limit=1).next_cursor
+    with pytest.raises(HTTPException) as error:
+        list_page(db, cursor=next_cursor, search="acme")
+    assert error.value.status_code == 400
+
+
+def test_summary_view_selects_fields_not_the_document(db, count_queries):
+    company = db.query(CompanyAnalysis).order_by(CompanyAnalysis.id.desc()).first()
+    summary = extract_company_summary({
+        "company_basic_info": {"industry_primary": "Analytics", "headquarters_country": "US", "revenue_estimate": "N/A"},
+        "acquisition_scoring": {"pe_scoring": {"acquisition_score": 7.5, "overall_opportunity_score": "string"}}
+    })
+    for column, value in summary.items():
+        setattr(company, column, value)
+    db.commit()
+    count_queries.clear()
+
+    summary = json.loads(list_page(db, limit=1, view="summary").body)
+    assert "analysis_result" not in count_queries[-1]
+    assert summary["companies"] == [{
+        "id": company.id, "company_name": company.company_name, "canonical_name": company.canonical_name,
+        "status": "success", "created_at": company.created_at.isoformat(), "industry": "Analytics",
+        "headquarters_country": "US", "revenue_estimate": None, "employee_count_estimate": None,
+        "acquisition_score": 7.5, "overall_opportunity_score": None
+    }]
+
+    sparse = json.loads(list_page(db, limit=40, fields="company_name, industry").body)
+    assert all(set(row) == {"id", "company_name", "industry"} for row in sparse["companies"])
+    next_page = json.loads(list_page(db, limit=40, fields="company_name", cursor=sparse["next_cursor"]).body)
+    assert next_page["companies"][0]["id"] < sparse["companies"][-1]["id"]
+
+    with pytest.raises(HTTPException) as error:
+        list_page(db, fields="company_name,analysis_result")
+    assert error.value.status_code == 400
+
+
+def test_filters_and_score_sort_page_through_summary_columns(db):
+    scored = db.query(CompanyAnalysis).filter(CompanyAnalysis.company_name.like("company %")).all()
+    for position, company in enumerate(scored):
+        company.industry = "Manufacturing" if position % 2 else "Software"
+        company.acquisition_score = float(position % 7)
+    db.commit()
+
+    ids, scores = [], []
+    page = list_page(db, limit=15, industry=" manufacturing ", sort="acquisition_score", view="summary")
+    first_cursor = json.loads(page.body)["next_cursor"]
+    while True:
+        page = json.loads(page.body)
+        ids += [company["id"] for company in page["companies"]]
+        scores += [company["acquisition_score"] for company in page["companies"]]
+        if not page["has_more"]:
+            break
+        page = list_page(
+            db, limit=15, industry="Manufacturing", sort="acquisition_score", view="summary", cursor=page["next_cursor"]
+        )
+
+    assert len(ids) == len(set(ids)) == 100
+    assert scores == sorted(scores, reverse=True)
+
+    with pytest.raises(HTTPException) as error:
+        list_page(db, industry="Software", sort="acquisition_score", cursor=first_cursor)
+    assert error.value.status_code == 400
+
+
+@pytest.mark.parametrize("name, normalized", [
+    ("Microsoft Corp.", "microsoft"),
+    ("The Microsoft Corporation", "microsoft"),
+    ("  MSFT ", "msft"),
+    ("Nestlé S.A.", "nestle"),
+    ("Acme, L.L.C.", "acme"),
+    ("Smith & Co.", "smith"),
+    ("Procter & Gamble Co", "procter and gamble"),
+    ("Ben & Jerry's Homemade, Inc.", "ben and jerrys homemade"),
+    ("The Company", "company"),
+])
+def test_normalize_company_name(name, normalized):
+    assert normalize_company_name(name) == normalized
@@ -0,0 +1,61 @@
+import asyncio
+import pytest
+from app.core import gemini_client
+from app.core.gemini_client import GeminiClientPool
+
+
+@pytest.fixture
+def closed(monkeypatch):
+    """Clients closed by the pool, and whether their async connections were closed too"""
+    closed = []
+
+    async def aclose_client(client):
+        closed.append((client, "async"))
+
+    monkeypatch.setattr(gemini_client, "_close_client", lambda client: closed.append((client, "sync")))
+    monkeypatch.setattr(gemini_client, "_aclose_client", aclose_client)
+    return closed
+
+
+def test_rotation_closes_idle_clients_now(closed):
+    pool = GeminiClientPool("key-1")
+    with pool.use_client() as old:
+        pass
+
+    pool.rotate("key-2")
+
+    assert closed == [(old, "sync")]
+    with pool.use_client() as new:
+        assert new is not old
+        assert new._api_client.api_key == "key-2"
+
+
+def test_rotation_closes_client_in_use_once_its_calls_finish(closed):
+    pool = GeminiClientPool("key-1")
+    with pool.use_client() as first:
+        with pool.use_client() as second:
+            assert second is first
+            pool.rotate("key-2")
+            assert not closed
+        # Still in use by the outer call
+        assert not closed
+    assert closed == [(first, "sync")]
+
+    with pool.use_client() as current:
+        pass
+    assert closed == [(first, "sync")]
+    assert current is not first
+
+
+def test_async_calls_close_drained_client_connections(closed):
+    pool = GeminiClientPool("key-1")
+
+    async def run():
+        async with pool.use_client_async() as client:
+            pool.rotate("key-2")
+            assert not closed
+        return client
+
+    client = asyncio.run(run())
+
+    assert closed == [(client, "async")]
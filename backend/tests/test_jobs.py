@@ -0,0 +1,294 @@
+import asyncio
+import json
+import threading
+import time
+import pytest
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.orm import sessionmaker
+from fastapi import HTTPException
+from app.api import companies
+from app.api.companies import cancel_job_endpoint, stream_job_events_endpoint
+from app.core import async_processor, job_events as job_events_module, job_queue, job_state
+from app.core.async_processor import (
+    AnalysisWorkerPool,
+    complete_job_success,
+    process_company_analysis_async,
+    update_job_progress,
+)
+from app.core.gemini_client import generate_company_analysis_async
+from app.core.job_events import job_events
+from app.core.job_queue import cancel_job, claim_next_job, heartbeat_job, reclaim_expired_leases
+from app.core.job_state import job_states
+from app.config import settings
+from app.database.models import AsyncJob
+
+
+@pytest.fixture
+def db(monkeypatch, make_sqlite_engine, tmp_path):
+    # A file database, so a session sees only what the others have committed
+    engine = make_sqlite_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    AsyncJob.__table__.create(engine)
+    Session = sessionmaker(bind=engine)
+    for module in (async_processor, job_queue, job_state):
+        monkeypatch.setattr(module, "SessionLocal", Session)
+    session = Session()
+    session.add_all([
+        AsyncJob(job_id="job_queued", company_name="Acme", status="queued"),
+        AsyncJob(job_id="job_running", company_name="Beta Labs", status="processing", worker_id="worker:0"),
+    ])
+    session.commit()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def notifications(monkeypatch):
+    """NOTIFY batches (pg_notify is Postgres-only) and the threads queueing them"""
+    batches = []
+    publishers = []
+
+    def notify_job_events(db, events):
+        publishers.append(threading.get_ident())
+        batches.append(events)
+
+    for module in (job_events_module, job_queue, job_state):
+        monkeypatch.setattr(module, "notify_job_events", notify_job_events)
+    return batches, publishers
+
+
+@pytest.fixture
+def local_events(monkeypatch):
+    """The process's job event broker, fresh and without its Postgres listener"""
+    async def listen_forever():
+        pass
+
+    for name, value in (
+        ("_subscribers", {}), ("_handlers", []), ("_loop", None), ("_loop_thread", None), ("_listener", None)
+    ):
+        monkeypatch.setattr(job_events, name, value)
+    monkeypatch.setattr(job_events, "_listen_forever", listen_forever)
+    return job_events
+
+
+def updates(statements):
+    return [statement for statement in statements if statement.lstrip().upper().startswith("UPDATE")]
+
+
+def progress_of(db, job_id):
+    db.expire_all()
+    return db.query(AsyncJob.progress_message).filter(AsyncJob.job_id == job_id).scalar()
+
+
+def job_row(db, job_id):
+    db.expire_all()
+    return db.query(AsyncJob).filter(AsyncJob.job_id == job_id).one()
+
+
+def test_progress_of_running_job_collapses_into_one_flush(db, notifications, count_queries):
+    batches, _ = notifications
+    job_states.track("job_running", "processing", "Starting company analysis...", None)
+    try:
+        async def report():
+            for step in range(5):
+                await update_job_progress("job_running", f"Step {step}")
+
+        asyncio.run(report())
+        assert not updates(count_queries)
+        assert job_states.get("job_running")["progress_message"] == "Step 4"
+
+        assert job_states.flush() == 1
+        assert len(updates(count_queries)) == 1
+        assert progress_of(db, "job_running") == "Step 4"
+        assert [event["progress_message"] for event in batches[-1]] == ["Step 4"]
+        # Nothing left to write
+        assert job_states.flush() == 0
+        assert len(updates(count_queries)) == 1
+    finally:
+        job_states.forget("job_running")
+
+
+def test_progress_of_untracked_job_is_written_off_the_event_loop(db, notifications):
+    _, publishers = notifications
+
+    async def report():
+        await update_job_progress("job_running", "Checking existing records...")
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(report())
+
+    assert progress_of(db, "job_running") == "Checking existing records..."
+    assert publishers and loop_thread not in publishers
+
+
+def test_workers_claim_queued_jobs_oldest_first(db, notifications):
+    batches, _ = notifications
+    db.add(AsyncJob(
+        job_id="job_later", company_name="Gamma", status="queued",
+        created_at=datetime.now(timezone.utc) + timedelta(minutes=1)
+    ))
+    db.commit()
+
+    assert claim_next_job("worker:1")[:2] == ("job_queued", "Acme")
+    job = job_row(db, "job_queued")
+    assert (job.status, job.worker_id, job.attempts) == ("processing", "worker:1", 1)
+    assert job.lease_expires_at > job.started_at
+    assert [(event["job_id"], event["status"]) for event in batches[-1]] == [("job_queued", "processing")]
+
+    assert claim_next_job("worker:2")[0] == "job_later"
+    assert claim_next_job("worker:3") is None
+    # Only the claiming worker can extend the lease
+    assert heartbeat_job("job_queued", "worker:1")
+    assert not heartbeat_job("job_queued", "worker:2")
+
+
+def test_expired_leases_are_requeued_until_out_of_attempts(db, notifications, local_events, clock):
+    claim_next_job("worker:1")
+    db.add(AsyncJob(
+        job_id="job_exhausted", company_name="Delta", status="processing", worker_id="worker:2",
+        attempts=settings.ANALYSIS_JOB_MAX_ATTEMPTS,
+        lease_expires_at=datetime.now(timezone.utc) + timedelta(seconds=settings.ANALYSIS_JOB_LEASE_SECONDS / 2)
+    ))
+    db.commit()
+    assert reclaim_expired_leases() == {"requeued": 0, "failed": 0}
+    clock[0] += settings.ANALYSIS_JOB_LEASE_SECONDS + 1
+
+    async def run():
+        local_events.start()
+        queue = local_events.subscribe("job_exhausted")
+        reclaimed = await asyncio.to_thread(reclaim_expired_leases)
+        return reclaimed, await asyncio.wait_for(queue.get(), timeout=1)
+
+    reclaimed, event = asyncio.run(run())
+
+    assert reclaimed == {"requeued": 1, "failed": 1}
+    assert event["status"] == "failed"
+    assert event["error_message"] == f"Worker lease expired after {settings.ANALYSIS_JOB_MAX_ATTEMPTS} attempts"
+    requeued = job_row(db, "job_queued")
+    assert (requeued.status, requeued.worker_id, requeued.attempts) == ("queued", None, 1)
+    assert job_row(db, "job_exhausted").status == "failed"
+    # job_running has no lease, so only startup reconciliation recovers it
+    assert job_row(db, "job_running").status == "processing"
+
+
+def test_cancel_queued_job(db, notifications):
+    batches, _ = notifications
+
+    assert cancel_job("job_queued") == "cancelled"
+
+    job = job_row(db, "job_queued")
+    assert job.status == "cancelled"
+    assert job.completed_at is not None
+    assert job.progress_message == "Analysis cancelled"
+    assert [(event["job_id"], event["status"]) for event in batches[-1]] == [("job_queued", "cancelled")]
+    # A finished job is left as it is
+    assert cancel_job("job_queued") == "cancelled"
+    assert len(batches) == 1
+    assert cancel_job("job_missing") is None
+
+
+def test_cancel_endpoint_reports_a_job_it_cannot_read_back(db, notifications, monkeypatch):
+    monkeypatch.setattr(companies, "get_job_status", lambda job_id: None)
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(cancel_job_endpoint("job_queued", token="token"))
+
+    assert error.value.status_code == 404
+    assert job_row(db, "job_queued").status == "cancelled"
+
+
+def test_local_subscribers_see_the_committed_job(db, notifications, local_events):
+    statuses = []
+    Session = sessionmaker(bind=db.get_bind())
+
+    def read_status(event):
+        # A separate connection, so only committed changes are visible
+        with Session() as other:
+            statuses.append(other.query(AsyncJob.status).filter(AsyncJob.job_id == event["job_id"]).scalar())
+
+    async def run():
+        local_events.start()
+        local_events.add_handler(read_status)
+        # Published on the loop thread, the event is delivered synchronously
+        cancel_job("job_queued")
+        await asyncio.to_thread(complete_job_success, "job_running", 1)
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+
+    assert statuses == ["cancelled", "completed"]
+
+
+def test_cancel_running_job_stops_its_analysis(db, notifications, local_events, monkeypatch):
+    pool = AnalysisWorkerPool(max_concurrency=1, poll_interval=0.01)
+    started = asyncio.Event()
+    stopped = []
+
+    async def analysis(job_id, company_name, deadline):
+        started.set()
+        try:
+            await asyncio.sleep(3600)
+        except asyncio.CancelledError:
+            stopped.append(job_id)
+            raise
+
+    monkeypatch.setattr(async_processor, "process_company_analysis_async", analysis)
+
+    async def run():
+        # Cancellation reaches the pool through the job event it publishes
+        local_events.start()
+        local_events.add_handler(pool._on_job_event)
+        job = asyncio.create_task(pool._run_job("job_running", "Beta Labs", "worker:0"))
+        await started.wait()
+        assert cancel_job("job_running") == "cancelled"
+        # Returns once the analysis has stopped, without raising
+        await asyncio.wait_for(job, timeout=1)
+
+    asyncio.run(run())
+
+    assert stopped == ["job_running"]
+    assert not pool._running
+    # An outcome arriving after the cancel doesn't overwrite it
+    complete_job_success("job_running", company_id=1)
+    assert job_row(db, "job_running").status == "cancelled"
+
+
+def test_analysis_past_its_deadline_fails_the_job(db, notifications, monkeypatch):
+    batches, _ = notifications
+
+    async def get_or_create_analysis(company_name, deadline):
+        return await generate_company_analysis_async(company_name, deadline=deadline)
+
+    monkeypatch.setattr(async_processor, "find_existing_result", lambda company_name: None)
+    monkeypatch.setattr(async_processor, "get_or_create_analysis", get_or_create_analysis)
+
+    asyncio.run(process_company_analysis_async("job_running", "Beta Labs", deadline=time.monotonic() - 1))
+
+    job = job_row(db, "job_running")
+    assert job.status == "failed"
+    assert "exceeded its time budget" in job.error_message
+    assert job.completed_at is not None
+    assert batches[-1][0]["status"] == "failed"
+
+
+class ConnectedRequest:
+    async def is_disconnected(self):
+        return False
+
+
+def test_event_stream_ends_with_the_final_job_status(db, notifications, local_events):
+    async def run():
+        local_events.start()
+        response = await stream_job_events_endpoint("job_running", ConnectedRequest(), token="token")
+        stream = response.body_iterator
+        first = await stream.__anext__()
+        await asyncio.to_thread(complete_job_success, "job_running", 7)
+        return [first] + [chunk async for chunk in stream]
+
+    chunks = asyncio.run(asyncio.wait_for(run(), timeout=5))
+
+    assert [chunk.split("\n")[0] for chunk in chunks] == ["event: status", "event: complete"]
+    final = json.loads(chunks[-1].split("data: ")[1])
+    assert final["status"] == "completed"
+    assert final["company_id"] == 7
+    # The stream unsubscribes once it ends
+    assert not local_events._subscribers
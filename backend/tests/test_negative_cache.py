@@ -0,0 +1,78 @@
+import sqlite3
+import pytest
+from datetime import datetime, timezone
+from sqlalchemy.orm import sessionmaker
+from app.config import settings
+from app.core import analysis_service, negative_cache as negative_cache_module
+from app.core.negative_cache import NegativeCache, negative_cache
+from app.database.models import CompanyAnalysis, UnresolvedCompanyName
+from app.utils.exceptions import CompanyUnresolvedError, GeminiAPIError
+
+
+def parse_utc(value):
+    parsed = datetime.fromisoformat(value.decode())
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def db(monkeypatch, make_sqlite_engine):
+    # Raw SQL results come back as aware datetimes, as they do from Postgres
+    sqlite3.register_converter("DATETIME", parse_utc)
+    engine = make_sqlite_engine(detect_types=sqlite3.PARSE_DECLTYPES)
+    UnresolvedCompanyName.__table__.create(engine)
+    Session = sessionmaker(bind=engine)
+    monkeypatch.setattr(negative_cache_module, "SessionLocal", Session)
+    monkeypatch.setattr(analysis_service, "SessionLocal", Session)
+    negative_cache._memory.clear()
+    session = Session()
+    yield session
+    session.close()
+    negative_cache._memory.clear()
+
+
+def test_entries_expire_after_their_reason_ttl(db, clock):
+    failures = NegativeCache()
+    failures.record("acme", "Acme", GeminiAPIError("Gemini unavailable"))
+    failures.record("nonexistent", "Nonexistent Co", CompanyUnresolvedError("No usable analysis"))
+
+    assert failures.get("acme")["reason"] == "api_error"
+    assert failures.get("nonexistent")["reason"] == "unresolved"
+
+    clock[0] = settings.NEGATIVE_CACHE_ERROR_TTL_SECONDS + 1
+    assert failures.get("acme") is None
+    assert NegativeCache().get("acme") is None
+    assert failures.get("nonexistent")["reason"] == "unresolved"
+
+    clock[0] = settings.NEGATIVE_CACHE_TTL_SECONDS + 1
+    assert failures.get("nonexistent") is None
+    assert NegativeCache().get("nonexistent") is None
+
+
+def test_entry_is_found_in_database_when_memory_is_cold(db, count_queries):
+    NegativeCache().record("nonexistent", "Nonexistent Co", CompanyUnresolvedError("No usable analysis"))
+    cold = NegativeCache()
+    count_queries.clear()
+
+    entry = cold.get("nonexistent")
+    assert entry["reason"] == "unresolved"
+    assert entry["error_message"] == "No usable analysis"
+    assert len(count_queries) == 1
+    # Kept in memory from then on
+    assert cold.get("nonexistent") is entry
+    assert len(count_queries) == 1
+
+
+def test_successful_analysis_clears_the_entry(db, monkeypatch):
+    negative_cache.record("acme", "Acme Corp", GeminiAPIError("Gemini unavailable"))
+    assert negative_cache.get("acme") is not None
+
+    company = CompanyAnalysis(
+        id=1, company_name="acme corp", canonical_name="Acme Corp", analysis_result={},
+        status="success", created_at=datetime.now(timezone.utc)
+    )
+    monkeypatch.setattr(analysis_service, "save_company_analysis", lambda db, *args: company)
+    analysis_service.save_analysis_result("Acme Corp", {})
+
+    assert negative_cache.get("acme") is None
+    assert NegativeCache().get("acme") is None
+    assert db.query(UnresolvedCompanyName).count() == 0
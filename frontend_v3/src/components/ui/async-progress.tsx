@@ -39,6 +39,7 @@ export function AsyncProgress({
   const getProgressValue = () => {
     if (status === 'completed') return 100;
     if (status === 'failed') return 0;
+    if (status === 'queued') return 5;
     if (status === 'processing') {
       // Simulate progress based on typical analysis time
       if (progress?.includes('Starting')) return 10;
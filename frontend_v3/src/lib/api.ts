@@ -45,6 +45,7 @@ export interface AsyncJobStatus {
   job_id: string;
   status: string;
   progress_message?: string;
+  company_id?: number;
   result?: CompanySearchResponse;
   error_message?: string;
   created_at: string;
@@ -219,7 +220,18 @@ class LeadIntelAPI {
   }
 
   async getJobStatus(jobId: string): Promise<AsyncJobStatus> {
-    return this.request<AsyncJobStatus>(`/companies/jobs/${jobId}/status`);
+    const status = await this.request<AsyncJobStatus>(`/companies/jobs/${jobId}/status`);
+    // Completed jobs reference the analysis instead of embedding it
+    if (status.status === 'completed' && !status.result && status.company_id) {
+      status.result = await this.getCompanyAnalysis(status.company_id);
+    }
+    return status;
+  }
+
+  async cancelJob(jobId: string): Promise<AsyncJobStatus> {
+    return this.request<AsyncJobStatus>(`/companies/jobs/${jobId}`, {
+      method: 'DELETE',
+    });
   }
 
   // Helper method for polling until completion
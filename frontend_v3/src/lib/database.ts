@@ -67,11 +67,23 @@ export interface DatabaseStats {
   recent_analyses_count: number;
 }
 
+// Completed jobs reference company_analysis (company_id); rebuild the result shape
+// the backend used to copy into async_jobs.result
+const JOB_RESULT_COLUMN = `COALESCE(j.result, CASE WHEN c.id IS NOT NULL THEN jsonb_build_object(
+            'id', c.id,
+            'company_name', c.company_name,
+            'canonical_name', c.canonical_name,
+            'analysis_result', c.analysis_result,
+            'status', c.status,
+            'created_at', c.created_at
+          ) END) AS result`;
+
 // Async Job interface (matching async_jobs table schema)
 export interface AsyncJob {
   job_id: string;
   company_name: string;
   status: string; // 'pending', 'processing', 'completed', 'failed'
+  company_id?: number | null;
   result?: any; // JSONB object with analysis results
   progress_message?: string | null;
   error_message?: string | null;
@@ -591,6 +603,70 @@ class DatabaseService {
     }
   }
 
+  // Companies whose industry contains the given text (case-insensitive), newest first
+  async getCompaniesByIndustry(industry: string, limit: number = 20): Promise<CompanyAnalysis[]> {
+    try {
+      const query = `
+        SELECT 
+          id,
+          company_name,
+          canonical_name,
+          search_query,
+          analysis_result,
+          status,
+          created_at,
+          industry
+        FROM company_analysis
+        WHERE industry ILIKE '%' || $1 || '%'
+        ORDER BY created_at DESC, id DESC
+        LIMIT $2
+      `;
+      
+      // LIKE wildcards in the input match literally
+      const pattern = industry.trim().replace(/[\\%_]/g, '\\$&');
+      const result = await executeQuery(query, [pattern, limit]);
+      
+      return result.rows.map(row => ({
+        ...row,
+        score: this.extractScore(row.analysis_result),
+        industry: row.industry,
+        revenue_range: this.extractRevenueRange(row.analysis_result)
+      }));
+      
+    } catch (error) {
+      console.error('Error fetching companies by industry:', error);
+      throw error;
+    }
+  }
+
+  // Most common industries across all companies, aggregated on the industry column
+  async getIndustryBreakdown(limit: number = 10): Promise<Array<{ industry: string; count: number; percentage: number }>> {
+    try {
+      const query = `
+        SELECT 
+          COALESCE(industry, 'Unknown') AS industry,
+          COUNT(*) AS count,
+          SUM(COUNT(*)) OVER () AS total
+        FROM company_analysis
+        GROUP BY COALESCE(industry, 'Unknown')
+        ORDER BY count DESC
+        LIMIT $1
+      `;
+      
+      const result = await executeQuery(query, [limit]);
+      
+      return result.rows.map(row => ({
+        industry: row.industry,
+        count: parseInt(row.count),
+        percentage: Math.round((parseInt(row.count) / parseInt(row.total)) * 100)
+      }));
+      
+    } catch (error) {
+      console.error('Error fetching industry breakdown:', error);
+      throw error;
+    }
+  }
+
   // Helper method to extract score from analysis_result
   private extractScore(analysisResult: any): number | undefined {
     if (!analysisResult) return undefined;
@@ -650,17 +726,18 @@ class DatabaseService {
       
       const query = `
         SELECT 
-          job_id, 
-          company_name, 
-          status, 
-          result, 
-          progress_message,
-          error_message,
-          created_at, 
-          updated_at
-        FROM async_jobs 
-        WHERE LOWER(company_name) = LOWER($1)
-        ORDER BY created_at DESC 
+          j.job_id, 
+          j.company_name, 
+          j.status, 
+          ${JOB_RESULT_COLUMN}, 
+          j.progress_message,
+          j.error_message,
+          j.created_at, 
+          j.completed_at
+        FROM async_jobs j
+        LEFT JOIN company_analysis c ON c.id = j.company_id
+        WHERE LOWER(j.company_name) = LOWER($1)
+        ORDER BY j.created_at DESC 
         LIMIT 1
       `;
       
@@ -693,16 +770,17 @@ class DatabaseService {
       
       const query = `
         SELECT 
-          job_id, 
-          company_name, 
-          status, 
-          result, 
-          progress_message,
-          error_message,
-          created_at, 
-          completed_at
-        FROM async_jobs 
-        WHERE job_id = $1
+          j.job_id, 
+          j.company_name, 
+          j.status, 
+          ${JOB_RESULT_COLUMN}, 
+          j.progress_message,
+          j.error_message,
+          j.created_at, 
+          j.completed_at
+        FROM async_jobs j
+        LEFT JOIN company_analysis c ON c.id = j.company_id
+        WHERE j.job_id = $1
       `;
       
       const result = await executeQuery(query, [jobId]);
@@ -757,11 +835,12 @@ class DatabaseService {
       
       // Then check async_jobs for completed jobs
       const jobQuery = `
-        SELECT job_id, company_name, status, result, updated_at
-        FROM async_jobs 
-        WHERE LOWER(company_name) = LOWER($1) 
-        AND status = 'completed'
-        ORDER BY updated_at DESC
+        SELECT j.job_id, j.company_name, j.status, ${JOB_RESULT_COLUMN}, j.completed_at
+        FROM async_jobs j
+        LEFT JOIN company_analysis c ON c.id = j.company_id
+        WHERE LOWER(j.company_name) = LOWER($1) 
+        AND j.status = 'completed'
+        ORDER BY j.completed_at DESC
         LIMIT 1
       `;
       const jobResult = await executeQuery(jobQuery, [companyName]);
@@ -205,16 +205,8 @@ export async function getCompaniesByIndustry(
   try {
     console.log(`🔍 Direct DB query: getCompaniesByIndustry("${industry}", ${limit})`);
     
-    // This would require a more complex query based on the JSON structure
-    // For now, we'll get all companies and filter by industry
-    const allCompanies = await db.getCompanyAnalyses(100, 0);
-    
-    const filteredCompanies = allCompanies
-      .filter(company => {
-        const extractedIndustry = extractIndustryFromAnalysis(company.analysis_result);
-        return extractedIndustry?.toLowerCase().includes(industry.toLowerCase());
-      })
-      .slice(0, limit);
+    // Substring match in SQL on the industry column (filled in when an analysis is saved)
+    const filteredCompanies = await db.getCompaniesByIndustry(industry, limit);
     
     const enhancedCompanies: EnhancedCompanyAnalysis[] = filteredCompanies.map(company => {
       const ai_score_breakdown = calculateAIScore(company.analysis_result);
@@ -249,26 +241,8 @@ async function getTotalCompanyCount(): Promise<number> {
 
 async function getIndustryBreakdown(): Promise<Array<{ industry: string; count: number; percentage: number }>> {
   try {
-    // This is a simplified version - in a real implementation, we'd use a proper JSONB query
-    const companies = await db.getCompanyAnalyses(1000, 0); // Get more companies for accurate breakdown
-    const industryMap = new Map<string, number>();
-    
-    companies.forEach(company => {
-      const industry = extractIndustryFromAnalysis(company.analysis_result) || 'Unknown';
-      industryMap.set(industry, (industryMap.get(industry) || 0) + 1);
-    });
-    
-    const total = companies.length;
-    const breakdown = Array.from(industryMap.entries())
-      .map(([industry, count]) => ({
-        industry,
-        count,
-        percentage: Math.round((count / total) * 100)
-      }))
-      .sort((a, b) => b.count - a.count)
-      .slice(0, 10); // Top 10 industries
-    
-    return breakdown;
+    // Top 10 industries, counted in SQL over every company
+    return await db.getIndustryBreakdown(10);
   } catch (error) {
     console.warn('Failed to get industry breakdown:', error);
     return [];
@@ -325,23 +299,6 @@ async function getScoreDistribution(): Promise<Array<{ range: string; count: num
   }
 }
 
-function extractIndustryFromAnalysis(analysisResult: any): string | null {
-  if (!analysisResult) return null;
-  
-  try {
-    // Check common industry field patterns in the JSONB data
-    return analysisResult?.company_basic_info?.industry_primary ||
-           analysisResult?.company_basic_info?.industry ||
-           analysisResult?.industry ||
-           analysisResult?.sector ||
-           analysisResult?.business_sector ||
-           analysisResult?.primary_industry ||
-           null;
-  } catch (error) {
-    return null;
-  }
-}
-
 // Database connection health check for components
 export async function isDatabaseHealthy(): Promise<boolean> {
   try {